@@ -3,27 +3,63 @@ from flask import Flask, jsonify, request
 import joblib
 import pandas as pd
 import numpy as np
-import requests
 import json
 import pytz
-import holidays
 import os
 import jwt
 from dotenv import load_dotenv
 from datetime import datetime, timezone
 from flask_cors import CORS
-from collections import OrderedDict
-from shapely import wkt
-from shapely.geometry import mapping
 from pathlib import Path
+from collections import OrderedDict
+from itertools import product
 from zoneinfo import ZoneInfo
 
 # Import request tracking utilities
 from utils.request_tracker import (
     with_request_tracking,
     log_with_context,
+    logging_stats,
     setup_logging
 )
+from utils.snapshot_cache import SnapshotCache, hour_bucket, snapshot_key
+from utils.single_flight import SingleFlight
+from utils.geometry_store import FULL_DETAIL, PRECISIONS, TOLERANCES, GeometryStore
+from utils.geojson_serializer import (
+    GeoJSONSerializer,
+    Representation,
+    batch_body,
+    representation_name
+)
+from utils.snapshot_encoding import (
+    EncodedSnapshot,
+    model_version,
+    negotiate_encoding,
+    snapshot_etag,
+    variant_etag
+)
+from utils.vector_tiles import MAX_ZOOM, MVT_MIMETYPE, VectorTileEncoder, valid_tile
+from utils.percentile_index import PercentileIndex
+from utils.weather_client import (
+    DEFAULT_BASE_URL as OPENWEATHER_DEFAULT_URL,
+    WeatherClient,
+    weather_summary
+)
+from utils.weather_refresher import WeatherRefresher
+from utils.horizon_precompute import HorizonPrecomputer
+from utils.calendar_features import CalendarTable
+from utils.inference import DEFAULT_BACKEND, make_predictor
+from utils.inference_executor import InferenceBusy, InferenceExecutor
+from utils.process_memory import memory_usage
+from utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, stage_timer
+from utils.request_profiler import PROFILE_HEADER, RequestProfiler
+from utils.subway_features import SubwayFeatureBuilder
+from utils.scoring import (
+    SCORE_TO_LEVEL,
+    PERCENTILE_COLUMNS,
+    classify_levels,
+    combined_scores
+)
 
 load_dotenv(override=True)  # Load environment variables from .env file
 
@@ -33,13 +69,46 @@ load_dotenv(override=True)  # Load environment variables from .env file
 app = Flask(__name__)
 CORS(app)
 
-# Setup logging system
-setup_logging()
+# Setup logging system. LOG_ASYNC=true opts in to writing records from a
+# background thread in batches; LOG_SAMPLE_RATE keeps info logs for that
+# share of requests (warnings and errors are always written).
+setup_logging(
+    asynchronous=os.getenv('LOG_ASYNC', 'false').lower() == 'true',
+    sample_rate=float(os.getenv('LOG_SAMPLE_RATE', '1.0')),
+    queue_size=int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+)
+
+# Opt-in profiling: a request carrying X-Profile-Token: $PROFILE_SECRET runs
+# under cProfile and its hottest functions are kept for /debug/profiles.
+app.extensions['request_profiler'] = request_profiler = RequestProfiler(
+    secret=os.getenv('PROFILE_SECRET'),
+    directory=os.getenv('PROFILE_DIR'),
+    top_n=int(os.getenv('PROFILE_TOP_N', '30'))
+)
 
 # Load API key.
 WEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY')
 JWT_SECRET = os.getenv('JWT_SECRET')
 
+# Pooled OpenWeather client; a slow upstream can hold a worker for at most
+# the connect + read timeout. OPENWEATHER_BASE_URL can point it at a stub
+# server (see loadtest/).
+weather_client = WeatherClient(
+    WEATHER_API_KEY,
+    base_url=os.getenv('OPENWEATHER_BASE_URL', OPENWEATHER_DEFAULT_URL),
+    connect_timeout=float(os.getenv('OPENWEATHER_CONNECT_TIMEOUT', '3.05')),
+    read_timeout=float(os.getenv('OPENWEATHER_READ_TIMEOUT', '5')),
+    current_ttl=int(os.getenv('WEATHER_CURRENT_TTL', '300')),
+    forecast_ttl=int(os.getenv('WEATHER_FORECAST_TTL', '1800')),
+    pool_size=int(os.getenv('OPENWEATHER_POOL_SIZE', '10'))
+)
+
+# Opt-in background refresh so requests never wait on OpenWeather.
+weather_refresher = WeatherRefresher(
+    weather_client,
+    interval_seconds=float(os.getenv('WEATHER_REFRESH_MINUTES', '10')) * 60
+)
+
 # ----------------------------------------
 # Path setup
 # ----------------------------------------
@@ -52,6 +121,25 @@ MODELS_DIR = BASE_DIR
 HIGH_THRESHOLD = 200       # Defines what is considered a very busy zone (taxi specific).
 CORRECTION_FACTOR = 1.412  # How much to scale underpredicted values (again taxi specific).
 
+# ----------------------------------------
+# Prediction snapshot cache
+# ----------------------------------------
+# Predictions only change with the NY-local hour and the weather, so whole
+# snapshots are cached per (hour bucket, weather signature).
+prediction_cache = SnapshotCache(
+    max_entries=int(os.getenv('PREDICTION_CACHE_SIZE', '128')),
+    ttl_seconds=int(os.getenv('PREDICTION_CACHE_TTL', '600'))
+)
+# Concurrent misses on the same key (e.g. everyone at the top of the hour)
+# wait for one computation instead of each running the models.
+snapshot_flights = SingleFlight()
+snapshot_outcomes = REGISTRY.counter(
+    "ml_api_snapshot_requests_total",
+    "Snapshot requests by outcome: not_modified, hit, shared (waited on another "
+    "request) or miss (ran the models)",
+    ["outcome"]
+)
+
 # ----------------------------------------
 # Load models and metadata
 # ----------------------------------------
@@ -67,6 +155,12 @@ except Exception as e:
     print("Taxi model load failed:", e)
     taxi_model = None
 
+# Part of every ETag, so clients revalidate after a model is redeployed.
+MODEL_VERSION = os.getenv('MODEL_VERSION') or model_version([
+    MODELS_DIR / "subway_ridership_model_xgboost_final.joblib",
+    MODELS_DIR / "xgboost_taxi_model.joblib"
+])
+
 with open(MODELS_DIR / "required_features.json") as f:
     subway_features = json.load(f)
 
@@ -77,19 +171,29 @@ subway_busyness = pd.read_csv(BASE_DIR / "zone_subway_busyness_stats.csv")
 taxi_busyness = pd.read_csv(BASE_DIR / "zone_hourly_busyness_stats.csv")
 zones_df = pd.read_csv(BASE_DIR / "manhattan_taxi_zones.csv")
 
+# Dense percentile lookups replace per-request merges on the stats tables.
+subway_stats = PercentileIndex.from_stats(subway_busyness)
+taxi_stats = PercentileIndex.from_stats(taxi_busyness)
+
+# Static station columns and the station -> zone index are prepared once.
+calendar_table = CalendarTable.around(datetime.now(ZoneInfo("America/New_York")))
+subway_builder = SubwayFeatureBuilder(station_meta, subway_features, station_to_zone,
+                                      calendar_table)
+
+# Zone geometry never changes, so parse the WKT once into GeoJSON.
+zone_geometry = GeometryStore.from_zones(zones_df)
+# ...and encode it to JSON once per detail level; responses only encode
+# per-zone properties.
+geojson = GeoJSONSerializer(zone_geometry, levels=product(PRECISIONS, TOLERANCES))
+# Vector tiles keep the clipped, quantized geometry of each tile they have served.
+tile_encoder = VectorTileEncoder(zone_geometry,
+                                 max_tiles=int(os.getenv('TILE_CACHE_SIZE', '4096')))
+
 # ----------------------------------------
 # Scoring logic
 # ----------------------------------------
-LEVEL_TO_SCORE = {
-    "Very Quiet": 0,
-    "Quiet": 1,
-    "Moderate": 2,
-    "Busy": 3,
-    "Very Busy": 4,
-    "Extremely Busy": 5
-}
-SCORE_TO_LEVEL = {v: k for k, v in LEVEL_TO_SCORE.items()}
-
+# Scalar reference for a single value; the pipeline uses the vectorized
+# classify_levels from utils.scoring.
 def classify_level(val, p10, p25, p50, p75, p90):
     if pd.isna(val):
         return "Unknown"
@@ -103,108 +207,310 @@ def classify_level(val, p10, p25, p50, p75, p90):
 # ----------------------------------------
 # Weather fetcher
 # ----------------------------------------
+@stage_timer("weather")
 def fetch_weather(time):
-    WEATHER_URL = (
-        f"http://api.openweathermap.org/data/2.5/{'weather' if time is None else 'forecast/hourly'}?"
-        f"lat=40.728333&lon=-73.994167&appid={WEATHER_API_KEY}&units=metric"
-    )
     try:
-        r = requests.get(WEATHER_URL)
-        r.raise_for_status()
-        data = r.json()
-        if time:
-            data = next(filter(lambda x: x["dt"] == time, data['list']), None)
-        return {
-            "temp": data["main"]["temp"],
-            "feels_like": data["main"]["feels_like"],
-            "humidity": data["main"]["humidity"],
-            "wind_speed": data["wind"]["speed"],
-            "weather_main": data["weather"][0]["main"]
-        }
+        data = weather_refresher.lookup(time or None)
+        if data is None:
+            if time:
+                data = weather_client.forecast_at(time)
+            else:
+                data = weather_client.current()
+        return weather_summary(data)
     except Exception as e:
         print("Weather API error:", e)
         return {"temp": 15, "feels_like": 15, "humidity": 60, "wind_speed": 3, "weather_main": "Clear"}
 
-# ----------------------------------------
-# Subway feature generation
-# ----------------------------------------
-def create_subway_features(ts, weather):
-    hour = ts.hour
-    dow = ts.weekday()
-    month = ts.month
-    df = station_meta.copy()
-
-    df["hour"] = hour
-    df["day_of_week"] = dow
-    df["month"] = month
-    df["is_rush_hour"] = df["hour"].isin([7, 8, 9, 16, 17, 18]).astype(int)
-    df["is_weekend"] = df["day_of_week"].isin([5, 6]).astype(int)
-    df["is_holiday"] = int(ts.date() in holidays.UnitedStates())
-    df["hour_sin"] = np.sin(2 * np.pi * hour / 24)
-    df["hour_cos"] = np.cos(2 * np.pi * hour / 24)
-    df["dow_sin"] = np.sin(2 * np.pi * dow / 7)
-    df["dow_cos"] = np.cos(2 * np.pi * dow / 7)
-    df["month_sin"] = np.sin(2 * np.pi * month / 12)
-    df["month_cos"] = np.cos(2 * np.pi * month / 12)
-
-    df["temp"] = weather["temp"]
-    df["humidity"] = weather["humidity"]
-    df["wind_speed"] = weather["wind_speed"]
-    df["feels_like"] = weather["feels_like"]
-
-    main = weather["weather_main"].lower()
-    df["has_rain"] = int("rain" in main)
-    df["has_snow"] = int("snow" in main)
-    df["is_freezing"] = (df["temp"] < 0).astype(int)
-    df["is_hot"] = (df["temp"] > 30).astype(int)
-
-    def temp_category(t):
-        if t < 0: return "freezing"
-        elif t < 10: return "cold"
-        elif t < 20: return "mild"
-        elif t < 30: return "warm"
-        else: return "hot"
-    category_map = {"freezing": 0, "cold": 1, "mild": 2, "warm": 3, "hot": 4}
-    df["temp_category"] = df["temp"].apply(temp_category).map(category_map).astype(int)
-
-    df_model = df[subway_features].copy()
-    df_model["station_complex_id"] = df["station_complex_id"].values
-    return df_model
-
 # ----------------------------------------
 # Taxi feature generation
 # ----------------------------------------
+TAXI_WEATHER_TYPES = ["Rain", "Clouds", "Clear", "Snow", "Mist", "Haze", "Smoke",
+                      "Drizzle", "Fog", "Thunderstorm"]
+TAXI_FEATURES = [
+    "pickup_hour", "day_of_week", "is_weekend", "is_holiday", "is_peak_hour",
+    "temp", "humidity", "wind_speed", "feels_like",
+    "centroid_lat", "centroid_lon", "PULocationID"
+] + [f"weather_{w}" for w in TAXI_WEATHER_TYPES] + ["Shape_Area", "Shape_Leng"]
+
 def create_taxi_features(pulocation_ids, ts, weather):
     df = zones_df[zones_df["OBJECTID"].isin(pulocation_ids)].copy()
     df = df.rename(columns={"OBJECTID": "PULocationID"})
 
-    hour = ts.hour
-    dow = ts.weekday()
-    is_weekend = int(dow >= 5)
-    is_peak_hour = int(hour in [7, 8, 16, 17, 18])
+    cal = calendar_table.lookup(ts)
     weather_main = weather["weather_main"]
 
-    weather_cols = ["Rain", "Clouds", "Clear", "Snow", "Mist", "Haze", "Smoke", "Drizzle", "Fog", "Thunderstorm"]
-    for w in weather_cols:
+    for w in TAXI_WEATHER_TYPES:
         df[f"weather_{w}"] = int(weather_main == w)
 
-    df["pickup_hour"] = hour
-    df["day_of_week"] = dow
-    df["is_weekend"] = is_weekend
-    df["is_holiday"] = int(ts.date() in holidays.UnitedStates())
-    df["is_peak_hour"] = is_peak_hour
+    df["pickup_hour"] = cal["hour"]
+    df["day_of_week"] = cal["day_of_week"]
+    df["is_weekend"] = cal["is_weekend"]
+    df["is_holiday"] = cal["is_holiday"]
+    df["is_peak_hour"] = cal["is_peak_hour"]
     df["temp"] = weather["temp"]
     df["humidity"] = weather["humidity"]
     df["wind_speed"] = weather["wind_speed"]
     df["feels_like"] = weather["feels_like"]
 
-    order = [
-        "pickup_hour", "day_of_week", "is_weekend", "is_holiday", "is_peak_hour",
-        "temp", "humidity", "wind_speed", "feels_like",
-        "centroid_lat", "centroid_lon", "PULocationID"
-    ] + [f"weather_{w}" for w in weather_cols] + ["Shape_Area", "Shape_Leng"] + ["geometry"]
+    return df[TAXI_FEATURES + ["geometry"]]
 
-    return df[order]
+# ----------------------------------------
+# Model inference
+# ----------------------------------------
+# Prediction backend: "booster" (native XGBoost, default), "numpy" (tree arrays
+# evaluated in NumPy) or "sklearn" (the XGBRegressor wrapper).
+MODEL_BACKEND = os.getenv('MODEL_BACKEND', DEFAULT_BACKEND).lower()
+subway_predictor = make_predictor(subway_model, subway_features, MODEL_BACKEND)
+taxi_predictor = make_predictor(taxi_model, TAXI_FEATURES, MODEL_BACKEND)
+
+# Threaded serving (see gunicorn.conf.py) runs model calls on a small bounded
+# pool so request threads waiting on weather don't compete for CPU; 0 runs
+# them inline, as sync workers do.
+inference_executor = InferenceExecutor(
+    max_workers=int(os.getenv('INFERENCE_WORKERS', '0')),
+    max_pending=int(os.getenv('INFERENCE_QUEUE', '16'))
+)
+
+# ----------------------------------------
+# Snapshot builder
+# ----------------------------------------
+# Empty per-model results used when a model fails, so the other model's
+# levels still come through.
+SUBWAY_LEVEL_COLUMNS = ["PULocationID", "subway_level", "subway_score"]
+TAXI_LEVEL_COLUMNS = ["PULocationID", "taxi_level", "taxi_score", "centroid_lat",
+                      "centroid_lon"]
+
+def empty_levels(columns):
+    dtypes = {"PULocationID": "int64", "subway_level": "object", "taxi_level": "object"}
+    return pd.DataFrame({col: pd.Series(dtype=dtypes.get(col, "float64"))
+                         for col in columns})
+
+def split_rows(df, sizes):
+    """Split a stacked frame back into consecutive blocks of the given sizes"""
+    bounds = np.cumsum([0] + list(sizes))
+    return [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+def predict_subway_levels(moments):
+    """Subway levels per zone for each (ts, weather) moment, from one model call"""
+    with stage_timer("subway_features"):
+        X = subway_builder.matrix(moments)
+    with stage_timer("subway_predict"):
+        predictions = np.asarray(subway_predictor.predict(X))
+
+    levels = []
+    n = subway_builder.n_stations
+    with stage_timer("scoring"):
+        for k, (ts, _) in enumerate(moments):
+            zone_ids, totals = subway_builder.zone_totals(
+                predictions[k * n:(k + 1) * n]
+            )
+            subway_zone = pd.DataFrame({"PULocationID": zone_ids, "predicted": totals})
+            subway_zone[PERCENTILE_COLUMNS] = subway_stats.lookup(
+                subway_zone["PULocationID"], ts.weekday(), ts.hour
+            )
+            subway_zone["subway_level"], subway_zone["subway_score"] = classify_levels(
+                subway_zone["predicted"], subway_zone[PERCENTILE_COLUMNS]
+            )
+            levels.append(subway_zone[SUBWAY_LEVEL_COLUMNS])
+    return levels
+
+def predict_taxi_levels(moments):
+    """Taxi levels per zone for each (ts, weather) moment, from one model call"""
+    with stage_timer("taxi_features"):
+        pulocation_ids = zones_df["OBJECTID"].unique()
+        frames = [create_taxi_features(pulocation_ids, ts, weather)
+                  for ts, weather in moments]
+        stacked = pd.concat(frames, ignore_index=True)
+        X = stacked[TAXI_FEATURES]
+    with stage_timer("taxi_predict"):
+        stacked["predicted"] = taxi_predictor.predict(X)
+
+    levels = []
+    with stage_timer("scoring"):
+        blocks = split_rows(stacked, [len(f) for f in frames])
+        for (ts, _), taxi_df in zip(moments, blocks):
+            taxi_df = taxi_df.copy()
+            taxi_df[PERCENTILE_COLUMNS] = taxi_stats.lookup(
+                taxi_df["PULocationID"], ts.weekday(), ts.hour
+            )
+
+            taxi_df.loc[
+                (taxi_df["predicted"] < HIGH_THRESHOLD) &
+                (taxi_df["p75"] > HIGH_THRESHOLD),
+                "predicted"
+            ] *= CORRECTION_FACTOR
+
+            taxi_df["taxi_level"], taxi_df["taxi_score"] = classify_levels(
+                taxi_df["predicted"], taxi_df[PERCENTILE_COLUMNS]
+            )
+            levels.append(taxi_df[TAXI_LEVEL_COLUMNS])
+    return levels
+
+def combine_levels(taxi_level_df, subway_level_df):
+    """Merge per-model levels into the final per-zone result frame"""
+    result = pd.merge(taxi_level_df, subway_level_df, on="PULocationID", how="outer")
+    result["taxi_score"] = result["taxi_score"].fillna(np.nan)
+    result["subway_score"] = result["subway_score"].fillna(np.nan)
+
+    result["combined_score"] = combined_scores(result["subway_score"],
+                                               result["taxi_score"])
+
+    result["combined_level"] = result["combined_score"].round().astype(int).map(SCORE_TO_LEVEL)
+    result["subway_level"] = result["subway_level"].fillna("No Data")
+    result["taxi_level"] = result["taxi_level"].fillna("No Data")
+    return result
+
+def predict_results(moments):
+    """Run both models over a list of (ts, weather) moments.
+
+    Returns (results, complete): one result frame per moment, and False if
+    either model failed (its levels are then "No Data" for every moment).
+    """
+    complete = True
+    subway_levels = [empty_levels(SUBWAY_LEVEL_COLUMNS)] * len(moments)
+    taxi_levels = [empty_levels(TAXI_LEVEL_COLUMNS)] * len(moments)
+
+    try:
+        subway_levels = predict_subway_levels(moments)
+    except Exception as e:
+        print("Subway model failed:", e)
+        complete = False
+
+    try:
+        taxi_levels = predict_taxi_levels(moments)
+    except Exception as e:
+        print("Taxi model failed:", e)
+        complete = False
+
+    with stage_timer("scoring"):
+        results = [combine_levels(t, s) for t, s in zip(taxi_levels, subway_levels)]
+    return results, complete
+
+def build_payload(ts, weather, result):
+    """Prepared FeatureCollection for one hour.
+
+    Properties are encoded now; geometry is added per level at render.
+    """
+    with stage_timer("serialization"):
+        return geojson.prepare(result, ts, weather)
+
+def json_response(body, status=200, mimetype=None):
+    """Response for pre-serialized JSON (or other) bytes"""
+    return app.response_class(body, status=status,
+                              mimetype=mimetype or app.json.mimetype)
+
+def render_representation(prepared, representation=None):
+    """Body of a prepared snapshot in a representation; tiles go to the tile encoder"""
+    if representation is not None and representation.format == "mvt":
+        return tile_encoder.render(prepared.result, representation.tile,
+                                   representation.fields)
+    return geojson.render_representation(prepared, representation)
+
+def stored_representation(representation):
+    """True if a representation's bodies are kept on the cached snapshot.
+
+    Only the default field sets are kept (full GeoJSON at each geometry
+    detail, and the default columnar body), so their number is fixed.
+    `fields` projections and tiles are open-ended and rendered per request;
+    tile geometry is already cached by the tile encoder.
+    """
+    if representation is None:
+        return True
+    return representation.fields is None and representation.tile is None
+
+def encode_snapshot(cache_key, prepared):
+    """Cacheable snapshot: strong ETag, lazily rendered representations and encodings"""
+    return EncodedSnapshot(prepared, snapshot_etag(cache_key, MODEL_VERSION),
+                           render_representation, keep=stored_representation)
+
+def not_modified(etag, representation=None):
+    """True if a GET or HEAD If-None-Match covers any encoding of the representation"""
+    if request.method not in ('GET', 'HEAD') or not request.if_none_match:
+        return False
+    variant = representation_name(representation)
+    return any(request.if_none_match.contains_weak(variant_etag(etag, e, variant))
+               for e in ["identity", "gzip", "br"])
+
+def snapshot_response(snapshot, representation=None, mimetype=None):
+    """Snapshot in a representation and the client's best encoding, with ETag"""
+    encoding = negotiate_encoding(request.accept_encodings)
+    # Stored representations are rendered and compressed on first use; later
+    # requests read the stored bytes. Projections and tiles render every time.
+    with stage_timer("serialization"):
+        body = snapshot.encoded(encoding, representation)
+    response = json_response(body, mimetype=mimetype)
+    if encoding != "identity":
+        response.headers['Content-Encoding'] = encoding
+    variant = representation_name(representation)
+    response.set_etag(variant_etag(snapshot.etag, encoding, variant))
+    response.vary.add('Accept-Encoding')
+    return response
+
+def not_modified_response(etag, representation=None):
+    encoding = negotiate_encoding(request.accept_encodings)
+    response = app.response_class(status=304)
+    response.set_etag(variant_etag(etag, encoding, representation_name(representation)))
+    response.vary.add('Accept-Encoding')
+    return response
+
+def build_snapshots(moments):
+    """Payloads for several (ts, weather) moments from one batched model run"""
+    results, complete = inference_executor.run(predict_results, moments)
+    payloads = [build_payload(ts, weather, result)
+                for (ts, weather), result in zip(moments, results)]
+    return payloads, complete
+
+def build_snapshot(ts, weather):
+    """Run both models for one hour and build the FeatureCollection payload.
+
+    Returns (payload, complete) where complete is False if either model failed.
+    """
+    payloads, complete = build_snapshots([(ts, weather)])
+    return payloads[0], complete
+
+def compute_snapshot(cache_key, ts, weather):
+    """(snapshot, payload) for one hour, cached when complete.
+
+    snapshot is None if a model failed. The snapshot is built for the start
+    of ts's hour, so properties.timestamp is that hour rather than the
+    requested time: every request in the hour gets the same bytes under the
+    same strong ETag, and the models only use the hour anyway.
+    """
+    # A leader may have cached the hour between our cache miss and this flight.
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        return cached, cached.source
+    payload, complete = build_snapshot(hour_bucket(ts), weather)
+    if not complete:
+        return None, payload
+    snapshot = encode_snapshot(cache_key, payload)
+    prediction_cache.put(cache_key, snapshot)
+    return snapshot, payload
+
+def shared_snapshots(moments, ttl_seconds=None):
+    """{cache_key: (snapshot, payload)} for {cache_key: (hour, weather)}.
+
+    All the hours go through one stacked model run.
+    Keys another thread is already computing are waited on rather than
+    recomputed. Snapshot is None (and nothing is cached) if a model failed.
+    """
+    flights = {cache_key: snapshot_flights.begin(cache_key) for cache_key in moments}
+    mine = [cache_key for cache_key, (_, leader) in flights.items() if leader]
+    if mine:
+        try:
+            payloads, complete = build_snapshots([moments[cache_key]
+                                                  for cache_key in mine])
+        except BaseException as e:
+            for cache_key in mine:
+                snapshot_flights.finish(cache_key, error=e)
+            raise
+        for cache_key, payload in zip(mine, payloads):
+            snapshot = None
+            if complete:
+                snapshot = encode_snapshot(cache_key, payload)
+                prediction_cache.put(cache_key, snapshot, ttl_seconds=ttl_seconds)
+            snapshot_flights.finish(cache_key, (snapshot, payload))
+    return {cache_key: future.result() for cache_key, (future, _) in flights.items()}
 
 # ----------------------------------------
 # Root and health endpoints
@@ -218,7 +524,17 @@ def root():
         "version": "1.0.0",
         "endpoints": {
             "/predict-all": "GET/POST - Get busyness predictions for all Manhattan zones",
-            "/health": "GET - Health check endpoint"
+            "/predict-batch": (
+                "POST - Get predictions for a list or range of timestamps"
+            ),
+            "/tiles/<z>/<x>/<y>.mvt": "GET - Zone busyness as a Mapbox vector tile",
+            "/health": "GET - Health check endpoint",
+            "/metrics": (
+                "GET - Request and per-stage latency metrics (Prometheus text format)"
+            ),
+            "/debug/profiles/<id>": (
+                "GET - cProfile report of a request sent with X-Profile-Token"
+            )
         },
         "status": "running"
     })
@@ -234,7 +550,20 @@ def health_check():
             'model_loaded': True,
             'zones_count': len(zones_df),
             'environment': os.getenv('FLASK_ENV', 'development'),
-            'weather_api_configured': bool(WEATHER_API_KEY)
+            'weather_api_configured': bool(WEATHER_API_KEY),
+            'model_backend': MODEL_BACKEND,
+            'model_version': MODEL_VERSION,
+            'prediction_cache': prediction_cache.stats(),
+            'single_flight': snapshot_flights.stats(),
+            'calendar_table': calendar_table.stats(),
+            'inference_executor': inference_executor.stats(),
+            'serializer': geojson.stats(),
+            'vector_tiles': tile_encoder.stats(),
+            'weather_refresher': weather_refresher.status(),
+            'horizon_precompute': horizon_precomputer.status(),
+            'request_profiler': request_profiler.stats(),
+            'logging': logging_stats(),
+            'process_memory': memory_usage()
         }
         log_with_context('info', 'Health check completed successfully', {'zones_count': len(zones_df)})
         return jsonify(health_data), 200
@@ -242,12 +571,37 @@ def health_check():
         log_with_context('error', f'Health check failed with exception: {str(e)}', {'error_type': type(e).__name__})
         return jsonify({'status': 'unhealthy','error': str(e),'timestamp': datetime.now().isoformat()}), 500
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return app.response_class(REGISTRY.render(), mimetype=None,
+                              content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/debug/profiles/<profile_id>', methods=['GET'])
+def profile_report(profile_id):
+    # Not found, rather than forbidden, so the route gives nothing away without
+    # the secret.
+    report = None
+    if request_profiler.authorized(request.headers.get(PROFILE_HEADER)):
+        report = request_profiler.load(profile_id)
+    if report is None:
+        return jsonify({'error': 'Not found'}), 404
+    return app.response_class(report, mimetype='text/plain')
+
 # ----------------------------------------
-# Prediction endpoint
+# Prediction endpoints
 # ----------------------------------------
-@app.route('/predict-all', methods=['POST'])
-@with_request_tracking
-def predict_all():
+@app.errorhandler(InferenceBusy)
+def inference_busy(e):
+    log_with_context('warn', 'Inference queue full, request rejected',
+                     {'error': str(e)})
+    return jsonify({'error': 'Server busy, retry shortly'}), 503, {'Retry-After': '1'}
+
+BATCH_MAX_HOURS = int(os.getenv('BATCH_MAX_HOURS', '48'))
+PRECOMPUTE_CHUNK_HOURS = 24
+
+@stage_timer("auth")
+def authorize_request():
+    """Check the Bearer token. Returns None when allowed, otherwise an error response"""
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
         return {'error': 'Missing or invalid token'}, 401
@@ -262,86 +616,266 @@ def predict_all():
             return jsonify({'error': 'Invalid token'}), 403
         except Exception as e:
             return jsonify({"error": str(e)}), 500
-
-    time = int(request.args.get("timestamp")) if request.args.get("timestamp") else None
-    ts = datetime.fromtimestamp(time, tz=timezone.utc).astimezone(ZoneInfo("America/New_York")) if time else datetime.now(ZoneInfo("America/New_York"))
-    weather = fetch_weather(time)
-
-    subway_level_df = pd.DataFrame()
-    taxi_level_df = pd.DataFrame()
+    return None
+
+def local_time(time):
+    """NY-local datetime for a unix timestamp, or now when time is None"""
+    new_york = ZoneInfo("America/New_York")
+    if not time:
+        return datetime.now(new_york)
+    return datetime.fromtimestamp(time, tz=timezone.utc).astimezone(new_york)
+
+def parse_batch_timestamps(body, args):
+    """Timestamps from a JSON `timestamps` list or a `start`/`end`/`step` range.
+
+    The range may come from the body or the query string. A body that is
+    itself a JSON list is taken as the timestamps.
+    """
+    if isinstance(body, list):
+        body = {"timestamps": body}
+    elif not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object or a list of timestamps")
+    timestamps = body.get("timestamps")
+    if timestamps is None:
+        start = body.get("start", args.get("start"))
+        end = body.get("end", args.get("end"))
+        step = body.get("step", args.get("step", 3600))
+        if start is None or end is None:
+            raise ValueError("Provide 'timestamps' or 'start' and 'end'")
+        start, end, step = int(start), int(end), int(step)
+        if step <= 0:
+            raise ValueError("'step' must be positive")
+        # Refuse huge ranges before materialising them.
+        if (end - start) // step + 1 > BATCH_MAX_HOURS:
+            raise ValueError(f"At most {BATCH_MAX_HOURS} timestamps per batch")
+        timestamps = list(range(start, end + 1, step))
+
+    if not isinstance(timestamps, list):
+        raise ValueError("'timestamps' must be a list")
+    timestamps = [int(t) for t in timestamps]
+    if not timestamps:
+        raise ValueError("No timestamps requested")
+    if len(timestamps) > BATCH_MAX_HOURS:
+        raise ValueError(f"At most {BATCH_MAX_HOURS} timestamps per batch")
+    return timestamps
+
+def parse_detail_level(args):
+    """Geometry detail from `precision` (digits) and `simplify` (degrees).
+
+    None means full detail.
+    """
+    precision = args.get("precision", "full")
+    simplify = args.get("simplify", "0")
+    digits = None if precision in ("", "full") else int(precision)
+    level = (digits, float(simplify or 0))
+    if not geojson.has_level(level):
+        precisions = ['full'] + [p for p in PRECISIONS if p is not None]
+        raise ValueError(
+            f"Unsupported geometry detail; precision must be one of "
+            f"{precisions} and simplify one of {list(TOLERANCES)}"
+        )
+    return None if level == FULL_DETAIL else level
+
+OUTPUT_FORMATS = ("geojson", "columnar")
+RESULT_FIELDS = ["PULocationID", "taxi_level", "taxi_score", "centroid_lat",
+                 "centroid_lon", "subway_level", "subway_score", "combined_score",
+                 "combined_level"]
+
+def parse_fields(args, allowed):
+    """Fields from a comma-separated `fields` param, in the order of allowed.
+
+    None if the param is absent.
+    """
+    if not args.get("fields"):
+        return None
+    requested = {f.strip() for f in args["fields"].split(",") if f.strip()}
+    unknown = sorted(requested - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}; expected any of {allowed}")
+    return tuple(f for f in allowed if f in requested)
+
+def parse_representation(args):
+    """Representation from `format`, `fields` and the geometry detail params.
+
+    Returns None for the default (full GeoJSON). Fields are put in a fixed
+    order so equivalent requests share one ETag.
+    """
+    output_format = args.get("format", "geojson").lower()
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported format '{output_format}'; "
+                         f"expected one of {list(OUTPUT_FORMATS)}")
+
+    allowed = RESULT_FIELDS + (["geometry"] if output_format == "geojson" else [])
+    fields = parse_fields(args, allowed)
+    level = parse_detail_level(args)
+    if output_format == "columnar" and level is not None:
+        raise ValueError("precision and simplify only apply to GeoJSON output")
+    if output_format == "geojson" and fields is None and level is None:
+        return None
+    return Representation(output_format, fields, level)
+
+def precompute_horizon(snapshot):
+    """Fill the prediction cache for the current hour and each forecast hour"""
+    moments = []
+    if snapshot.current is not None:
+        moments.append((local_time(None), weather_summary(snapshot.current)))
+    for dt, entry in sorted(snapshot.forecast.items()):
+        moments.append((local_time(dt), weather_summary(entry)))
+
+    # Keep precomputed hours until well after the next forecast should arrive.
+    ttl = max(prediction_cache.ttl_seconds, 2 * weather_refresher.interval_seconds)
+    hours = 0
+    for start in range(0, len(moments), PRECOMPUTE_CHUNK_HOURS):
+        chunk = OrderedDict(
+            (snapshot_key(ts, weather), (hour_bucket(ts), weather))
+            for ts, weather in moments[start:start + PRECOMPUTE_CHUNK_HOURS]
+        )
+        built = shared_snapshots(chunk, ttl_seconds=ttl)
+        if any(snapshot is None for snapshot, _ in built.values()):
+            raise RuntimeError("Model failure during forecast precompute")
+        hours += len(chunk)
+    return hours
+
+@app.route('/predict-all', methods=['GET', 'POST'])
+@with_request_tracking
+def predict_all():
+    error = authorize_request()
+    if error:
+        return error
 
     try:
-        subway_df = create_subway_features(ts, weather)
-        subway_df["predicted"] = subway_model.predict(subway_df[subway_features])
-        subway_df = subway_df.merge(station_to_zone, on="station_complex_id")
-        subway_zone = subway_df.groupby("PULocationID")["predicted"].sum().reset_index()
-        subway_zone["hour"] = ts.hour
-        subway_zone["day_of_week"] = ts.weekday()
-
-        subway_zone = subway_zone.merge(subway_busyness, on=["PULocationID", "hour", "day_of_week"], how="left")
-        subway_zone["subway_level"] = subway_zone.apply(lambda r: classify_level(r["predicted"], r["p10"], r["p25"], r["p50"], r["p75"], r["p90"]), axis=1)
-        subway_zone["subway_score"] = subway_zone["subway_level"].map(LEVEL_TO_SCORE)
-        subway_level_df = subway_zone[["PULocationID", "subway_level", "subway_score"]]
-    except Exception as e:
-        print("Subway model failed:", e)
+        representation = parse_representation(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
+    time = int(request.args.get("timestamp")) if request.args.get("timestamp") else None
+    return serve_snapshot(time, representation)
+
+@app.route('/tiles/<int:z>/<int:x>/<int:y>.mvt', methods=['GET'])
+@with_request_tracking
+def vector_tile(z, x, y):
+    error = authorize_request()
+    if error:
+        return error
+
+    if not valid_tile(z, x, y):
+        return jsonify({'error': f'No tile {z}/{x}/{y}; zoom must be 0-{MAX_ZOOM} '
+                                 f'and x, y below 2^zoom'}), 400
     try:
-        taxi_df = create_taxi_features(zones_df["OBJECTID"].unique(), ts, weather)
-        taxi_df["predicted"] = taxi_model.predict(taxi_df.drop(columns=["geometry"]))
-        taxi_df["hour"] = ts.hour
-        taxi_df["day_of_week"] = ts.weekday()
-
-        taxi_df = taxi_df.merge(taxi_busyness, on=["PULocationID", "hour", "day_of_week"], how="left")
-
-        taxi_df.loc[
-            (taxi_df["predicted"] < HIGH_THRESHOLD) &
-            (taxi_df["p75"] > HIGH_THRESHOLD),
-            "predicted"
-        ] *= CORRECTION_FACTOR
-
-        taxi_df["taxi_level"] = taxi_df.apply(lambda r: classify_level(r["predicted"], r["p10"], r["p25"], r["p50"], r["p75"], r["p90"]), axis=1)
-        taxi_df["taxi_score"] = taxi_df["taxi_level"].map(LEVEL_TO_SCORE)
-        taxi_level_df = taxi_df[["PULocationID", "taxi_level", "taxi_score", "centroid_lat", "centroid_lon", "geometry"]]
-    except Exception as e:
-        print("Taxi model failed:", e)
+        fields = parse_fields(request.args, RESULT_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    result = pd.merge(taxi_level_df, subway_level_df, on="PULocationID", how="outer")
-    result["taxi_score"] = result["taxi_score"].fillna(np.nan)
-    result["subway_score"] = result["subway_score"].fillna(np.nan)
+    # Tiles away from Manhattan are empty whatever the predictions say.
+    if not tile_encoder.has_features(z, x, y):
+        return '', 204
 
-    result["combined_score"] = result.apply(
-        lambda r: (
-            r["taxi_score"] if np.isnan(r["subway_score"]) and not np.isnan(r["taxi_score"]) else
-            r["subway_score"] if np.isnan(r["taxi_score"]) and not np.isnan(r["subway_score"]) else
-            0.7 * r["subway_score"] + 0.3 * r["taxi_score"] if not np.isnan(r["subway_score"]) and not np.isnan(r["taxi_score"]) else
-            2
-        ), axis=1
-    )
+    time = int(request.args.get("timestamp")) if request.args.get("timestamp") else None
+    representation = Representation("mvt", fields, tile=(z, x, y))
+    return serve_snapshot(time, representation, MVT_MIMETYPE)
 
-    result["combined_level"] = result["combined_score"].round().astype(int).map(SCORE_TO_LEVEL)
-    result["subway_level"] = result["subway_level"].fillna("No Data")
-    result["taxi_level"] = result["taxi_level"].fillna("No Data")
+def serve_snapshot(time, representation=None, mimetype=None):
+    """Prediction snapshot for a timestamp (None: now), cached and validated"""
+    ts = local_time(time)
+    weather = fetch_weather(time)
 
-    features = []
-    for _, row in result.iterrows():
-        geometry = OrderedDict()
-        geom = row.get("geometry", "")
-        if geom.startswith("POLYGON (("):
-            points = geom.replace("POLYGON ((", "").replace("))", "").split(", ")
-            coords = [[float(x), float(y)] for x, y in (p.split(" ") for p in points)]
-            geometry["type"] = "Polygon"
-            geometry["coordinates"] = [coords]
-        elif geom.startswith("MULTIPOLYGON (("):
-            geometry = mapping(wkt.loads(geom))
-        props = {k: (None if pd.isna(v) else v) for k, v in row.drop("geometry").items()}
-        feature = {"type": "Feature", "properties": props, "geometry": geometry}
-        features.append(feature)
+    cache_key = snapshot_key(ts, weather)
+    # The ETag only depends on the key, so a revalidation needs no snapshot at all.
+    etag = snapshot_etag(cache_key, MODEL_VERSION)
+    if not_modified(etag, representation):
+        snapshot_outcomes.inc(outcome='not_modified')
+        log_with_context('info', 'Prediction snapshot not modified',
+                         {'hour': cache_key[0]})
+        return not_modified_response(etag, representation)
+
+    snapshot = prediction_cache.get(cache_key)
+    if snapshot is None:
+        (snapshot, payload), shared = snapshot_flights.do(
+            cache_key, compute_snapshot, cache_key, ts, weather
+        )
+        snapshot_outcomes.inc(outcome='shared' if shared else 'miss')
+        if shared:
+            log_with_context('info',
+                             'Prediction snapshot shared with a concurrent request',
+                             {'hour': cache_key[0]})
+        # Only cache (and validate) snapshots where both models produced predictions.
+        if snapshot is None:
+            body = render_representation(payload, representation)
+            return json_response(body, mimetype=mimetype)
+    else:
+        snapshot_outcomes.inc(outcome='hit')
+        log_with_context('info', 'Prediction snapshot served from cache',
+                         {'hour': cache_key[0]})
+
+    return snapshot_response(snapshot, representation, mimetype)
+
+@app.route('/predict-batch', methods=['POST'])
+@with_request_tracking
+def predict_batch():
+    error = authorize_request()
+    if error:
+        return error
 
-    return jsonify({
-        "type": "FeatureCollection",
-        "properties": {"timestamp": ts, "weather": weather},
-        "features": features
+    try:
+        body = request.get_json(silent=True) or {}
+        timestamps = parse_batch_timestamps(body, request.args)
+        representation = parse_representation(request.args)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    keys = []
+    pending = OrderedDict()
+    payloads = {}
+    for time in timestamps:
+        ts = local_time(time)
+        weather = fetch_weather(time)
+        cache_key = snapshot_key(ts, weather)
+        keys.append(cache_key)
+        if cache_key in payloads or cache_key in pending:
+            continue
+        cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            payloads[cache_key] = cached.body(representation)
+        else:
+            pending[cache_key] = (hour_bucket(ts), weather)
+
+    # Every uncached hour goes through the models in a single stacked call.
+    if pending:
+        for cache_key, (snapshot, payload) in shared_snapshots(pending).items():
+            if snapshot is not None:
+                payloads[cache_key] = snapshot.body(representation)
+            else:
+                payloads[cache_key] = geojson.render_representation(
+                    payload, representation
+                )
+
+    log_with_context('info', 'Batch prediction completed', {
+        'requested': len(timestamps),
+        'computed': len(pending)
     })
+    return json_response(batch_body([payloads[cache_key] for cache_key in keys]))
+
+# ----------------------------------------
+# Background workers
+# ----------------------------------------
+# Precompute every forecast hour whenever the refresher publishes new weather.
+horizon_precomputer = HorizonPrecomputer(precompute_horizon)
+
+def start_background_workers():
+    """Start the opt-in refresher and precompute threads in this process"""
+    precompute = os.getenv('PRECOMPUTE_HORIZON', 'false').lower() == 'true'
+    if precompute and not horizon_precomputer.running:
+        weather_refresher.add_listener(horizon_precomputer.schedule)
+        horizon_precomputer.start()
+
+    refresh = os.getenv('WEATHER_REFRESH_ENABLED', 'false').lower() == 'true'
+    if refresh and not weather_refresher.running:
+        weather_refresher.start()
+
+# Threads don't survive fork, so a preloading gunicorn master leaves them to
+# each worker (see gunicorn.conf.py) instead of starting them at import.
+if os.getenv('START_BACKGROUND_WORKERS', 'true').lower() == 'true':
+    start_background_workers()
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
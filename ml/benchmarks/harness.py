@@ -0,0 +1,193 @@
+"""
+Benchmark Harness for ML API
+Latency percentiles, allocation counts and baseline comparison for pipeline benchmarks
+"""
+
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Benchmarks faster than this at p50 are too noisy to flag on a ratio alone.
+NOISE_FLOOR_MS = 0.05
+
+
+def percentiles(durations_ms):
+    """p50/p95/p99, mean and min of a list of durations in ms"""
+    values = np.asarray(durations_ms, dtype=float)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'mean_ms': round(float(values.mean()), 4),
+        'min_ms': round(float(values.min()), 4)
+    }
+
+
+def allocations(fn, setup=None, repeat=3):
+    """Peak and retained traced memory (KiB) of one call, the lowest of repeat calls.
+
+    Runs separately from the timed loop because tracemalloc slows every
+    allocation down. Retained memory is what the call left allocated
+    (caches it filled), peak is its high-water mark above the start.
+    """
+    peaks, retained = [], []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            base, _ = tracemalloc.get_traced_memory()
+            fn()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peaks.append((peak - base) / 1024)
+        retained.append((current - base) / 1024)
+    return {
+        'alloc_peak_kib': round(min(peaks), 1),
+        'alloc_retained_kib': round(min(retained), 1)
+    }
+
+
+def time_calls(fn, iterations, setup=None):
+    """Durations (ms) of iterations calls to fn(); setup() runs untimed before each"""
+    durations = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def warm_up(fn, warmup, setup=None):
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+
+
+def measure(fn, iterations=50, warmup=5, setup=None, trace_allocations=True):
+    """Time fn() iterations times after warmup calls; setup() runs untimed first"""
+    warm_up(fn, warmup, setup)
+    gc.collect()
+    durations = time_calls(fn, iterations, setup)
+    result = {'iterations': iterations, **percentiles(durations)}
+    if trace_allocations:
+        result.update(allocations(fn, setup))
+    return result
+
+
+def measure_all(benchmarks, iterations=50, warmup=5, rounds=5, trace_allocations=True,
+                progress=None):
+    """Results for {name: (fn, setup)}, with each benchmark's calls spread over rounds.
+
+    Every round times iterations / rounds calls of each benchmark in turn,
+    so a slow spell on the machine is shared across benchmarks instead of
+    landing on whichever one happened to be running.
+    """
+    for fn, setup in benchmarks.values():
+        warm_up(fn, warmup, setup)
+    per_round = [iterations // rounds + (1 if r < iterations % rounds else 0)
+                 for r in range(rounds)]
+    durations = {name: [] for name in benchmarks}
+    for count in per_round:
+        gc.collect()
+        for name, (fn, setup) in benchmarks.items():
+            durations[name] += time_calls(fn, count, setup)
+
+    results = {}
+    for name, (fn, setup) in benchmarks.items():
+        results[name] = {'iterations': iterations, **percentiles(durations[name])}
+        if trace_allocations:
+            results[name].update(allocations(fn, setup))
+        if progress is not None:
+            progress(name, results[name])
+    return results
+
+
+def environment(**extra):
+    """What the results were measured on, kept next to them"""
+    import pandas
+    import xgboost
+    return {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'xgboost': xgboost.__version__,
+        **extra
+    }
+
+
+def write_results(path, results, meta):
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'benchmarks': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=0.2, metrics=('p50_ms', 'p95_ms'),
+            gate=('p50_ms',)):
+    """Rows comparing results with a baseline's benchmarks.
+
+    A row regresses if a gate metric grew by more than threshold. The other
+    metrics are reported but not gated: tail percentiles over a few dozen
+    calls move too much between identical runs. Benchmarks
+    missing from either side are reported with regressed=False.
+    """
+    rows = []
+    for name in sorted(set(results) | set(baseline)):
+        new, old = results.get(name), baseline.get(name)
+        row = {'name': name, 'regressed': False, 'changes': {}}
+        if new is None or old is None:
+            row['missing'] = 'baseline' if old is None else 'results'
+            rows.append(row)
+            continue
+        for metric in metrics:
+            if not old.get(metric):
+                continue
+            ratio = new[metric] / old[metric]
+            row['changes'][metric] = round(ratio - 1, 4)
+            grew = ratio > 1 + threshold and new[metric] - old[metric] > NOISE_FLOOR_MS
+            if metric in gate and grew:
+                row['regressed'] = True
+        rows.append(row)
+    return rows
+
+
+def format_table(results, rows=None):
+    """Plain-text table of results, with the change against the baseline if compared"""
+    changes = {row['name']: row for row in rows or []}
+    lines = [f"{'benchmark':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+             f"{'peak KiB':>11}{'kept KiB':>10}  vs baseline"]
+    for name, r in results.items():
+        row = changes.get(name)
+        if row is None:
+            note = ''
+        elif 'missing' in row:
+            note = 'new'
+        else:
+            note = '  '.join(f"{metric[:3]} {change:+.0%}"
+                             for metric, change in row['changes'].items())
+            note += '  REGRESSED' if row['regressed'] else ''
+        lines.append(
+            f"{name:<26}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}"
+            f"{r.get('alloc_peak_kib', float('nan')):>11.1f}"
+            f"{r.get('alloc_retained_kib', float('nan')):>10.1f}  {note}"
+        )
+    return '\n'.join(lines)
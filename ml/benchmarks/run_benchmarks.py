@@ -0,0 +1,173 @@
+"""
+Pipeline Benchmarks for ML API
+Times each prediction stage and the full /predict-all request on the real models
+and tables
+
+Usage (from ml/):
+    python -m benchmarks.run_benchmarks                  # compare with baseline.json
+    python -m benchmarks.run_benchmarks --only taxi_predict --iterations 200
+    python -m benchmarks.run_benchmarks --save-baseline  # store this run as baseline
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from .harness import (
+    compare,
+    environment,
+    format_table,
+    load_results,
+    measure_all,
+    write_results
+)
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+ML_DIR = BENCHMARKS_DIR.parent
+BASELINE = BENCHMARKS_DIR / "baseline.json"
+RESULTS = BENCHMARKS_DIR / "results.json"
+
+# A fixed hour and OpenWeather entry, so runs are comparable and need no network.
+TIMESTAMP = 1753430400
+OPENWEATHER_ENTRY = {
+    "weather": [{"main": "Rain"}],
+    "main": {"temp": 21.5, "feels_like": 21.0, "humidity": 64},
+    "wind": {"speed": 4.1}
+}
+
+
+def load_app():
+    """Import app.py with its real models and CSVs.
+
+    JWT checks, background threads and OpenWeather are switched off.
+    """
+    os.environ.setdefault('DEV_MODE', 'true')
+    os.environ.setdefault('LOG_SAMPLE_RATE', '0')
+    os.environ['START_BACKGROUND_WORKERS'] = 'false'
+    if str(ML_DIR) not in sys.path:
+        sys.path.insert(0, str(ML_DIR))
+    import app
+    app.weather_client.current = lambda: OPENWEATHER_ENTRY
+    app.weather_client.forecast_at = lambda dt: OPENWEATHER_ENTRY
+    return app
+
+
+def pipeline_benchmarks(app):
+    """{name: (fn, setup)} per stage, on inputs built once by the stages before it"""
+    ts = app.local_time(TIMESTAMP)
+    weather = app.fetch_weather(TIMESTAMP)
+    moments = [(ts, weather)]
+    zone_ids = app.zones_df["OBJECTID"].unique()
+
+    subway_X = app.subway_builder.matrix(moments)
+    taxi_X = app.create_taxi_features(zone_ids, ts, weather)[app.TAXI_FEATURES]
+    subway_levels = app.predict_subway_levels(moments)
+    taxi_levels = app.predict_taxi_levels(moments)
+    result = app.combine_levels(taxi_levels[0], subway_levels[0])
+    prepared = app.geojson.prepare(result, ts, weather)
+
+    client = app.app.test_client()
+    url = f"/predict-all?timestamp={TIMESTAMP}"
+    headers = {"Authorization": "Bearer benchmark"}
+
+    def predict_all():
+        response = client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"/predict-all returned {response.status_code}")
+        return response.get_data()
+
+    return {
+        'subway_matrix': (lambda: app.subway_builder.matrix(moments), None),
+        'taxi_features': (
+            lambda: app.create_taxi_features(zone_ids, ts, weather), None
+        ),
+        'subway_predict': (lambda: app.subway_predictor.predict(subway_X), None),
+        'taxi_predict': (lambda: app.taxi_predictor.predict(taxi_X), None),
+        'subway_levels': (lambda: app.predict_subway_levels(moments), None),
+        'taxi_levels': (lambda: app.predict_taxi_levels(moments), None),
+        'scoring': (
+            lambda: app.combine_levels(taxi_levels[0], subway_levels[0]), None
+        ),
+        'geojson_prepare': (
+            lambda: app.geojson.prepare(result, ts, weather), None
+        ),
+        'geojson_render': (
+            lambda: app.geojson.render_representation(prepared), None
+        ),
+        'predict_all_miss': (predict_all, app.prediction_cache.invalidate),
+        'predict_all_hit': (predict_all, None)
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the prediction pipeline on the real models"
+    )
+    parser.add_argument('--iterations', type=int, default=50,
+                        help="timed calls per benchmark")
+    parser.add_argument('--warmup', type=int, default=5,
+                        help="untimed calls before timing")
+    parser.add_argument('--rounds', type=int, default=5,
+                        help="rounds the timed calls are interleaved over")
+    parser.add_argument('--only', action='append', default=[],
+                        help="benchmark to run (repeatable)")
+    parser.add_argument('--output', type=Path, default=RESULTS,
+                        help="where to write the JSON results")
+    parser.add_argument('--baseline', type=Path, default=BASELINE,
+                        help="results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.3,
+                        help="relative p50 growth that counts as a regression "
+                             "(lower it on quiet, dedicated machines)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="also write the results to --baseline")
+    parser.add_argument('--no-allocations', action='store_true',
+                        help="skip the tracemalloc pass")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = load_app()
+    benchmarks = pipeline_benchmarks(app)
+    unknown = set(args.only) - set(benchmarks)
+    if unknown:
+        sys.exit(f"Unknown benchmarks: {', '.join(sorted(unknown))}; "
+                 f"choose from {', '.join(benchmarks)}")
+
+    if args.only:
+        benchmarks = {name: benchmarks[name] for name in benchmarks
+                      if name in args.only}
+
+    def progress(name, result):
+        print(f"{name}: p50 {result['p50_ms']:.3f} ms", file=sys.stderr)
+
+    rounds = max(1, min(args.rounds, args.iterations))
+    results = measure_all(benchmarks, args.iterations, args.warmup, rounds,
+                          trace_allocations=not args.no_allocations, progress=progress)
+
+    meta = environment(model_backend=app.MODEL_BACKEND, iterations=args.iterations,
+                       warmup=args.warmup, rounds=args.rounds)
+    write_results(args.output, results, meta)
+
+    rows = None
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = load_results(args.baseline)['benchmarks']
+        rows = compare(results, baseline, args.threshold)
+    print(format_table(results, rows))
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        write_results(args.baseline, results, meta)
+        print(f"Baseline written to {args.baseline}")
+    elif rows is not None:
+        regressed = [row['name'] for row in rows if row['regressed']]
+        if regressed:
+            print(f"Regressed by more than {args.threshold:.0%}: "
+                  f"{', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Gunicorn Configuration for ML API
+Preloads models and tables once in the master so forked workers share their pages
+"""
+
+import gc
+import os
+
+from utils.process_memory import describe, memory_usage
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+
+# Opt-in threaded serving. Each worker handles GUNICORN_THREADS requests at
+# once, so a request waiting on OpenWeather only holds one thread; model
+# calls go through a bounded pool of INFERENCE_WORKERS threads per worker,
+# which keeps throughput tied to CPU rather than to upstream latency.
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+if threads > 1:
+    os.environ.setdefault('INFERENCE_WORKERS', '1')
+    os.environ.setdefault('INFERENCE_QUEUE', str(threads))
+    os.environ.setdefault('OPENWEATHER_POOL_SIZE', str(threads))
+
+# Import app.py (models, CSVs, percentile indexes, geometry, serializer
+# levels) once in the master. Workers are forked from it and share those
+# pages copy-on-write instead of each loading its own copy.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+if preload_app:
+    # The refresher and precompute threads would only run in the master;
+    # post_worker_init starts them in every worker instead.
+    os.environ['START_BACKGROUND_WORKERS'] = 'false'
+    # No collections while the app loads, so the heap is laid out densely
+    # and stays untouched until it is frozen.
+    gc.disable()
+
+
+def when_ready(server):
+    """Master is loaded and about to fork the first workers"""
+    if preload_app:
+        # Move everything allocated so far into the permanent generation.
+        # The collector then never writes to those objects' headers in a
+        # worker, which would copy the shared pages.
+        gc.freeze()
+        gc.enable()
+        server.log.info(f"Froze {gc.get_freeze_count()} objects before forking")
+    server.log.info(f"Master memory: {describe(memory_usage())}")
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+
+def post_worker_init(worker):
+    """Worker has loaded (or inherited) the app"""
+    if preload_app:
+        import app
+        app.start_background_workers()
+    worker.log.info(f"Worker {worker.pid} memory: {describe(memory_usage())}")
@@ -0,0 +1,338 @@
+"""
+Load Test for ML API
+Drives /predict-all at a fixed request rate against gunicorn, with OpenWeather
+replaced by a local stub
+
+Usage (from ml/):
+    python -m loadtest.run_loadtest --workers 1,2,4 --rate 50 --duration 30
+    python -m loadtest.run_loadtest --workers 2 --threads 8 \
+        --weather-latency-ms 300 --weather-error-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import random
+import secrets
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import requests
+from dotenv import dotenv_values
+
+from .stub_weather import (
+    FORECAST_HOURS,
+    StubWeatherServer,
+    add_arguments,
+    hour_start
+)
+from .tokens import auth_header, mint_token
+
+ML_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_MIX = "now=0.6,forecast=0.3,historical=0.1"
+
+
+class TimestampMix:
+    """Weighted mix of the timestamps clients send.
+
+    now: no timestamp (current conditions); forecast: an hour within the
+    stub's forecast horizon; historical: an hour in the past year, which
+    has no forecast entry and takes the default-weather path.
+    """
+
+    KINDS = ("now", "forecast", "historical")
+
+    def __init__(self, weights):
+        unknown = set(weights) - set(self.KINDS)
+        if unknown:
+            raise ValueError(
+                f"Unknown timestamp kinds: {', '.join(sorted(unknown))}; "
+                f"use {', '.join(self.KINDS)}"
+            )
+        if any(w < 0 for w in weights.values()) or not sum(weights.values()):
+            raise ValueError(
+                "Timestamp mix weights must be non-negative and not all zero"
+            )
+        self.kinds = list(weights)
+        self.weights = [weights[kind] for kind in self.kinds]
+
+    @classmethod
+    def parse(cls, text):
+        """From "now=0.6,forecast=0.3,historical=0.1" """
+        weights = {}
+        for part in text.split(","):
+            kind, _, weight = part.partition("=")
+            weights[kind.strip()] = float(weight)
+        return cls(weights)
+
+    def timestamp(self, rng, now):
+        """A timestamp to request (None for now), drawn from the mix"""
+        kind = rng.choices(self.kinds, self.weights)[0]
+        if kind == "now":
+            return None
+        if kind == "forecast":
+            return hour_start(now) + 3600 * rng.randrange(1, FORECAST_HOURS)
+        return hour_start(now) - 3600 * rng.randrange(1, 24 * 365)
+
+
+def percentiles_ms(values):
+    if not values:
+        return None
+    p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+    return {
+        'p50': round(float(p50), 2),
+        'p90': round(float(p90), 2),
+        'p95': round(float(p95), 2),
+        'p99': round(float(p99), 2),
+        'max': round(float(max(values)), 2)
+    }
+
+
+def drive(base_url, rate, duration, headers, mix, concurrency=64, timeout=30.0,
+          seed=0):
+    """Send rate requests per second for duration seconds.
+
+    Returns (samples, elapsed seconds).
+
+    Arrivals follow a fixed schedule whatever the responses do (open loop),
+    and latency counts from the scheduled send time, so time spent queued
+    behind a slow server is included rather than hidden.
+    Each sample is (latency_ms, service_ms, status), status being the
+    HTTP status or the exception name.
+    """
+    rng = random.Random(seed)
+    sessions = threading.local()
+    samples = []
+    lock = threading.Lock()
+
+    def send(scheduled, url):
+        session = getattr(sessions, "session", None)
+        if session is None:
+            session = sessions.session = requests.Session()
+        sent = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+            status = response.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        done = time.perf_counter()
+        with lock:
+            samples.append(((done - scheduled) * 1000, (done - sent) * 1000, status))
+
+    total = int(rate * duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="loadtest") as pool:
+        for i in range(total):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            ts = mix.timestamp(rng, time.time())
+            url = f"{base_url}/predict-all"
+            if ts is not None:
+                url += f"?timestamp={ts}"
+            pool.submit(send, scheduled, url)
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples, elapsed):
+    """Throughput, latency distribution and error rate of one run"""
+    statuses = Counter(str(status) for _, _, status in samples)
+    ok = [s for s in samples if isinstance(s[2], int) and s[2] < 400]
+    return {
+        'requests': len(samples),
+        'elapsed_s': round(elapsed, 2),
+        'throughput_rps': round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        'error_rate': round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        'statuses': dict(statuses),
+        'latency_ms': percentiles_ms([s[0] for s in ok]),
+        'service_ms': percentiles_ms([s[1] for s in ok])
+    }
+
+
+class ApiServer:
+    """gunicorn serving app.py with the given worker count, pointed at the stub"""
+
+    def __init__(self, port, workers, threads, env, log_path):
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.env = env
+        self.log_path = log_path
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, ready_timeout=120):
+        env = {
+            **os.environ,
+            **self.env,
+            'PORT': str(self.port),
+            'GUNICORN_WORKERS': str(self.workers),
+            'GUNICORN_THREADS': str(self.threads)
+        }
+        log = open(self.log_path, "w")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py",
+             "app:app"],
+            cwd=ML_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+        log.close()
+        deadline = time.monotonic() + ready_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    f"gunicorn exited with {self.process.returncode}; "
+                    f"see {self.log_path}"
+                )
+            try:
+                if requests.get(f"{self.url}/health", timeout=2).status_code == 200:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.5)
+        self.stop()
+        raise RuntimeError(
+            f"gunicorn not ready after {ready_timeout}s; see {self.log_path}"
+        )
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+
+def jwt_secret(explicit=None):
+    """The secret the API will verify with; app.py loads ml/.env over the environment"""
+    return (explicit or dotenv_values(ML_DIR / ".env").get("JWT_SECRET")
+            or os.getenv("JWT_SECRET") or secrets.token_hex(32))
+
+
+def format_table(runs):
+    lines = [
+        f"{'workers':>8}{'threads':>8}{'target/s':>10}{'done/s':>9}{'errors':>8}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        f"{'weather':>9}{'failed':>8}"
+    ]
+    for run in runs:
+        latency = run['latency_ms'] or dict.fromkeys(
+            ['p50', 'p95', 'p99', 'max'], float('nan')
+        )
+        lines.append(
+            f"{run['workers']:>8}{run['threads']:>8}"
+            f"{run['target_rps']:>10.1f}{run['throughput_rps']:>9.1f}"
+            f"{run['error_rate']:>8.1%}"
+            f"{latency['p50']:>9.1f}{latency['p95']:>9.1f}"
+            f"{latency['p99']:>9.1f}{latency['max']:>9.1f}"
+            f"{run['weather_requests']:>9}{run['weather_errors']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load-test /predict-all against gunicorn with a stub OpenWeather"
+    )
+    parser.add_argument('--workers', default="1,2,4",
+                        help="comma-separated gunicorn worker counts to test")
+    parser.add_argument('--threads', type=int, default=1,
+                        help="GUNICORN_THREADS per worker")
+    parser.add_argument('--rate', type=float, default=50.0,
+                        help="target requests per second")
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help="measured seconds per worker count")
+    parser.add_argument('--warmup', type=float, default=5.0,
+                        help="unmeasured seconds at the same rate first")
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help="most requests in flight from the client")
+    parser.add_argument('--timeout', type=float, default=30.0,
+                        help="client timeout per request")
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help="timestamp mix, as kind=weight pairs")
+    parser.add_argument('--port', type=int, default=5077, help="port for gunicorn")
+    parser.add_argument('--jwt-secret',
+                        help="JWT_SECRET for the API "
+                             "(default: ml/.env, $JWT_SECRET or random)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, help="write the results as JSON")
+    parser.add_argument('--log-dir', type=Path, default=Path("/tmp"),
+                        help="where gunicorn logs go")
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mix = TimestampMix.parse(args.mix)
+    secret = jwt_secret(args.jwt_secret)
+    ttl_seconds = int(args.warmup + args.duration) * 10 + 3600
+    headers = auth_header(mint_token(secret, ttl_seconds=ttl_seconds))
+
+    stub = StubWeatherServer(
+        latency_ms=args.weather_latency_ms,
+        jitter_ms=args.weather_jitter_ms,
+        error_rate=args.weather_error_rate,
+        error_status=args.weather_error_status,
+        seed=args.seed
+    ).start()
+    env = {
+        'OPENWEATHER_BASE_URL': stub.url,
+        'OPENWEATHER_API_KEY': 'loadtest',
+        'JWT_SECRET': secret,
+        'DEV_MODE': 'false'
+    }
+    runs = []
+    try:
+        for workers in [int(w) for w in args.workers.split(",")]:
+            log_path = args.log_dir / f"loadtest-gunicorn-{workers}w.log"
+            server = ApiServer(args.port, workers, args.threads, env, log_path)
+            server.start()
+            try:
+                print(f"{workers} worker(s): warming up {args.warmup:.0f}s, "
+                      f"measuring {args.duration:.0f}s at {args.rate:g} req/s",
+                      file=sys.stderr)
+                drive(server.url, args.rate, args.warmup, headers, mix,
+                      args.concurrency, args.timeout, args.seed)
+                before = stub.stats()
+                samples, elapsed = drive(server.url, args.rate, args.duration, headers,
+                                         mix, args.concurrency, args.timeout,
+                                         args.seed + workers)
+                after = stub.stats()
+            finally:
+                server.stop()
+            runs.append({
+                'workers': workers,
+                'threads': args.threads,
+                'target_rps': args.rate,
+                **summarize(samples, elapsed),
+                'weather_requests': after['requests'] - before['requests'],
+                'weather_errors': after['errors'] - before['errors']
+            })
+    finally:
+        stub.stop()
+
+    print(format_table(runs))
+    if args.output:
+        config = {key: value for key, value in vars(args).items()
+                  if key not in ('jwt_secret', 'output', 'log_dir')}
+        results = {'config': config, 'runs': runs}
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Stub OpenWeather Server for ML API
+Local stand-in for the current and hourly forecast endpoints, with injected latency
+and errors
+
+Usage (from ml/):
+    python -m loadtest.stub_weather --port 5099 --weather-latency-ms 150 \
+        --weather-error-rate 0.02
+then start the API with OPENWEATHER_BASE_URL=http://127.0.0.1:5099
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WEATHER_TYPES = ["Clear", "Clouds", "Rain", "Drizzle", "Mist", "Snow"]
+FORECAST_HOURS = 96
+
+
+def hour_start(timestamp):
+    return int(timestamp) // 3600 * 3600
+
+
+def weather_entry(dt, rng):
+    """One OpenWeather current/forecast entry with the fields weather_summary reads"""
+    temp = round(rng.uniform(-5, 32), 2)
+    return {
+        "dt": dt,
+        "weather": [{"main": rng.choice(WEATHER_TYPES)}],
+        "main": {
+            "temp": temp,
+            "feels_like": round(temp - rng.uniform(0, 4), 2),
+            "humidity": rng.randrange(30, 95)
+        },
+        "wind": {"speed": round(rng.uniform(0, 12), 2)}
+    }
+
+
+class StubWeatherServer:
+    """Threaded HTTP server answering /weather and /forecast/hourly under any base path
+
+    Each request waits latency_ms plus up to jitter_ms, then fails with
+    error_status for an error_rate share of requests. The forecast covers
+    FORECAST_HOURS hour-aligned entries from the current hour, so API
+    requests for those hours find their `dt`; weather is random but fixed
+    per hour for a given seed.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0,
+                 error_rate=0.0, error_status=503, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body = stub.respond(self.path.split("?", 1)[0])
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _entry(self, dt):
+        # Same weather for an hour on every request, like a real forecast
+        # between updates.
+        return weather_entry(dt, random.Random(self.seed * 1_000_003 + dt))
+
+    def respond(self, path):
+        """(status, JSON body) for a request path, after the injected delay"""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if failed:
+            return self.error_status, {
+                "cod": self.error_status,
+                "message": "injected error"
+            }
+
+        now = hour_start(time.time())
+        if path.endswith("/forecast/hourly"):
+            entries = [self._entry(now + 3600 * h) for h in range(FORECAST_HOURS)]
+            return 200, {"list": entries}
+        if path.endswith("/weather"):
+            return 200, self._entry(now)
+        return 404, {"cod": 404, "message": "unknown endpoint"}
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={'poll_interval': 0.1},
+            name="stub-weather",
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self.requests, 'errors': self.errors}
+
+
+def add_arguments(parser):
+    parser.add_argument('--weather-latency-ms', type=float, default=100.0,
+                        help="delay before each stub response")
+    parser.add_argument('--weather-jitter-ms', type=float, default=50.0,
+                        help="extra random delay, up to this much")
+    parser.add_argument('--weather-error-rate', type=float, default=0.0,
+                        help="share of stub responses that fail")
+    parser.add_argument('--weather-error-status', type=int, default=503,
+                        help="HTTP status of injected failures")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub OpenWeather server")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--seed', type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    stub = StubWeatherServer(args.host, args.port, args.weather_latency_ms,
+                             args.weather_jitter_ms, args.weather_error_rate,
+                             args.weather_error_status, args.seed)
+    stub.start()
+    print(f"Stub OpenWeather at {stub.url} (set OPENWEATHER_BASE_URL to this)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
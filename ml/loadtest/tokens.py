@@ -0,0 +1,19 @@
+"""
+Load-Test Tokens for ML API
+Mints HS256 JWTs that authorize_request accepts
+"""
+
+import time
+
+import jwt
+
+
+def mint_token(secret, subject="loadtest", ttl_seconds=3600, now=None):
+    """Signed token for JWT_SECRET, valid for ttl_seconds"""
+    issued = int(now if now is not None else time.time())
+    claims = {"sub": subject, "iat": issued, "exp": issued + ttl_seconds}
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+def auth_header(token):
+    return {"Authorization": f"Bearer {token}"}
@@ -3,10 +3,12 @@ import sys, os
 import pytest
 import joblib
 import pandas as pd
+import numpy as np
 import json
 import builtins
 from io import StringIO
 import importlib
+from datetime import datetime, timezone
 
 # Set DEV_MODE to true by default for lightweight testing.
 os.environ.setdefault("DEV_MODE", "true")
@@ -62,6 +64,7 @@ builtins.open = fake_open
 
 # Import the app after mocks so tests use fake data.
 from ml import app as ml_app_module
+from ml.utils.geojson_serializer import PreparedCollection
 
 # Client fixture (DEV_MODE = true).
 @pytest.fixture
@@ -81,6 +84,26 @@ def auth_client(monkeypatch):
     monkeypatch.setitem(os.environ, "DEV_MODE", "true")
     importlib.reload(ml_app_module)
 
+# Snapshot stub fixture: stub(result=None, complete=True) makes build_snapshot
+# prepare result (or an empty collection) without the models, and returns the
+# list of hours it was called for.
+@pytest.fixture
+def stub_snapshots(monkeypatch):
+    def stub(result=None, complete=True):
+        calls = []
+        def fake_build(ts, weather):
+            calls.append(ts)
+            if result is None:
+                prepared = PreparedCollection(result=None, zone_ids=[], properties=[],
+                                              header=b"{}")
+            else:
+                stamp = datetime(2025, 1, 1, tzinfo=timezone.utc)
+                prepared = ml_app_module.geojson.prepare(result, stamp, weather)
+            return prepared, complete
+        monkeypatch.setattr(ml_app_module, "build_snapshot", fake_build)
+        return calls
+    return stub
+
 def test_auth_client_fixture(auth_client):
     """Smoke test to ensure auth_client runs fully and resets DEV_MODE."""
     response = auth_client.get("/")
@@ -98,23 +121,37 @@ def patch_predict_all_dependencies(monkeypatch):
         }])
     )
 
+    builder = ml_app_module.subway_builder
     monkeypatch.setattr(
-        "ml.app.create_subway_features",
-        lambda *a, **kw: pd.DataFrame([{
-            "PULocationID": 1,
-            "feature": 5
-        }])
+        builder,
+        "matrix",
+        lambda moments: np.full(
+            (len(moments) * builder.n_stations, len(builder.feature_names)),
+            5, dtype=np.float32
+        )
     )
 
+    fake_weather_response = type("R", (), {
+        "status_code": 200,
+        "raise_for_status": lambda self=None: None,
+        "json": lambda self=None: {
+            "weather": [{"main": "Clear"}],
+            "main": {"temp": 20, "feels_like": 20, "humidity": 50},
+            "wind": {"speed": 5}
+        }
+    })
+
+    # The weather client fetches through its pooled session.
     monkeypatch.setattr(
-        "ml.app.requests.get",
-        lambda url: type("R", (), {
-            "status_code": 200,
-            "raise_for_status": lambda self=None: None,
-            "json": lambda self=None: {
-                "weather": [{"main": "Clear"}],
-                "main": {"temp": 20, "feels_like": 20, "humidity": 50},
-                "wind": {"speed": 5}
-            }
-        })()
+        ml_app_module.weather_client.session,
+        "get",
+        lambda url, *a, **kw: fake_weather_response()
     )
+
+@pytest.fixture(autouse=True)
+def clear_prediction_cache():
+    ml_app_module.prediction_cache.invalidate()
+    ml_app_module.weather_client.clear()
+    yield
+    ml_app_module.prediction_cache.invalidate()
+    ml_app_module.weather_client.clear()
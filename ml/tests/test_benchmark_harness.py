@@ -0,0 +1,72 @@
+# Importing.
+import json
+
+from ml.benchmarks.harness import (
+    compare,
+    format_table,
+    load_results,
+    measure,
+    percentiles,
+    write_results
+)
+
+
+# Test: percentiles summarize durations in ms.
+def test_percentiles():
+    stats = percentiles(list(range(1, 101)))
+    assert stats["p50_ms"] == 50.5
+    assert stats["p99_ms"] == 99.01
+    assert stats["min_ms"] == 1
+
+
+# Test: measure runs warmup and timed calls, with setup before each, and traces
+# allocations.
+def test_measure():
+    calls = []
+    result = measure(lambda: calls.append(bytearray(64 * 1024)), iterations=10,
+                     warmup=2, setup=calls.clear)
+    assert result["iterations"] == 10
+    assert result["p50_ms"] >= 0
+    assert result["alloc_peak_kib"] >= 64
+    assert result["alloc_retained_kib"] >= 64
+
+
+# Test: p50 growing past the threshold (and the noise floor) is a regression.
+def test_compare():
+    baseline = {
+        "taxi_predict": {"p50_ms": 1.0, "p95_ms": 2.0},
+        "tail": {"p50_ms": 1.0, "p95_ms": 2.0},
+        "tiny": {"p50_ms": 0.001, "p95_ms": 0.002},
+        "gone": {"p50_ms": 1.0}
+    }
+    results = {
+        "taxi_predict": {"p50_ms": 1.3, "p95_ms": 3.0},
+        "tail": {"p50_ms": 1.0, "p95_ms": 9.0},
+        "tiny": {"p50_ms": 0.01, "p95_ms": 0.02},
+        "new": {"p50_ms": 1.0}
+    }
+    rows = {row["name"]: row for row in compare(results, baseline, threshold=0.2)}
+
+    assert rows["taxi_predict"]["regressed"]
+    assert rows["taxi_predict"]["changes"] == {"p50_ms": 0.3, "p95_ms": 0.5}
+    # Only p50 is gated; p95 is reported.
+    assert not rows["tail"]["regressed"]
+    assert not rows["tiny"]["regressed"]
+    assert rows["gone"]["missing"] == "results"
+    assert rows["new"]["missing"] == "baseline"
+
+
+# Test: results round-trip through JSON and print as a table with the comparison.
+def test_results_file_and_table(tmp_path):
+    results = {"taxi_predict": {
+        "iterations": 5, "p50_ms": 1.5, "p95_ms": 2.0, "p99_ms": 2.5,
+        "alloc_peak_kib": 50.9, "alloc_retained_kib": 1.0
+    }}
+    path = tmp_path / "results.json"
+    write_results(path, results, {"python": "3.11"})
+    assert load_results(path) == {"meta": {"python": "3.11"}, "benchmarks": results}
+    assert json.loads(path.read_text())["benchmarks"]["taxi_predict"]["p95_ms"] == 2.0
+
+    slower = {"taxi_predict": dict(results["taxi_predict"], p50_ms=3.0)}
+    table = format_table(slower, compare(slower, results))
+    assert "taxi_predict" in table and "REGRESSED" in table
@@ -0,0 +1,109 @@
+# Importing.
+import gzip
+from ml import app as ml_app_module
+
+AUTH_HEADER = {"Authorization": "Bearer dummy-token"}
+URL = "/predict-all?timestamp=3600"
+BODY = b'{"features":[],"properties":{},"type":"FeatureCollection"}'
+
+
+# Test: snapshots carry a strong ETag and Vary, and go out gzip-encoded when
+# accepted.
+def test_gzip_response_with_etag(client, stub_snapshots):
+    stub_snapshots()
+    resp = client.get(URL, headers={**AUTH_HEADER, "Accept-Encoding": "gzip"})
+
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    etag, weak = resp.get_etag()
+    assert etag.endswith("-gzip") and not weak
+    assert gzip.decompress(resp.data) == BODY
+
+
+# Test: a matching If-None-Match is a 304 without rebuilding the snapshot.
+def test_if_none_match_returns_304(client, stub_snapshots):
+    calls = stub_snapshots()
+    first = client.post(URL, headers=AUTH_HEADER)
+    etag = first.headers["ETag"]
+
+    resp = client.get(URL, headers={**AUTH_HEADER, "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert resp.headers["ETag"] == etag
+    assert len(calls) == 1
+    resp = client.head(URL, headers={**AUTH_HEADER, "If-None-Match": etag})
+    assert resp.status_code == 304
+
+    # The identity ETag also validates a gzip request for the same snapshot.
+    resp = client.get(URL, headers={**AUTH_HEADER, "If-None-Match": etag,
+                                    "Accept-Encoding": "gzip"})
+    assert resp.status_code == 304
+
+
+# Test: If-None-Match only applies to GET and HEAD; a POST always gets the body.
+def test_post_is_never_304(client, stub_snapshots):
+    stub_snapshots()
+    etag = client.get(URL, headers=AUTH_HEADER).headers["ETag"]
+
+    resp = client.post(URL, headers={**AUTH_HEADER, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.data == BODY
+
+
+# Test: requests within one hour share one snapshot, built for the start of the
+# hour.
+def test_snapshot_built_for_hour_start(client, stub_snapshots):
+    calls = stub_snapshots()
+    first = client.get("/predict-all?timestamp=1753432200", headers=AUTH_HEADER)
+    second = client.get("/predict-all?timestamp=1753433000", headers=AUTH_HEADER)
+
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert [ts.isoformat() for ts in calls] == ["2025-07-25T04:00:00-04:00"]
+
+
+# Test: another hour or stale tag gets a full response.
+def test_etag_mismatch_returns_body(client, stub_snapshots):
+    stub_snapshots()
+    etag = client.post(URL, headers=AUTH_HEADER).headers["ETag"]
+
+    other = client.post("/predict-all?timestamp=7200",
+                        headers={**AUTH_HEADER, "If-None-Match": etag})
+    assert other.status_code == 200
+    assert other.headers["ETag"] != etag
+    assert other.data == BODY
+
+
+# Test: snapshots with a failed model are neither cached nor validated.
+def test_incomplete_snapshot_has_no_etag(client, stub_snapshots):
+    stub_snapshots(complete=False)
+    resp = client.post(URL, headers={**AUTH_HEADER, "Accept-Encoding": "gzip"})
+
+    assert resp.status_code == 200
+    assert "ETag" not in resp.headers
+    assert "Content-Encoding" not in resp.headers
+    assert ml_app_module.prediction_cache.stats()["entries"] == 0
+
+
+# Test: each geometry detail level is its own representation with its own ETag.
+def test_detail_level_has_own_etag(client, stub_snapshots):
+    calls = stub_snapshots()
+    full = client.get(URL, headers=AUTH_HEADER).headers["ETag"]
+    low = client.get(f"{URL}&precision=4&simplify=0.0001", headers=AUTH_HEADER)
+
+    assert low.status_code == 200
+    assert low.headers["ETag"] != full
+    assert "p4-s0.0001" in low.headers["ETag"]
+    assert len(calls) == 1
+
+    resp = client.get(f"{URL}&precision=4&simplify=0.0001",
+                      headers={**AUTH_HEADER, "If-None-Match": full})
+    assert resp.status_code == 200
+
+
+# Test: unsupported precision or tolerance values are a 400.
+def test_unsupported_detail_level(client):
+    for query in ("precision=3", "simplify=0.3", "precision=abc"):
+        resp = client.get(f"{URL}&{query}", headers=AUTH_HEADER)
+        assert resp.status_code == 400
+        assert "error" in resp.get_json()
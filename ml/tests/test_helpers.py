@@ -1,6 +1,12 @@
 import pandas as pd
 import numpy as np
-from ml.app import create_subway_features, classify_level
+from ml.app import classify_level, subway_builder
+from ml.utils.subway_features import SubwayFeatureBuilder
+
+# conftest stubs subway_builder.matrix, so call the real method on the instance.
+def subway_feature_frame(ts, weather):
+    X = SubwayFeatureBuilder.matrix(subway_builder, [(ts, weather)])
+    return pd.DataFrame(X, columns=subway_builder.feature_names)
 
 # Test: prepare_subway_features handles a normal clear-weather case.
 def test_prepare_subway_features_basic():
@@ -12,7 +18,7 @@ def test_prepare_subway_features_basic():
         "weather_main": "Clear"
     }
 
-    df = create_subway_features(pd.Timestamp("2025-07-25 08:00:00"), weather)
+    df = subway_feature_frame(pd.Timestamp("2025-07-25 08:00:00"), weather)
 
     assert "hour" in df.columns
     assert "is_weekend" in df.columns
@@ -29,7 +35,7 @@ def test_prepare_subway_features_extremes():
         "weather_main": "Snow"
     }
 
-    df = create_subway_features(pd.Timestamp("2025-12-25 07:00:00"), weather)
+    df = subway_feature_frame(pd.Timestamp("2025-12-25 07:00:00"), weather)
 
     assert df.loc[0, "has_snow"] == 1
     assert df.loc[0, "is_freezing"] == 1
@@ -45,11 +51,11 @@ def test_prepare_subway_features_nan_temp():
         "weather_main": "Mist"
     }
 
-    df = create_subway_features(pd.Timestamp("2025-07-25 12:00:00"), weather)
+    df = subway_feature_frame(pd.Timestamp("2025-07-25 12:00:00"), weather)
 
-    # Instead of expecting NaN (the function maps to int), check the column exists and has a numeric value
+    # Instead of expecting NaN (the function maps to a band), check for a number
     assert "temp_category" in df.columns
-    assert isinstance(df.loc[0, "temp_category"], (int, np.integer))
+    assert not np.isnan(df.loc[0, "temp_category"])
 
 # Test: classify_combined_busyness returns correct labels for values below/above thresholds.
 def test_classify_combined_busyness_labels():
@@ -79,11 +85,11 @@ def test_prepare_subway_features_empty_station_df():
         "weather_main": "Clear"
     }
 
-    df = create_subway_features(pd.Timestamp("2025-07-25 15:00:00"), weather)
+    df = subway_feature_frame(pd.Timestamp("2025-07-25 15:00:00"), weather)
 
     assert isinstance(df, pd.DataFrame)
     assert set(["hour", "day_of_week", "month", "is_weekend"]).issubset(df.columns)
-    # remove df.empty check – it always returns rows from station_meta
+    # remove df.empty check – the builder always returns one row per station
 
 # Test: prepare_subway_features classifies very hot temperature as "hot".
 def test_prepare_subway_features_hot_temp():
@@ -95,6 +101,6 @@ def test_prepare_subway_features_hot_temp():
         "weather_main": "Clear"
     }
 
-    df = create_subway_features(pd.Timestamp("2025-07-25 14:00:00"), weather)
+    df = subway_feature_frame(pd.Timestamp("2025-07-25 14:00:00"), weather)
 
     assert df.loc[0, "temp_category"] == 4  # hot → numeric code 4
\ No newline at end of file
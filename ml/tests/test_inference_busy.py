@@ -0,0 +1,22 @@
+# Importing.
+from ml import app as ml_app_module
+
+AUTH_HEADER = {"Authorization": "Bearer dummy-token"}
+
+
+# Test: a full inference queue is a 503 with Retry-After instead of a 500.
+def test_busy_returns_503(client, monkeypatch):
+    def busy(ts, weather):
+        # app.py imports utils.* directly, so use its class rather than ml.utils's.
+        raise ml_app_module.InferenceBusy("queue full")
+    monkeypatch.setattr(ml_app_module, "build_snapshot", busy)
+    resp = client.get("/predict-all?timestamp=3600", headers=AUTH_HEADER)
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert "busy" in resp.get_json()["error"].lower()
+
+
+# Test: sync serving runs inference inline.
+def test_default_executor_is_inline():
+    assert ml_app_module.inference_executor.max_workers == 0
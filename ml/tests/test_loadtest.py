@@ -0,0 +1,112 @@
+# Importing.
+import random
+import time
+
+import jwt
+import pytest
+import requests
+
+from ml import app as ml_app_module
+from ml.loadtest.run_loadtest import TimestampMix, drive, summarize
+from ml.loadtest.stub_weather import (
+    FORECAST_HOURS,
+    StubWeatherServer,
+    hour_start
+)
+from ml.loadtest.tokens import auth_header, mint_token
+from ml.utils.weather_client import WeatherClient, weather_summary
+
+
+@pytest.fixture
+def stub():
+    server = StubWeatherServer().start()
+    yield server
+    server.stop()
+
+
+# Test: the stub answers the OpenWeather endpoints the client uses, with
+# hour-aligned forecast entries.
+def test_stub_serves_weather_client(stub):
+    client = WeatherClient("key", base_url=f"{stub.url}/data/2.5")
+    assert set(weather_summary(client.current())) == {
+        "temp", "feels_like", "humidity", "wind_speed", "weather_main"
+    }
+
+    hour = hour_start(time.time()) + 3600 * 5
+    assert client.forecast_at(hour)["dt"] == hour
+    assert len(client.forecast()) == FORECAST_HOURS
+    assert stub.stats() == {"requests": 2, "errors": 0}
+
+
+# Test: injected errors come back with the configured status, and latency is added.
+def test_stub_error_and_latency_injection():
+    stub = StubWeatherServer(latency_ms=50, error_rate=1.0, error_status=502).start()
+    try:
+        start = time.perf_counter()
+        # A plain session, since the injected error is what's under test.
+        response = requests.Session().get(f"{stub.url}/weather", timeout=5)
+        assert time.perf_counter() - start >= 0.05
+        assert response.status_code == 502
+        assert stub.stats() == {"requests": 1, "errors": 1}
+    finally:
+        stub.stop()
+
+
+# Test: minted tokens pass authorize_request when JWT is enforced.
+def test_minted_token_is_accepted(auth_client, monkeypatch):
+    monkeypatch.setattr(ml_app_module, "JWT_SECRET", "loadtest-secret")
+    # An invalid tile is rejected only after the token has been checked.
+    valid = auth_client.get("/tiles/1/9/9.mvt",
+                            headers=auth_header(mint_token("loadtest-secret")))
+    assert valid.status_code == 400
+
+    wrong = auth_client.get("/tiles/1/9/9.mvt",
+                            headers=auth_header(mint_token("other-secret")))
+    assert wrong.status_code == 403
+
+    token = mint_token("s", ttl_seconds=60, now=1000)
+    claims = jwt.decode(token, "s", algorithms=["HS256"],
+                        options={"verify_exp": False})
+    assert claims["exp"] - claims["iat"] == 60
+
+
+# Test: the timestamp mix draws each kind in range and validates its weights.
+def test_timestamp_mix():
+    mix = TimestampMix.parse("now=0.5,forecast=0.5")
+    rng = random.Random(1)
+    now = hour_start(time.time())
+    drawn = [mix.timestamp(rng, now) for _ in range(200)]
+    forecast = [ts for ts in drawn if ts is not None]
+    assert 0 < len(forecast) < 200
+    horizon = now + 3600 * FORECAST_HOURS
+    assert all(ts % 3600 == 0 and now < ts < horizon for ts in forecast)
+
+    historical = TimestampMix.parse("historical=1").timestamp(rng, now)
+    assert historical < now and historical % 3600 == 0
+
+    with pytest.raises(ValueError):
+        TimestampMix.parse("now=1,tomorrow=1")
+    with pytest.raises(ValueError):
+        TimestampMix.parse("now=0")
+
+
+# Test: the driver sends rate x duration requests on schedule and failures count
+# as errors.
+def test_drive_and_summarize(stub):
+    # The stub has no /predict-all, so every request is a 404.
+    samples, elapsed = drive(stub.url, rate=50, duration=0.4, headers={},
+                             mix=TimestampMix.parse("now=1"), concurrency=4)
+    assert len(samples) == 20
+    assert elapsed >= 0.38
+
+    summary = summarize(samples, elapsed)
+    assert summary["statuses"] == {"404": 20}
+    assert summary["error_rate"] == 1.0
+    assert summary["throughput_rps"] == 0.0
+    assert summary["latency_ms"] is None
+
+    ok = summarize([(10.0, 9.0, 200), (30.0, 20.0, 200),
+                    (5.0, 5.0, "ConnectionError"), (1.0, 1.0, 503)], 1.0)
+    assert ok["throughput_rps"] == 2.0
+    assert ok["error_rate"] == 0.5
+    assert ok["latency_ms"]["max"] == 30.0
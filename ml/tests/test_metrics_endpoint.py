@@ -0,0 +1,71 @@
+# Importing.
+import pandas as pd
+from ml import app as ml_app_module
+
+AUTH_HEADER = {"Authorization": "Bearer dummy-token"}
+STAGES = ["auth", "weather", "subway_features", "subway_predict", "taxi_features",
+          "taxi_predict", "scoring", "serialization"]
+
+
+def stage_count(stage, endpoint="predict_all"):
+    histogram = ml_app_module.REGISTRY.histogram("ml_api_stage_seconds", "",
+                                                 ["endpoint", "stage"])
+    return histogram.count(endpoint=endpoint, stage=stage)
+
+
+def taxi_features(pulocation_ids, ts, weather):
+    """The test zones table lacks most taxi columns; zeros reach the model"""
+    df = pd.DataFrame(0.0, index=range(len(pulocation_ids)),
+                      columns=ml_app_module.TAXI_FEATURES)
+    return df.assign(PULocationID=pulocation_ids)
+
+
+class TaxiModel:
+    def predict(self, X):
+        return [123.0] * len(X)
+
+
+def stub_taxi(monkeypatch):
+    monkeypatch.setattr(ml_app_module, "create_taxi_features", taxi_features)
+    monkeypatch.setattr(ml_app_module, "taxi_predictor", TaxiModel())
+
+
+# Test: a predict-all miss observes every pipeline stage once, summed over the request.
+def test_predict_all_records_stages(client, monkeypatch):
+    stub_taxi(monkeypatch)
+    before = {stage: stage_count(stage) for stage in STAGES}
+    resp = client.get("/predict-all?timestamp=3600", headers=AUTH_HEADER)
+    assert resp.status_code == 200
+
+    for stage in STAGES:
+        assert stage_count(stage) == before[stage] + 1, stage
+
+
+# Test: batch requests are observed under their own endpoint, not predict_all.
+def test_predict_batch_records_own_stages(client, monkeypatch):
+    stub_taxi(monkeypatch)
+    before = stage_count("taxi_predict"), stage_count("taxi_predict", "predict_batch")
+    resp = client.post("/predict-batch", json={"timestamps": [3600, 7200]},
+                       headers=AUTH_HEADER)
+    assert resp.status_code == 200
+
+    assert stage_count("taxi_predict") == before[0]
+    assert stage_count("taxi_predict", "predict_batch") == before[1] + 1
+
+
+# Test: /metrics serves Prometheus text with request, stage and snapshot series.
+def test_metrics_endpoint(client, monkeypatch):
+    stub_taxi(monkeypatch)
+    client.get("/predict-all?timestamp=3600", headers=AUTH_HEADER)
+    client.get("/predict-all?timestamp=3600", headers=AUTH_HEADER)
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = resp.get_data(as_text=True)
+    request_labels = 'endpoint="predict_all",method="GET",status="200"'
+    assert f'ml_api_requests_total{{{request_labels}}}' in text
+    assert ('ml_api_stage_seconds_bucket'
+            '{endpoint="predict_all",stage="taxi_predict",le="+Inf"}') in text
+    assert 'ml_api_snapshot_requests_total{outcome="hit"}' in text
+    assert f'ml_api_request_seconds_count{{{request_labels}}}' in text
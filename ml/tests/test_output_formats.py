@@ -0,0 +1,91 @@
+# Importing.
+import pandas as pd
+import pytest
+from werkzeug.datastructures import MultiDict
+from ml import app as ml_app_module
+from ml.app import parse_representation
+from ml.utils.geojson_serializer import Representation
+
+AUTH_HEADER = {"Authorization": "Bearer dummy-token"}
+URL = "/predict-all?timestamp=3600"
+RESULT = pd.DataFrame({
+    "PULocationID": [1, 2],
+    "combined_level": ["Busy", "Quiet"],
+    "combined_score": [3.0, 1.0],
+})
+
+
+# Test: defaults mean full GeoJSON, and fields are put in a canonical order.
+def test_parse_representation():
+    assert parse_representation(MultiDict()) is None
+    columnar = parse_representation(MultiDict({"format": "columnar"}))
+    assert columnar == Representation("columnar")
+    parsed = parse_representation(MultiDict({"fields": "combined_level, taxi_level"}))
+    assert parsed == Representation("geojson", ("taxi_level", "combined_level"))
+    detail = parse_representation(MultiDict({"fields": "geometry", "precision": "4"}))
+    assert detail.level == (4, 0.0)
+
+
+# Test: unknown formats or fields and columnar geometry options are rejected.
+@pytest.mark.parametrize("args", [
+    {"format": "csv"},
+    {"fields": "bogus"},
+    {"format": "columnar", "fields": "geometry"},
+    {"format": "columnar", "simplify": "0.0001"},
+])
+def test_parse_representation_invalid(args):
+    with pytest.raises(ValueError):
+        parse_representation(MultiDict(args))
+
+
+# Test: format=columnar returns parallel arrays built from the result frame.
+def test_predict_all_columnar(client, stub_snapshots):
+    stub_snapshots(RESULT)
+    url = f"{URL}&format=columnar&fields=combined_level"
+    resp = client.get(url, headers=AUTH_HEADER)
+
+    assert resp.status_code == 200
+    assert resp.get_json()["columns"] == {
+        "PULocationID": [1, 2], "combined_level": ["Busy", "Quiet"]
+    }
+    assert "columnar-combined_level" in resp.headers["ETag"]
+
+    etag = resp.headers["ETag"]
+    again = client.get(url, headers={**AUTH_HEADER, "If-None-Match": etag})
+    assert again.status_code == 304
+
+
+# Test: fields= projects GeoJSON properties and leaves out geometry.
+def test_predict_all_fields(client, stub_snapshots):
+    stub_snapshots(RESULT)
+    resp = client.get(f"{URL}&fields=combined_level", headers=AUTH_HEADER)
+    data = resp.get_json()
+
+    assert data["type"] == "FeatureCollection"
+    assert data["features"][0] == {
+        "type": "Feature",
+        "properties": {"PULocationID": 1, "combined_level": "Busy"}
+    }
+
+
+# Test: only the default representations are stored on the cached snapshot.
+def test_field_projections_not_stored(client, stub_snapshots):
+    stub_snapshots(RESULT)
+    for fields in ["combined_level", "combined_score", "combined_level,combined_score"]:
+        for query in (f"fields={fields}", f"format=columnar&fields={fields}"):
+            resp = client.get(f"{URL}&{query}", headers=AUTH_HEADER)
+            assert resp.status_code == 200
+    client.get(URL, headers=AUTH_HEADER)
+    client.get(f"{URL}&format=columnar", headers=AUTH_HEADER)
+
+    (snapshot, _), = ml_app_module.prediction_cache._entries.values()
+    stored = {variant for variant, _ in snapshot.sizes()}
+    assert stored == {None, Representation("columnar")}
+
+
+# Test: bad output options are a 400 on both endpoints.
+def test_bad_format_is_400(client):
+    assert client.get("/predict-all?format=csv", headers=AUTH_HEADER).status_code == 400
+    resp = client.post("/predict-batch?fields=bogus", json={"timestamps": [3600]},
+                       headers=AUTH_HEADER)
+    assert resp.status_code == 400
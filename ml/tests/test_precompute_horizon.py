@@ -0,0 +1,45 @@
+# Importing.
+import time
+from ml import app as ml_app_module
+from ml.utils.weather_refresher import WeatherSnapshot
+
+
+def entry(dt, temp):
+    return {
+        "dt": dt,
+        "weather": [{"main": "Clouds"}],
+        "main": {"temp": temp, "feels_like": temp, "humidity": 50},
+        "wind": {"speed": 3}
+    }
+
+
+# Test: every forecast hour plus the current hour lands in the prediction cache
+# under the key predict_all uses.
+def test_precompute_horizon_fills_cache(monkeypatch):
+    def fake_build(moments):
+        return [b'{"features":[],"type":"FeatureCollection"}' for _ in moments], True
+    monkeypatch.setattr(ml_app_module, "build_snapshots", fake_build)
+
+    forecast = {3600 * h: entry(3600 * h, 10 + h) for h in range(1, 31)}
+    snapshot = WeatherSnapshot(current=entry(0, 12), forecast=forecast,
+                               refreshed_at=time.monotonic(), refreshed_at_iso="now")
+
+    assert ml_app_module.precompute_horizon(snapshot) == 31
+
+    for dt in (3600, 3600 * 30):
+        ts = ml_app_module.local_time(dt)
+        weather = ml_app_module.weather_summary(forecast[dt])
+        key = ml_app_module.snapshot_key(ts, weather)
+        assert ml_app_module.prediction_cache.get(key) is not None
+
+
+# Test: a model failure aborts the run instead of caching partial results.
+def test_precompute_horizon_model_failure(monkeypatch):
+    def failed_build(moments):
+        return [b"{}"] * len(moments), False
+    monkeypatch.setattr(ml_app_module, "build_snapshots", failed_build)
+    snapshot = WeatherSnapshot(current=None, forecast={3600: entry(3600, 10)},
+                               refreshed_at=time.monotonic(), refreshed_at_iso="now")
+
+    assert ml_app_module.horizon_precomputer.run_once(snapshot) == 0
+    assert ml_app_module.prediction_cache.stats()["entries"] == 0
@@ -266,7 +266,8 @@ def test_predict_all_taxi_predict_exception(client, monkeypatch):
                 "main": {"temp": 20, "feels_like": 20, "humidity": 50},
                 "wind": {"speed": 5}
             }
-    monkeypatch.setattr("ml.app.requests.get", lambda url: FakeWeatherResponse())
+    monkeypatch.setattr("ml.app.weather_client.session.get",
+                        lambda url, *a, **kw: FakeWeatherResponse())
 
     # Minimal zones_df.
     from ml import app as ml_app_module
@@ -302,7 +303,8 @@ def test_predict_all_combined_normalisation(client, monkeypatch):
                 "main": {"temp": 20, "feels_like": 20, "humidity": 50},
                 "wind": {"speed": 5}
             }
-    monkeypatch.setattr("ml.app.requests.get", lambda url: FakeWeatherResponse())
+    monkeypatch.setattr("ml.app.weather_client.session.get",
+                        lambda url, *a, **kw: FakeWeatherResponse())
 
     # Inject combined_stats with a row to trigger normalisation code.
     from ml import app as ml_app_module
@@ -355,7 +357,8 @@ def test_predict_all_combined_min_equals_max(client, monkeypatch):
                 "main": {"temp": 20, "feels_like": 20, "humidity": 50},
                 "wind": {"speed": 5}
             }
-    monkeypatch.setattr("ml.app.requests.get", lambda url: FakeWeatherResponse())
+    monkeypatch.setattr("ml.app.weather_client.session.get",
+                        lambda url, *a, **kw: FakeWeatherResponse())
 
     # Inject combined_stats with min == max to trigger fallback branch (normalised_busyness=0.5).
     ml_app_module.combined_stats = pd.DataFrame([{
@@ -0,0 +1,68 @@
+# Importing.
+import pytest
+from ml.app import parse_batch_timestamps, BATCH_MAX_HOURS
+
+AUTH_HEADER = {"Authorization": "Bearer dummy-token"}
+
+
+# Test: an explicit list of timestamps is returned as ints in order.
+def test_parse_timestamps_list():
+    assert parse_batch_timestamps({"timestamps": [7200, "3600"]}, {}) == [7200, 3600]
+    assert parse_batch_timestamps([7200, 3600], {}) == [7200, 3600]
+
+
+# Test: a start/end range is inclusive and defaults to hourly steps.
+def test_parse_timestamps_range():
+    assert parse_batch_timestamps({"start": 0, "end": 7200}, {}) == [0, 3600, 7200]
+    query = {"start": "0", "end": "7200", "step": "7200"}
+    assert parse_batch_timestamps({}, query) == [0, 7200]
+
+
+# Test: empty, malformed and oversized requests are rejected.
+@pytest.mark.parametrize("body", [
+    {},
+    {"timestamps": []},
+    {"timestamps": "1000"},
+    {"start": 0, "end": 3600, "step": 0},
+    {"timestamps": list(range(BATCH_MAX_HOURS + 1))},
+    {"start": 0, "end": 3600 * BATCH_MAX_HOURS},
+    "1753430400",
+    1753430400,
+])
+def test_parse_timestamps_invalid(body):
+    with pytest.raises(ValueError):
+        parse_batch_timestamps(body, {})
+
+
+# Test: the endpoint returns one prediction per requested timestamp.
+def test_predict_batch_returns_one_result_per_timestamp(client):
+    resp = client.post("/predict-batch", json={"timestamps": [3600, 7200, 3600]},
+                       headers=AUTH_HEADER)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["type"] == "PredictionBatch"
+    assert data["count"] == 3
+    assert all(p["type"] == "FeatureCollection" for p in data["predictions"])
+
+
+# Test: a bare JSON list body is taken as the timestamps.
+def test_predict_batch_bare_list(client):
+    resp = client.post("/predict-batch", json=[3600, 7200], headers=AUTH_HEADER)
+    assert resp.status_code == 200
+    assert resp.get_json()["count"] == 2
+
+
+# Test: invalid input is a 400 with an error message.
+def test_predict_batch_bad_request(client):
+    resp = client.post("/predict-batch", json={"timestamps": "soon"},
+                       headers=AUTH_HEADER)
+    assert resp.status_code == 400
+    assert "error" in resp.get_json()
+    resp = client.post("/predict-batch", json="1753430400", headers=AUTH_HEADER)
+    assert resp.status_code == 400
+
+
+# Test: the batch endpoint requires a token like /predict-all.
+def test_predict_batch_requires_token(auth_client):
+    resp = auth_client.post("/predict-batch", json={"timestamps": [3600]})
+    assert resp.status_code == 401
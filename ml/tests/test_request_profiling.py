@@ -0,0 +1,62 @@
+# Importing.
+from ml import app as ml_app_module
+from tests.test_metrics_endpoint import stub_taxi
+
+AUTH_HEADER = {"Authorization": "Bearer dummy-token"}
+URL = "/predict-all?timestamp=3600"
+
+
+def timings(resp):
+    entries = resp.headers["Server-Timing"].split(", ")
+    return dict(entry.split(";dur=") for entry in entries)
+
+
+# Test: predict-all reports its stages in Server-Timing next to X-Request-ID.
+def test_server_timing_header(client, monkeypatch):
+    stub_taxi(monkeypatch)
+    resp = client.get(URL, headers={**AUTH_HEADER, "X-Request-ID": "req_timing"})
+
+    assert resp.headers["X-Request-ID"] == "req_timing"
+    stages = timings(resp)
+    for stage in ["auth", "weather", "subway_predict", "taxi_predict", "scoring",
+                  "serialization", "total"]:
+        assert float(stages[stage]) >= 0, stage
+
+    # A cache hit skips the models.
+    stages = timings(client.get(URL, headers=AUTH_HEADER))
+    assert "taxi_predict" not in stages and "total" in stages
+
+
+# Test: without the secret (or with none configured) requests are not profiled.
+def test_profiling_needs_secret(client, monkeypatch):
+    stub_taxi(monkeypatch)
+    headers = {**AUTH_HEADER, "X-Profile-Token": "guess"}
+    resp = client.get(URL, headers=headers)
+    assert "X-Profile-Id" not in resp.headers
+
+    monkeypatch.setattr(ml_app_module.request_profiler, "secret", "s3cret")
+    resp = client.get(URL, headers=headers)
+    assert "X-Profile-Id" not in resp.headers
+
+
+# Test: a request with the secret is profiled and its top functions can be
+# fetched with the same secret.
+def test_profiled_request(client, monkeypatch, tmp_path):
+    stub_taxi(monkeypatch)
+    monkeypatch.setattr(ml_app_module.request_profiler, "secret", "s3cret")
+    monkeypatch.setattr(ml_app_module.request_profiler, "directory", tmp_path)
+    headers = {**AUTH_HEADER, "X-Profile-Token": "s3cret", "X-Profile-Top": "15",
+               "X-Request-ID": "req_profiled"}
+    resp = client.get(URL, headers=headers)
+
+    assert resp.status_code == 200
+    assert resp.headers["X-Profile-Id"] == "req_profiled"
+    assert (tmp_path / "req_profiled.txt").exists()
+
+    assert client.get("/debug/profiles/req_profiled").status_code == 404
+    report = client.get("/debug/profiles/req_profiled",
+                        headers={"X-Profile-Token": "s3cret"})
+    assert report.status_code == 200
+    assert report.mimetype == "text/plain"
+    text = report.get_data(as_text=True)
+    assert "predict_all" in text and "cumulative" in text
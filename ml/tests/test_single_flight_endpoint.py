@@ -0,0 +1,77 @@
+# Importing.
+import threading
+import time
+from ml import app as ml_app_module
+from ml.utils.geojson_serializer import PreparedCollection
+
+AUTH_HEADER = {"Authorization": "Bearer dummy-token"}
+
+
+# Test: simultaneous requests for the same hour run the models once and all get
+# the snapshot.
+def test_concurrent_requests_share_one_build(monkeypatch):
+    calls = []
+
+    def slow_build(ts, weather):
+        calls.append(ts)
+        time.sleep(0.2)
+        prepared = PreparedCollection(result=None, zone_ids=[], properties=[],
+                                      header=b"{}")
+        return prepared, True
+    monkeypatch.setattr(ml_app_module, "build_snapshot", slow_build)
+    before = ml_app_module.snapshot_flights.stats()["coalesced"]
+
+    responses = []
+
+    def request():
+        with ml_app_module.app.test_client() as client:
+            resp = client.get("/predict-all?timestamp=3600", headers=AUTH_HEADER)
+            responses.append(resp)
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+
+    assert len(calls) == 1
+    assert [r.status_code for r in responses] == [200] * 6
+    assert len({r.headers["ETag"] for r in responses}) == 1
+    assert ml_app_module.snapshot_flights.stats()["coalesced"] - before == 5
+
+
+# Test: a request that missed the cache just before the leader finished reuses
+# the cached snapshot instead of leading a second build.
+def test_follower_after_finish_reuses_cached_snapshot(monkeypatch):
+    calls = []
+
+    def build(ts, weather):
+        calls.append(ts)
+        prepared = PreparedCollection(result=None, zone_ids=[], properties=[],
+                                      header=b"{}")
+        return prepared, True
+    monkeypatch.setattr(ml_app_module, "build_snapshot", build)
+
+    with ml_app_module.app.test_client() as client:
+        first = client.get("/predict-all?timestamp=7200", headers=AUTH_HEADER)
+        assert first.status_code == 200
+
+        cache = ml_app_module.prediction_cache
+        real_get = cache.get
+        misses = []
+
+        def stale_get(key):
+            # The request's own lookup ran before the leader cached the hour.
+            if not misses:
+                misses.append(key)
+                return None
+            return real_get(key)
+        monkeypatch.setattr(cache, "get", stale_get)
+        before = ml_app_module.snapshot_flights.stats()["executed"]
+        second = client.get("/predict-all?timestamp=7200", headers=AUTH_HEADER)
+
+    assert second.status_code == 200
+    assert len(calls) == 1
+    assert len(misses) == 1
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert second.get_data() == first.get_data()
+    assert ml_app_module.snapshot_flights.stats()["executed"] - before == 1
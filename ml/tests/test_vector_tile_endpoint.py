@@ -0,0 +1,73 @@
+# Importing.
+import pandas as pd
+from ml import app as ml_app_module
+from ml.utils.tests.test_vector_tiles import decode_tile, lonlat_tile
+
+AUTH_HEADER = {"Authorization": "Bearer dummy-token"}
+# Zone 4 (Alphabet City) is in the zones table.
+TILE = "/tiles/{}/{}/{}.mvt".format(*lonlat_tile(-73.977, 40.724, 14))
+RESULT = pd.DataFrame({
+    "PULocationID": [4],
+    "combined_level": ["Busy"],
+    "combined_score": [3.0],
+})
+
+
+# Test: a tile over Manhattan is an MVT with the zone's busyness and its own ETag.
+def test_tile_response(client, stub_snapshots):
+    stub_snapshots(RESULT)
+    resp = client.get(TILE + "?timestamp=3600", headers=AUTH_HEADER)
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/vnd.mapbox-vector-tile"
+    _, features = decode_tile(resp.data)
+    assert features[4]["properties"] == {
+        "PULocationID": 4, "combined_level": "Busy", "combined_score": 3.0
+    }
+    assert "-14-" in resp.headers["ETag"]
+
+
+# Test: tiles revalidate like snapshots and reuse the cached snapshot across tiles.
+def test_tile_etag_and_cache(client, stub_snapshots):
+    calls = stub_snapshots(RESULT)
+    etag = client.get(TILE + "?timestamp=3600", headers=AUTH_HEADER).headers["ETag"]
+
+    revalidate = {**AUTH_HEADER, "If-None-Match": etag}
+    resp = client.get(TILE + "?timestamp=3600", headers=revalidate)
+    assert resp.status_code == 304
+    other = client.get(TILE + "?timestamp=3600&fields=combined_level",
+                       headers=revalidate)
+    assert other.status_code == 200
+    properties = decode_tile(other.data)[1][4]["properties"]
+    assert properties == {"PULocationID": 4, "combined_level": "Busy"}
+    assert len(calls) == 1
+
+
+# Test: tile bodies are not stored on the cached snapshot.
+def test_tiles_not_stored_on_snapshot(client, stub_snapshots):
+    stub_snapshots(RESULT)
+    headers = {**AUTH_HEADER, "Accept-Encoding": "gzip"}
+    first = client.get(TILE + "?timestamp=3600", headers=headers)
+    again = client.get(TILE + "?timestamp=3600", headers=headers)
+
+    assert first.data == again.data
+    (snapshot, _), = ml_app_module.prediction_cache._entries.values()
+    assert snapshot.sizes() == {}
+
+
+# Test: tiles without zones are 204 and never run the models.
+def test_empty_tile_is_204(client, stub_snapshots):
+    calls = stub_snapshots(RESULT)
+    paris = "/tiles/{}/{}/{}.mvt".format(*lonlat_tile(2.35, 48.85, 12))
+    resp = client.get(paris, headers=AUTH_HEADER)
+
+    assert resp.status_code == 204
+    assert calls == []
+
+
+# Test: tiles outside the grid and unknown fields are rejected.
+def test_invalid_tile_requests(client):
+    assert client.get("/tiles/3/8/0.mvt", headers=AUTH_HEADER).status_code == 400
+    assert client.get("/tiles/19/0/0.mvt", headers=AUTH_HEADER).status_code == 400
+    assert client.get(TILE + "?fields=geometry", headers=AUTH_HEADER).status_code == 400
+    assert client.get(TILE).status_code == 401
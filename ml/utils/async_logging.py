@@ -0,0 +1,149 @@
+"""
+Async Logging for ML API
+Queue-based log pipeline that formats and writes records in batches off the
+request thread
+"""
+
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler
+
+from .metrics import REGISTRY
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "ml_api_log_records_dropped_total",
+    "Info log records not written, because the request was sampled out or the log "
+    "queue was full",
+    ["reason"]
+)
+
+
+class RecordQueueHandler(QueueHandler):
+    """Puts records on a bounded queue instead of writing them.
+
+    stamp() runs on the logging thread and its result is kept on the record
+    as request_id, since the writer thread has no request context. When the
+    queue is full, info records are dropped (and counted) rather than
+    blocking the request; warnings and errors always wait for room.
+    """
+
+    def __init__(self, log_queue, stamp=None):
+        super().__init__(log_queue)
+        self.stamp = stamp
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        request_id = self.stamp() if self.stamp else None
+        if request_id is not None:
+            record.request_id = request_id
+        return record
+
+    def enqueue(self, record):
+        if record.levelno >= logging.WARNING:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(reason='queue_full')
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """StreamHandler that can write many records with one write and one flush"""
+
+    def emit_batch(self, records):
+        lines = []
+        for record in records:
+            if record.levelno < self.level:
+                continue
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        with self.lock:
+            try:
+                self.stream.write("".join(lines))
+                self.flush()
+            except Exception:
+                self.handleError(records[-1])
+
+
+class BatchingQueueListener:
+    """Background thread that drains the log queue into a BatchStreamHandler.
+
+    Each wake-up takes everything already queued (up to batch_size) and
+    hands it over as one batch, so a burst of requests costs one write.
+    Threads do not survive fork: the writer is stopped (flushing the queue)
+    just before a fork and started again in both processes afterwards.
+    """
+
+    _sentinel = None
+
+    def __init__(self, log_queue, handler, batch_size=256):
+        self.queue = log_queue
+        self.handler = handler
+        self.batch_size = batch_size
+        self._thread = None
+        self.batches = 0
+        self.written = 0
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer",
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Write out everything queued so far and stop the thread"""
+        if self._thread is not None:
+            self.queue.put(self._sentinel)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while batch[-1] is not self._sentinel and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not self._sentinel]
+            if records:
+                self.handler.emit_batch(records)
+                self.batches += 1
+                self.written += len(records)
+            if batch[-1] is self._sentinel:
+                return
+
+    def stats(self):
+        """Writer counters for /health"""
+        return {
+            'running': self.running,
+            'queued': self.queue.qsize(),
+            'batches': self.batches,
+            'written': self.written,
+            'avg_batch': round(self.written / self.batches, 2) if self.batches else None
+        }
+
+
+def follow_forks(listener):
+    """Stop listener around fork and restart it in parent and child"""
+    def before():
+        # Remember whether to restart, so a stopped listener stays stopped.
+        listener._restart_after_fork = listener.running
+        listener.stop()
+
+    def after():
+        if getattr(listener, '_restart_after_fork', False):
+            listener.start()
+
+    os.register_at_fork(before=before, after_in_parent=after, after_in_child=after)
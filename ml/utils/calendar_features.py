@@ -0,0 +1,137 @@
+"""
+Calendar Features for ML API
+Precomputed time-derived model inputs per NY-local hour with a cached holiday lookup
+"""
+
+from datetime import date
+from functools import lru_cache
+import numpy as np
+import holidays
+
+HOURS_PER_DAY = 24
+SUBWAY_RUSH_HOURS = (7, 8, 9, 16, 17, 18)
+TAXI_PEAK_HOURS = (7, 8, 16, 17, 18)
+WEEKEND_DAYS = (5, 6)
+
+INT_FEATURES = ["hour", "day_of_week", "month", "is_rush_hour", "is_peak_hour",
+                "is_weekend", "is_holiday"]
+FLOAT_FEATURES = ["hour_sin", "hour_cos", "dow_sin", "dow_cos", "month_sin",
+                  "month_cos"]
+
+
+@lru_cache(maxsize=16)
+def us_holidays(year):
+    """US federal holidays for one year, built once per process"""
+    return holidays.UnitedStates(years=year)
+
+
+def is_holiday(day):
+    return day in us_holidays(day.year)
+
+
+def calendar_features(ts):
+    """All time-derived features for both models at ts (computed on the fly)"""
+    hour = ts.hour
+    dow = ts.weekday()
+    month = ts.month
+    return {
+        "hour": hour,
+        "day_of_week": dow,
+        "month": month,
+        "is_rush_hour": int(hour in SUBWAY_RUSH_HOURS),
+        "is_peak_hour": int(hour in TAXI_PEAK_HOURS),
+        "is_weekend": int(dow in WEEKEND_DAYS),
+        "is_holiday": int(is_holiday(ts.date())),
+        "hour_sin": np.sin(2 * np.pi * hour / 24),
+        "hour_cos": np.cos(2 * np.pi * hour / 24),
+        "dow_sin": np.sin(2 * np.pi * dow / 7),
+        "dow_cos": np.cos(2 * np.pi * dow / 7),
+        "month_sin": np.sin(2 * np.pi * month / 12),
+        "month_cos": np.cos(2 * np.pi * month / 12)
+    }
+
+
+def cyclical(fn, period, start=0):
+    """fn(2*pi*v/period) for each value v in the period, evaluated one scalar at a time
+    so the table matches calendar_features bit for bit"""
+    return np.array([fn(2 * np.pi * v / period) for v in range(start, start + period)])
+
+
+class CalendarTable:
+    """Calendar features for every local hour of a range of years.
+
+    Rows are indexed by wall-clock hour since January 1st of the first year,
+    so a lookup is one subtraction and a row fetch. Timestamps are expected
+    in NY local time (as produced by local_time); anything outside the table
+    falls back to calendar_features().
+    """
+
+    def __init__(self, first_year, last_year):
+        self.first_year = first_year
+        self.last_year = last_year
+        self._first_ordinal = date(first_year, 1, 1).toordinal()
+        days = date(last_year + 1, 1, 1).toordinal() - self._first_ordinal
+
+        day_ordinals = self._first_ordinal + np.arange(days)
+        days_list = [date.fromordinal(int(o)) for o in day_ordinals]
+        day_dow = np.array([d.weekday() for d in days_list], dtype=np.int64)
+        day_month = np.array([d.month for d in days_list], dtype=np.int64)
+        day_holiday = np.array([is_holiday(d) for d in days_list], dtype=np.int64)
+
+        hour = np.tile(np.arange(HOURS_PER_DAY, dtype=np.int64), days)
+        dow = np.repeat(day_dow, HOURS_PER_DAY)
+        month = np.repeat(day_month, HOURS_PER_DAY)
+        columns = {
+            "hour": hour,
+            "day_of_week": dow,
+            "month": month,
+            "is_rush_hour": np.isin(hour, SUBWAY_RUSH_HOURS).astype(np.int64),
+            "is_peak_hour": np.isin(hour, TAXI_PEAK_HOURS).astype(np.int64),
+            "is_weekend": np.isin(dow, WEEKEND_DAYS).astype(np.int64),
+            "is_holiday": np.repeat(day_holiday, HOURS_PER_DAY),
+            "hour_sin": cyclical(np.sin, 24)[hour],
+            "hour_cos": cyclical(np.cos, 24)[hour],
+            "dow_sin": cyclical(np.sin, 7)[dow],
+            "dow_cos": cyclical(np.cos, 7)[dow],
+            "month_sin": cyclical(np.sin, 12, start=1)[month - 1],
+            "month_cos": cyclical(np.cos, 12, start=1)[month - 1]
+        }
+        self._int_rows = np.column_stack([columns[c] for c in INT_FEATURES]).tolist()
+        self._float_rows = np.column_stack([columns[c] for c in FLOAT_FEATURES])
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def around(cls, ts, years_ahead=1):
+        """Table covering ts's year and the following years_ahead years"""
+        return cls(ts.year, ts.year + years_ahead)
+
+    def __len__(self):
+        return len(self._int_rows)
+
+    def row_index(self, ts):
+        """Table row for ts, or -1 when ts falls outside the table"""
+        i = (ts.toordinal() - self._first_ordinal) * HOURS_PER_DAY + ts.hour
+        return i if 0 <= i < len(self._int_rows) else -1
+
+    def lookup(self, ts):
+        """Feature dict for ts; same keys and values as calendar_features(ts)"""
+        i = self.row_index(ts)
+        if i < 0:
+            self.misses += 1
+            return calendar_features(ts)
+        self.hits += 1
+        features = dict(zip(INT_FEATURES, self._int_rows[i]))
+        # np.float64 scalars, as np.sin/np.cos return in calendar_features.
+        features.update(zip(FLOAT_FEATURES, self._float_rows[i]))
+        return features
+
+    def stats(self):
+        """Table coverage and lookup counters for /health"""
+        return {
+            'first_year': self.first_year,
+            'last_year': self.last_year,
+            'hours': len(self),
+            'hits': self.hits,
+            'misses': self.misses
+        }
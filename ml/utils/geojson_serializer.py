@@ -0,0 +1,227 @@
+"""
+GeoJSON Serializer for ML API
+Writes FeatureCollections from result frames around pre-encoded zone geometry
+"""
+
+import json
+import threading
+import time
+from typing import NamedTuple, Optional
+from werkzeug.http import http_date
+
+from .geometry_store import FULL_DETAIL, detail_name
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+
+def dumps(obj):
+    """Compact, key-sorted JSON bytes (the layout Flask's jsonify produces).
+
+    Uses orjson when it is installed and the standard library otherwise.
+    Both parse to the same values; orjson may spell some floats differently
+    (1e-05 vs 1e-5).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True).encode()
+
+
+def column_values(series):
+    """Native Python values of a column, with NaN as None"""
+    if series.dtype.kind in "iub":
+        return series.to_numpy().tolist()
+    if series.dtype.kind in "fc":
+        values = series.to_numpy().tolist()
+    else:
+        values = series.to_numpy(dtype=object)
+    return [None if isinstance(v, float) and v != v else v for v in values]
+
+
+def frame_records(df):
+    """Rows of df as dicts of native Python values, with NaN as None"""
+    columns = list(df.columns)
+    rows = zip(*(column_values(df[col]) for col in columns))
+    return [dict(zip(columns, row)) for row in rows]
+
+
+class PreparedCollection(NamedTuple):
+    """One hour's FeatureCollection with everything except geometry already encoded"""
+    result: object
+    zone_ids: list
+    properties: list
+    header: bytes
+
+
+class Representation(NamedTuple):
+    """How a snapshot is rendered.
+
+    Output format, projected fields, geometry detail and (z, x, y) tile.
+    """
+    format: str = "geojson"
+    fields: Optional[tuple] = None
+    level: Optional[tuple] = None
+    tile: Optional[tuple] = None
+
+
+def representation_name(representation):
+    """ETag variant label for a representation (None for full GeoJSON)"""
+    if representation is None:
+        return None
+    parts = []
+    if representation.format != "geojson":
+        parts.append(representation.format)
+    if representation.fields is not None:
+        parts.append("+".join(representation.fields))
+    if representation.level is not None:
+        parts.append(detail_name(representation.level))
+    if representation.tile is not None:
+        parts.append("-".join(str(n) for n in representation.tile))
+    return "-".join(parts)
+
+
+class GeoJSONSerializer:
+    """Serializes prediction results to FeatureCollection bytes.
+
+    Zone geometry is encoded to JSON once per detail level, at construction.
+    prepare() encodes each zone's small properties object once per result;
+    render() then splices those next to the cached geometry bytes of the
+    requested level. Serialization time is tracked separately from model
+    time and reported through stats().
+    """
+
+    def __init__(self, geometry_store, levels=(FULL_DETAIL,), id_column="PULocationID"):
+        self.id_column = id_column
+        # Full detail is always available; it is the default level.
+        self.levels = [FULL_DETAIL] + [tuple(level) for level in levels
+                                       if tuple(level) != FULL_DETAIL]
+        # Simplify once per tolerance, then round each simplified copy per precision.
+        simplified = {}
+        self._geometry = {}
+        for precision, tolerance in self.levels:
+            if tolerance not in simplified:
+                simplified[tolerance] = geometry_store.reduced(None, tolerance)
+            store = simplified[tolerance].reduced(precision, 0.0)
+            self._geometry[(precision, tolerance)] = {
+                zone_id: dumps(geom) for zone_id, geom in store.items()
+            }
+        self._empty_geometry = dumps({})
+        self._lock = threading.Lock()
+        self._timings = {"prepare": [0, 0.0, None], "render": [0, 0.0, None]}
+
+    def has_level(self, level):
+        return tuple(level) in self._geometry
+
+    def geometry_bytes(self, zone_id, level=FULL_DETAIL):
+        """Pre-encoded geometry for a zone at a detail level, or {} if unknown"""
+        if zone_id is None:
+            return self._empty_geometry
+        return self._geometry[tuple(level)].get(int(zone_id), self._empty_geometry)
+
+    def prepare(self, result, timestamp, weather):
+        """Encode the per-zone properties and collection header of one hour's result"""
+        start = time.perf_counter()
+        records = frame_records(result)
+        prepared = PreparedCollection(
+            result=result,
+            zone_ids=[props.get(self.id_column) for props in records],
+            properties=[dumps(props) for props in records],
+            header=dumps({"timestamp": http_date(timestamp), "weather": weather})
+        )
+        self._record("prepare", start)
+        return prepared
+
+    def render(self, prepared, level=None, fields=None):
+        """FeatureCollection bytes for a prepared result at a detail level.
+
+        The level defaults to full detail.
+
+        With fields, each feature only carries those properties (plus the
+        zone ID), and geometry only if "geometry" is one of the fields.
+        """
+        start = time.perf_counter()
+        level = FULL_DETAIL if level is None else level
+        if fields is None:
+            features = [
+                b'{"geometry":' + self.geometry_bytes(zone_id, level)
+                + b',"properties":' + props + b',"type":"Feature"}'
+                for zone_id, props in zip(prepared.zone_ids, prepared.properties)
+            ]
+        else:
+            with_geometry = "geometry" in fields
+            columns = self._projected_columns(
+                prepared.result, [f for f in fields if f != "geometry"]
+            )
+            features = [
+                (b'{"geometry":' + self.geometry_bytes(zone_id, level) + b','
+                 if with_geometry else b'{')
+                + b'"properties":' + dumps(dict(zip(columns, row)))
+                + b',"type":"Feature"}'
+                for zone_id, row in zip(prepared.zone_ids, zip(*columns.values()))
+            ]
+        body = (b'{"features":[' + b",".join(features) + b'],"properties":'
+                + prepared.header + b',"type":"FeatureCollection"}')
+        self._record("render", start)
+        return body
+
+    def columnar(self, prepared, fields=None):
+        """Parallel arrays, one per field, aligned on PULocationID; no geometry"""
+        start = time.perf_counter()
+        if fields is None:
+            fields = [col for col in prepared.result.columns if col != self.id_column]
+        columns = self._projected_columns(prepared.result, fields)
+        body = (b'{"columns":' + dumps(columns) + b',"properties":' + prepared.header
+                + b',"type":"PredictionColumns"}')
+        self._record("render", start)
+        return body
+
+    def render_representation(self, prepared, representation=None):
+        """Body for a prepared result in a Representation (None: full GeoJSON)"""
+        if representation is None:
+            return self.render(prepared)
+        if representation.format == "columnar":
+            return self.columnar(prepared, representation.fields)
+        return self.render(prepared, representation.level, representation.fields)
+
+    def _projected_columns(self, result, fields):
+        """Native column values for the zone ID plus fields, in that order"""
+        names = [self.id_column] + [f for f in fields if f != self.id_column]
+        return {name: column_values(result[name]) for name in names}
+
+    def feature_collection(self, result, timestamp, weather, level=None):
+        """FeatureCollection bytes for one hour's result frame"""
+        return self.render(self.prepare(result, timestamp, weather), level)
+
+    def _record(self, stage, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            timing = self._timings[stage]
+            timing[0] += 1
+            timing[1] += elapsed_ms
+            timing[2] = round(elapsed_ms, 3)
+
+    def stats(self):
+        """Serialization counters for /health"""
+        with self._lock:
+            timings = {
+                stage: {
+                    'count': count,
+                    'last_ms': last_ms,
+                    'avg_ms': round(total_ms / count, 3) if count else None
+                }
+                for stage, (count, total_ms, last_ms) in self._timings.items()
+            }
+        return {
+            'encoder': 'orjson' if orjson is not None else 'json',
+            'zones': len(self._geometry[FULL_DETAIL]),
+            'levels': len(self.levels),
+            **timings
+        }
+
+
+def batch_body(payloads):
+    """PredictionBatch bytes around already-serialized FeatureCollections"""
+    return (b'{"count":' + str(len(payloads)).encode() + b',"predictions":['
+            + b",".join(payloads) + b'],"type":"PredictionBatch"}')
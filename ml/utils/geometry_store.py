@@ -0,0 +1,117 @@
+"""
+Zone Geometry Store for ML API
+Parses zone WKT once at startup into ready-to-serialize GeoJSON geometry
+"""
+
+import math
+from shapely import wkt
+from shapely.geometry import mapping, shape
+
+SUPPORTED_TYPES = ("Polygon", "MultiPolygon")
+
+# Geometry detail levels served by the API, precomputed for every combination.
+# Precision is decimal digits (None keeps full precision); tolerance is the
+# simplification distance in degrees (1e-5 is about 1 m in Manhattan).
+PRECISIONS = (None, 6, 5, 4)
+TOLERANCES = (0.0, 0.00001, 0.00005, 0.0001)
+FULL_DETAIL = (None, 0.0)
+
+
+def _as_lists(coords):
+    """Convert shapely's nested coordinate tuples into JSON-style lists"""
+    if coords and isinstance(coords[0], (int, float)):
+        return list(coords)
+    return [_as_lists(c) for c in coords]
+
+
+def parse_geometry(geom):
+    """Parse a POLYGON/MULTIPOLYGON WKT string into a GeoJSON geometry dict.
+
+    Anything else (blank, NaN, other geometry types, bad WKT) yields {}.
+    """
+    if not isinstance(geom, str) or not geom.strip():
+        return {}
+    try:
+        shape = mapping(wkt.loads(geom))
+    except Exception:
+        return {}
+    if shape["type"] not in SUPPORTED_TYPES:
+        return {}
+    return {"type": shape["type"], "coordinates": _as_lists(shape["coordinates"])}
+
+
+def detail_name(level):
+    """Short label for a (precision, tolerance) detail level, e.g. p5-s1e-05"""
+    precision, tolerance = level
+    return f"p{'full' if precision is None else precision}-s{tolerance:g}"
+
+
+def _round_ring(ring, precision):
+    """Round a ring's points, dropping points that collapse onto their predecessor"""
+    rounded = [[round(x, precision), round(y, precision)] for x, y in ring]
+    deduped = [pt for i, pt in enumerate(rounded) if i == 0 or pt != rounded[i - 1]]
+    # A ring needs 4 points to stay closed and valid; keep tiny rings as they were.
+    return deduped if len(deduped) >= 4 else rounded
+
+
+def reduce_geometry(geom, precision=None, tolerance=0.0):
+    """Simplify (tolerance, degrees) and round (precision, digits) a GeoJSON polygon"""
+    if not geom:
+        return {}
+    if tolerance:
+        simplified = shape(geom).simplify(tolerance, preserve_topology=True)
+        if not simplified.is_empty and simplified.geom_type in SUPPORTED_TYPES:
+            coordinates = _as_lists(mapping(simplified)["coordinates"])
+            # Keep the zone's geometry type stable for clients.
+            if geom["type"] == "MultiPolygon" and simplified.geom_type == "Polygon":
+                coordinates = [coordinates]
+            if geom["type"] == simplified.geom_type or geom["type"] == "MultiPolygon":
+                geom = {"type": geom["type"], "coordinates": coordinates}
+    if precision is None:
+        return geom
+    multi = geom["type"] == "MultiPolygon"
+    polygons = geom["coordinates"] if multi else [geom["coordinates"]]
+    rounded = [[_round_ring(ring, precision) for ring in polygon]
+               for polygon in polygons]
+    return {"type": geom["type"], "coordinates": rounded if multi else rounded[0]}
+
+
+class GeometryStore:
+    """Immutable map of PULocationID -> GeoJSON geometry"""
+
+    def __init__(self, geometries):
+        self._geometries = dict(geometries)
+
+    @classmethod
+    def from_zones(cls, zones_df, id_column="OBJECTID", geometry_column="geometry"):
+        """Build the store from the zones table; tolerates a missing or empty table"""
+        if id_column not in zones_df or geometry_column not in zones_df:
+            return cls({})
+        return cls(
+            (int(zone_id), parse_geometry(geom))
+            for zone_id, geom in zip(zones_df[id_column], zones_df[geometry_column])
+        )
+
+    def get(self, zone_id):
+        """Geometry for a zone, or {} if unknown"""
+        if zone_id is None or (isinstance(zone_id, float) and math.isnan(zone_id)):
+            return {}
+        return self._geometries.get(int(zone_id), {})
+
+    def reduced(self, precision=None, tolerance=0.0):
+        """Copy of the store at a lower detail level"""
+        if (precision, tolerance) == FULL_DETAIL:
+            return self
+        return GeometryStore(
+            (zone_id, reduce_geometry(geom, precision, tolerance))
+            for zone_id, geom in self._geometries.items()
+        )
+
+    def items(self):
+        return self._geometries.items()
+
+    def __contains__(self, zone_id):
+        return int(zone_id) in self._geometries
+
+    def __len__(self):
+        return len(self._geometries)
@@ -0,0 +1,102 @@
+"""
+Forecast Horizon Precomputation for ML API
+Background worker that precomputes predictions whenever a new forecast arrives
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class HorizonPrecomputer:
+    """Runs a precompute job on its own thread for each newly published forecast.
+
+    schedule() is cheap and safe to call from the weather refresher: it only
+    records the latest snapshot and wakes the worker. If several forecasts
+    arrive while a run is in progress, only the newest one is computed.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.run_count = 0
+        self.failure_count = 0
+        self.coalesced_count = 0
+        self.last_run = None
+        self.last_duration_ms = None
+        self.last_hours = 0
+        self.last_error = None
+        self._pending = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def schedule(self, snapshot):
+        """Queue snapshot for precomputation, replacing any snapshot not yet started"""
+        with self._lock:
+            if self._pending is not None:
+                self.coalesced_count += 1
+            self._pending = snapshot
+        self._wake.set()
+
+    def run_once(self, snapshot):
+        """Run the job synchronously. Returns the number of hours precomputed"""
+        start = time.perf_counter()
+        try:
+            hours = self.job(snapshot)
+        except Exception as e:
+            self.failure_count += 1
+            self.last_error = str(e)
+            logging.error(f"Forecast precompute failed: {e}")
+            return 0
+        self.run_count += 1
+        self.last_hours = hours
+        self.last_duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        self.last_run = datetime.now(timezone.utc).isoformat()
+        logging.info(
+            f"Precomputed {hours} forecast hours in {self.last_duration_ms} ms"
+        )
+        return hours
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                snapshot, self._pending = self._pending, None
+            if snapshot is not None and not self._stop.is_set():
+                self.run_once(snapshot)
+
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="horizon-precompute",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def status(self):
+        """Worker state for /health"""
+        return {
+            'enabled': self.running,
+            'run_count': self.run_count,
+            'failure_count': self.failure_count,
+            'coalesced_count': self.coalesced_count,
+            'last_run': self.last_run,
+            'last_duration_ms': self.last_duration_ms,
+            'last_hours': self.last_hours,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,239 @@
+"""
+Model Inference for ML API
+Pluggable prediction backends for the XGBoost models with a fixed column order
+"""
+
+import json
+import numpy as np
+
+DEFAULT_BACKEND = "booster"
+
+
+class ModelBackend:
+    """Base class for prediction backends.
+
+    A backend wraps one XGBoost sklearn model. The caller's column order is
+    mapped onto the order the booster was trained with once at startup, and
+    every call receives a contiguous float32 array in that order, which is
+    also how XGBoost stores its input internally.
+    """
+
+    name = None
+
+    def __init__(self, model, columns=None):
+        booster_columns = model.get_booster().feature_names
+        if columns is None:
+            columns = booster_columns or []
+        self.columns = list(columns)
+
+        self._order = None
+        if booster_columns is not None and self.columns != list(booster_columns):
+            missing = [name for name in booster_columns if name not in self.columns]
+            if missing:
+                raise ValueError(
+                    f"Model features missing from input columns: {missing}"
+                )
+            self._order = np.array([self.columns.index(name)
+                                    for name in booster_columns])
+
+        best_iteration = getattr(model, "best_iteration", None)
+        if best_iteration is not None:
+            self.iteration_range = (0, best_iteration + 1)
+        else:
+            self.iteration_range = (0, 0)
+
+    def as_input(self, X):
+        """Contiguous float32 array in booster column order from a DataFrame or array"""
+        if hasattr(X, "columns"):
+            X = X[self.columns].to_numpy(dtype=np.float32)
+        X = np.asarray(X, dtype=np.float32)
+        if self._order is not None:
+            X = X[:, self._order]
+        return np.ascontiguousarray(X)
+
+    def predict(self, X):
+        return self._predict(self.as_input(X))
+
+    def _predict(self, X):
+        raise NotImplementedError
+
+
+class SklearnBackend(ModelBackend):
+    """The sklearn wrapper's own predict, kept as a reference backend"""
+
+    name = "sklearn"
+
+    def __init__(self, model, columns=None):
+        super().__init__(model, columns)
+        self.model = model
+
+    def _predict(self, X):
+        return self.model.predict(X)
+
+
+class BoosterBackend(ModelBackend):
+    """Booster.inplace_predict.
+
+    Skips the sklearn wrapper's per-call validation and DMatrix conversion.
+    """
+
+    name = "booster"
+
+    def __init__(self, model, columns=None):
+        super().__init__(model, columns)
+        self.booster = model.get_booster()
+
+    def _predict(self, X):
+        return self.booster.inplace_predict(
+            X, iteration_range=self.iteration_range, validate_features=False
+        )
+
+
+class TreeEnsembleBackend(ModelBackend):
+    """Evaluates the trees in NumPy from flat arrays exported once from the booster.
+
+    Every tree is laid out as a complete binary tree of the ensemble's depth
+    (node i has children 2i+1 and 2i+2), so descending one level is a
+    feature/threshold lookup and an index update for all trees and rows at
+    once. Leaves above the bottom level are copied into both children until
+    they reach the bottom. Leaf values are then added in tree order
+    in float32, starting from base_score, the same accumulation XGBoost's CPU
+    predictor does, so results match it exactly.
+    Supports the single-output gbtree regression models this service uses.
+    """
+
+    name = "numpy"
+    SUPPORTED_OBJECTIVES = ("reg:squarederror",)
+    MAX_DEPTH = 12
+
+    def __init__(self, model, columns=None, max_block_cells=1 << 21):
+        super().__init__(model, columns)
+        learner = json.loads(bytes(model.get_booster().save_raw("json")))["learner"]
+        objective = learner["objective"]["name"]
+        booster_name = learner["gradient_booster"]["name"]
+        if booster_name != "gbtree" or objective not in self.SUPPORTED_OBJECTIVES:
+            raise ValueError(
+                f"numpy backend does not support {booster_name} with {objective}"
+            )
+        if int(learner["learner_model_param"].get("num_target", "1")) != 1:
+            raise ValueError("numpy backend only supports single-output models")
+
+        trees = learner["gradient_booster"]["model"]["trees"]
+        begin, end = self.iteration_range
+        if end > 0:
+            trees = trees[begin:end]
+        base_score = learner["learner_model_param"]["base_score"]
+        self.base_score = np.float32(float(base_score))
+        self.n_trees = len(trees)
+        self._export(trees)
+        # Rows per block so the (trees, rows) working arrays stay bounded.
+        self.block_rows = max(1, max_block_cells // max(self.n_trees, 1))
+
+    def _export(self, trees):
+        for tree in trees:
+            if any(int(t) != 0 for t in tree["split_type"]):
+                raise ValueError("numpy backend does not support categorical splits")
+        self.depth = max(
+            (tree_depth(tree["left_children"], tree["right_children"])
+             for tree in trees),
+            default=0
+        )
+        if self.depth > self.MAX_DEPTH:
+            raise ValueError(
+                f"numpy backend supports trees up to depth {self.MAX_DEPTH}, "
+                f"got {self.depth}"
+            )
+
+        n_inner = 2 ** self.depth - 1
+        n_leaves = 2 ** self.depth
+        self.feature = np.zeros((self.n_trees, n_inner), dtype=np.intp)
+        self.threshold = np.zeros((self.n_trees, n_inner), dtype=np.float32)
+        self.default_left = np.zeros((self.n_trees, n_inner), dtype=bool)
+        self.value = np.zeros((self.n_trees, n_leaves), dtype=np.float32)
+
+        for k, tree in enumerate(trees):
+            left, right = tree["left_children"], tree["right_children"]
+            stack = [(0, 0)]
+            while stack:
+                node, pos = stack.pop()
+                if pos >= n_inner:
+                    self.value[k, pos - n_inner] = tree["split_conditions"][node]
+                elif left[node] == -1:
+                    # Leaf above the bottom level: both children carry the
+                    # same leaf down.
+                    stack.append((node, 2 * pos + 1))
+                    stack.append((node, 2 * pos + 2))
+                else:
+                    self.feature[k, pos] = tree["split_indices"][node]
+                    self.threshold[k, pos] = tree["split_conditions"][node]
+                    self.default_left[k, pos] = bool(tree["default_left"][node])
+                    stack.append((left[node], 2 * pos + 1))
+                    stack.append((right[node], 2 * pos + 2))
+
+        self._inner_offsets = (np.arange(self.n_trees) * n_inner)[:, None]
+        self._leaf_offsets = (np.arange(self.n_trees) * n_leaves)[:, None] - n_inner
+        self._feature_flat = self.feature.ravel()
+        self._threshold_flat = self.threshold.ravel()
+        self._default_left_flat = self.default_left.ravel()
+        self._value_flat = self.value.ravel()
+
+    def leaf_values(self, X):
+        """(n_trees, n_rows) leaf value reached by each row in each tree"""
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offsets = np.arange(n_rows) * n_features
+        pos = np.zeros((self.n_trees, n_rows), dtype=np.intp)
+        for _ in range(self.depth):
+            node = self._inner_offsets + pos
+            fvalue = flat[row_offsets + self._feature_flat[node]]
+            go_left = fvalue < self._threshold_flat[node]
+            missing = np.isnan(fvalue)
+            if missing.any():
+                go_left |= missing & self._default_left_flat[node]
+            pos = 2 * pos + 2 - go_left
+        return self._value_flat[self._leaf_offsets + pos]
+
+    def _predict(self, X):
+        out = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), self.block_rows):
+            block = X[start:start + self.block_rows]
+            values = np.empty((self.n_trees + 1, len(block)), dtype=np.float32)
+            values[0] = self.base_score
+            values[1:] = self.leaf_values(block)
+            # accumulate adds tree by tree; a plain sum would use pairwise summation.
+            totals = np.add.accumulate(values, axis=0, dtype=np.float32)
+            out[start:start + len(block)] = totals[-1]
+        return out
+
+
+def tree_depth(left_children, right_children):
+    """Number of edges on the longest root-to-leaf path"""
+    depth = 0
+    level = [0]
+    while True:
+        level = [c for n in level for c in (left_children[n], right_children[n])
+                 if c != -1]
+        if not level:
+            return depth
+        depth += 1
+
+
+BACKENDS = {
+    SklearnBackend.name: SklearnBackend,
+    BoosterBackend.name: BoosterBackend,
+    TreeEnsembleBackend.name: TreeEnsembleBackend
+}
+
+
+def make_predictor(model, columns=None, backend=DEFAULT_BACKEND):
+    """Wrap an XGBoost sklearn model in the named backend.
+
+    Anything else (or None) is returned unchanged.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown model backend '{backend}', expected one of {sorted(BACKENDS)}"
+        )
+    if model is None or not hasattr(model, "get_booster"):
+        return model
+    return BACKENDS[backend](model, columns)
@@ -0,0 +1,100 @@
+"""
+Inference Executor for ML API
+Bounded thread pool that keeps CPU-bound model work apart from request threads
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class InferenceBusy(RuntimeError):
+    """Raised when the inference queue is full; the request should be retried later"""
+
+
+class InferenceExecutor:
+    """Runs model calls on at most max_workers threads, with max_pending waiting.
+
+    In threaded serving many request threads can be waiting on OpenWeather
+    at once; only the ones that reach the models compete for CPU, and they
+    queue here instead of oversubscribing the cores. A full queue raises
+    InferenceBusy rather than letting latency grow without bound.
+    With max_workers=0 jobs run inline in the caller, which is what sync
+    workers (one request per process) need.
+    Pool threads start on first use, so a preloading master forks none.
+    """
+
+    def __init__(self, max_workers=0, max_pending=16):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = None
+        self._slots = None
+        if max_workers:
+            self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="inference")
+            self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) on the pool.
+
+        Blocks until it returns, and passes on its result or exception.
+        """
+        if self._pool is None:
+            return self._timed(fn, args, kwargs, time.perf_counter())
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise InferenceBusy(
+                f"Inference queue full ({self.max_workers} running, "
+                f"{self.max_pending} waiting)"
+            )
+        try:
+            # Run in the caller's context so per-request stage timings reach it.
+            context = contextvars.copy_context()
+            future = self._pool.submit(context.run, self._timed, fn, args, kwargs,
+                                       time.perf_counter())
+            return future.result()
+        finally:
+            self._slots.release()
+
+    def _timed(self, fn, args, kwargs, queued_at):
+        start = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.total_wait_ms += (start - queued_at) * 1000
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.total_run_ms += (time.perf_counter() - start) * 1000
+
+    def stats(self):
+        """Executor counters for /health"""
+        with self._lock:
+            completed = self.completed
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending if self._pool is not None else None,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'avg_wait_ms': (round(self.total_wait_ms / completed, 3)
+                                if completed else None),
+                'avg_run_ms': (round(self.total_run_ms / completed, 3)
+                               if completed else None)
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
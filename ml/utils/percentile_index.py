@@ -0,0 +1,70 @@
+"""
+Percentile Index for ML API
+Dense [zone, day_of_week, hour, percentile] lookup table for zone busyness stats
+"""
+
+import numpy as np
+
+from .scoring import PERCENTILE_COLUMNS
+
+DAYS_PER_WEEK = 7
+HOURS_PER_DAY = 24
+KEY_COLUMNS = ["PULocationID", "day_of_week", "hour"]
+
+
+class PercentileIndex:
+    """Zone busyness percentiles held in one dense NumPy array.
+
+    Zone IDs are interned to row positions once, so a request resolves all
+    of its zones with a single fancy-index instead of a DataFrame merge.
+    Cells with no stats (and unknown zones) read as NaN.
+    """
+
+    def __init__(self, zone_ids, table):
+        self.zone_ids = np.asarray(zone_ids, dtype=np.int64)
+        self.table = table
+
+    @classmethod
+    def from_stats(cls, stats_df):
+        """Build the index from a stats table; tolerates a missing or empty table"""
+        required = KEY_COLUMNS + PERCENTILE_COLUMNS
+        if any(col not in stats_df for col in required):
+            return cls([], np.full(
+                (0, DAYS_PER_WEEK, HOURS_PER_DAY, len(PERCENTILE_COLUMNS)), np.nan
+            ))
+
+        stats = stats_df.dropna(subset=KEY_COLUMNS)
+        # Subway stats store zone IDs as floats (24.0); intern them as ints.
+        zones = stats["PULocationID"].to_numpy().astype(np.int64)
+        zone_ids = np.unique(zones)
+        table = np.full(
+            (len(zone_ids), DAYS_PER_WEEK, HOURS_PER_DAY, len(PERCENTILE_COLUMNS)),
+            np.nan
+        )
+        table[
+            np.searchsorted(zone_ids, zones),
+            stats["day_of_week"].to_numpy().astype(np.int64),
+            stats["hour"].to_numpy().astype(np.int64)
+        ] = stats[PERCENTILE_COLUMNS].to_numpy(dtype=float)
+        return cls(zone_ids, table)
+
+    def positions(self, zone_ids):
+        """Row position per zone ID, or -1 for zones without stats"""
+        zone_ids = np.asarray(zone_ids, dtype=float)
+        valid = ~np.isnan(zone_ids)
+        ids = np.where(valid, zone_ids, -1).astype(np.int64)
+        if len(self.zone_ids) == 0:
+            return np.full(len(ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.zone_ids, ids), len(self.zone_ids) - 1)
+        return np.where(valid & (self.zone_ids[pos] == ids), pos, -1)
+
+    def lookup(self, zone_ids, day_of_week, hour):
+        """Percentiles (n, 5) ordered p10..p90 for the given zones at one hour"""
+        pos = self.positions(zone_ids)
+        out = np.full((len(pos), len(PERCENTILE_COLUMNS)), np.nan)
+        known = pos >= 0
+        out[known] = self.table[pos[known], day_of_week, hour]
+        return out
+
+    def __len__(self):
+        return len(self.zone_ids)
@@ -0,0 +1,54 @@
+"""
+Process Memory for ML API
+Resident and shared memory of the current process, for sizing worker counts
+"""
+
+import os
+import resource
+import sys
+
+SMAPS_ROLLUP = "/proc/self/smaps_rollup"
+
+
+def _rollup(path):
+    """kB fields of a smaps_rollup file"""
+    fields = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields
+
+
+def memory_usage(path=SMAPS_ROLLUP):
+    """Memory of this process in MB.
+
+    rss counts every resident page, including pages still shared with the
+    gunicorn master after fork; pss splits shared pages between the processes
+    sharing them, so summing pss over the workers gives the real total.
+    Outside Linux only peak rss is available.
+    """
+    try:
+        fields = _rollup(path)
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kB elsewhere.
+        unit = 1 << 20 if sys.platform == "darwin" else 1 << 10
+        return {'pid': os.getpid(), 'peak_rss_mb': round(peak / unit, 1)}
+
+    def mb(*names):
+        return round(sum(fields.get(name, 0) for name in names) / 1024, 1)
+
+    return {
+        'pid': os.getpid(),
+        'rss_mb': mb("Rss"),
+        'pss_mb': mb("Pss"),
+        'shared_mb': mb("Shared_Clean", "Shared_Dirty"),
+        'private_mb': mb("Private_Clean", "Private_Dirty")
+    }
+
+
+def describe(usage):
+    """One-line summary of memory_usage() for logs"""
+    return ", ".join(f"{name}={value}" for name, value in usage.items())
@@ -0,0 +1,132 @@
+"""
+Request Profiler for ML API
+Opt-in cProfile capture of single production requests, kept as top-N hot function
+reports
+"""
+
+import cProfile
+import hmac
+import io
+import pstats
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+PROFILE_HEADER = 'X-Profile-Token'
+TOP_N_HEADER = 'X-Profile-Top'
+
+# Request IDs come from the client (X-Request-ID); only these are used as file names.
+_SAFE_ID = re.compile(r'^[A-Za-z0-9_.-]{1,128}$')
+
+
+def safe_profile_id(request_id):
+    if not request_id or not _SAFE_ID.match(request_id):
+        return False
+    return request_id not in ('.', '..')
+
+
+class RequestProfiler:
+    """Profiles requests that present the shared secret and keeps their reports.
+
+    Disabled unless a secret is configured. A report is the pstats listing of
+    the top_n functions by cumulative time; the last max_reports stay in
+    memory, and with a directory they are also written to <request_id>.txt
+    so any worker (or a shell on the box) can read them.
+    cProfile only sees the request thread: with INFERENCE_WORKERS > 0 model
+    calls show up as time waiting on the inference pool.
+    """
+
+    def __init__(self, secret=None, directory=None, top_n=30, max_top_n=200,
+                 max_reports=20):
+        self.secret = secret or None
+        self.directory = Path(directory) if directory else None
+        self.top_n = top_n
+        self.max_top_n = max_top_n
+        self.max_reports = max_reports
+        self._reports = OrderedDict()
+        self._lock = threading.Lock()
+        self._running = threading.Lock()
+        self.profiled = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self):
+        return self.secret is not None
+
+    def authorized(self, token):
+        """True if token matches the configured secret (never when disabled)"""
+        if not self.enabled or not token:
+            return False
+        return hmac.compare_digest(token.encode(), self.secret.encode())
+
+    def limit(self, value):
+        """Number of functions to report, from an optional header value"""
+        try:
+            return max(1, min(int(value), self.max_top_n))
+        except (TypeError, ValueError):
+            return self.top_n
+
+    def run(self, fn, *args, **kwargs):
+        """(result, profile): fn's result and its cProfile.Profile.
+
+        profile is None if another profile was already running: one profile
+        at a time per process (Python 3.12+ refuses a second active profiler),
+        so a request that asks while another is being profiled is served
+        normally.
+        """
+        if not self._running.acquire(blocking=False):
+            with self._lock:
+                self.skipped += 1
+            return fn(*args, **kwargs), None
+        profile = cProfile.Profile()
+        try:
+            result = profile.runcall(fn, *args, **kwargs)
+        finally:
+            self._running.release()
+        return result, profile
+
+    def report(self, profile, top_n=None):
+        """Top functions by cumulative time, as pstats prints them"""
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE)
+        stats.print_stats(top_n or self.top_n)
+        return stream.getvalue()
+
+    def save(self, request_id, report):
+        """Keep a report under request_id; returns the file written, if any"""
+        with self._lock:
+            self.profiled += 1
+            self._reports[request_id] = report
+            self._reports.move_to_end(request_id)
+            while len(self._reports) > self.max_reports:
+                self._reports.popitem(last=False)
+        if self.directory is None or not safe_profile_id(request_id):
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{request_id}.txt"
+        path.write_text(report)
+        return path
+
+    def load(self, request_id):
+        """A saved report, or None"""
+        with self._lock:
+            report = self._reports.get(request_id)
+        if report is not None or self.directory is None:
+            return report
+        if not safe_profile_id(request_id):
+            return None
+        path = self.directory / f"{request_id}.txt"
+        return path.read_text() if path.is_file() else None
+
+    def stats(self):
+        """Profiler state for /health"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'directory': str(self.directory) if self.directory else None,
+                'profiled': self.profiled,
+                'skipped': self.skipped,
+                'reports_in_memory': len(self._reports)
+            }
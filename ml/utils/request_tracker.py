@@ -4,31 +4,116 @@ Provides request tracking functionality for Flask ML API
 """
 
 import uuid
+import atexit
 import logging
+import queue
+import random
 import time
 from datetime import datetime, timezone
-from flask import request, g, has_request_context
+from flask import request, g, has_request_context, current_app
 from functools import wraps
 import json
 
+from .metrics import REGISTRY, collect_stages, observe_stages, server_timing
+from .request_profiler import PROFILE_HEADER, TOP_N_HEADER, safe_profile_id
+from .async_logging import (
+    LOG_RECORDS_DROPPED,
+    BatchingQueueListener,
+    BatchStreamHandler,
+    RecordQueueHandler,
+    follow_forks
+)
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "ml_api_request_seconds",
+    "Seconds from route entry to response, per endpoint",
+    ["endpoint", "method", "status"]
+)
+REQUESTS_TOTAL = REGISTRY.counter(
+    "ml_api_requests_total",
+    "Requests handled, per endpoint and status",
+    ["endpoint", "method", "status"]
+)
+
+# Set by setup_logging: the share of requests whose info logs are written,
+# and the queue writer when logging asynchronously.
+log_sample_rate = 1.0
+log_listener = None
+
 def generate_request_id():
     """Generate unique request ID"""
     timestamp = str(int(time.time() * 1000))
     random_part = str(uuid.uuid4())[:8]
     return f"req_{timestamp}_{random_part}"
 
+def response_status(result):
+    """HTTP status of whatever a view returned.
+
+    That is a response, or a (body, status[, headers]) tuple.
+    """
+    if isinstance(result, tuple):
+        return result[1] if len(result) > 1 and isinstance(result[1], int) else 200
+    return getattr(result, 'status_code', 200)
+
+def record_request(duration_seconds, status):
+    """Count the current request and observe its duration"""
+    labels = {'endpoint': request.endpoint, 'method': request.method, 'status': status}
+    REQUEST_SECONDS.observe(duration_seconds, **labels)
+    REQUESTS_TOTAL.inc(**labels)
+
+def request_profiler():
+    """The app's RequestProfiler (app.extensions['request_profiler']), if it has one"""
+    return current_app.extensions.get('request_profiler')
+
+def profiling_requested():
+    """The profiler to use if this request presented the profiling secret, else None"""
+    profiler = request_profiler()
+    token = request.headers.get(PROFILE_HEADER)
+    if profiler is not None and profiler.authorized(token):
+        return profiler
+    return None
+
+def save_profile(profiler, profile, request_id):
+    """Store the request's top-N report; returns the ID it can be fetched by"""
+    profile_id = request_id if safe_profile_id(request_id) else generate_request_id()
+    top_n = profiler.limit(request.headers.get(TOP_N_HEADER))
+    path = profiler.save(profile_id, profiler.report(profile, top_n))
+    log_with_context('info', 'ML API Request Profiled', {
+        'endpoint': request.endpoint,
+        'profile_id': profile_id,
+        'top_n': top_n,
+        'path': str(path) if path else None
+    })
+    return profile_id
+
 def setup_request_tracking():
     """Setup tracking ID for current request"""
     request_id = request.headers.get('X-Request-ID', generate_request_id())
     g.request_id = request_id
+    # Sample whole requests, so a kept request has both its start and end lines.
+    g.log_sampled = log_sample_rate >= 1 or random.random() < log_sample_rate
     return request_id
 
+def log_enabled(level):
+    """False for info logs of a request that was sampled out.
+
+    Warnings and errors are always kept.
+    """
+    if level in ('error', 'warn') or not has_request_context():
+        return True
+    if getattr(g, 'log_sampled', True):
+        return True
+    LOG_RECORDS_DROPPED.inc(reason='sampled')
+    return False
+
 def log_with_context(level, message, context=None):
     """Log with request context information"""
+    if not log_enabled(level):
+        return
     request_id = getattr(g, 'request_id', 'unknown')
     
+    # The formatter adds the timestamp, from record.created, when it writes the record.
     log_data = {
-        'timestamp': datetime.now(timezone.utc).isoformat(),  # ✅ changed here
         'request_id': request_id,
         'level': level,
         'message': message,
@@ -53,18 +138,25 @@ def with_request_tracking(f):
         request_id = setup_request_tracking()
         
         # Log request start
-        log_with_context('info', f'ML API Request Started', {
-            'endpoint': request.endpoint,
-            'method': request.method,
-            'user_agent': request.headers.get('User-Agent'),
-            'remote_addr': request.remote_addr
-        })
+        if log_enabled('info'):
+            log_with_context('info', f'ML API Request Started', {
+                'endpoint': request.endpoint,
+                'method': request.method,
+                'user_agent': request.headers.get('User-Agent'),
+                'remote_addr': request.remote_addr
+            })
         
         start_time = time.time()
+        profiler = profiling_requested()
+        profile = None
         
         try:
-            # Execute original function
-            result = f(*args, **kwargs)
+            # Execute original function, timing its stages (and profiling it on request)
+            with collect_stages() as stages:
+                if profiler is not None:
+                    result, profile = profiler.run(f, *args, **kwargs)
+                else:
+                    result = f(*args, **kwargs)
             
             # Log request success
             duration = (time.time() - start_time) * 1000
@@ -74,9 +166,19 @@ def with_request_tracking(f):
                 'status': 'success'
             })
             
-            # Add request ID to response headers
+            record_request(duration / 1000, response_status(result))
+            observe_stages(stages, request.endpoint)
+
+            profile_id = None
+            if profile is not None:
+                profile_id = save_profile(profiler, profile, request_id)
+
+            # Add request ID and stage timings to response headers
             if hasattr(result, 'headers'):
                 result.headers['X-Request-ID'] = request_id
+                result.headers['Server-Timing'] = server_timing(stages, duration / 1000)
+                if profile_id:
+                    result.headers['X-Profile-Id'] = profile_id
             
             return result
             
@@ -89,6 +191,7 @@ def with_request_tracking(f):
                 'error': str(error),
                 'error_type': type(error).__name__
             })
+            record_request(duration / 1000, 'error')
             
             raise error
     
@@ -101,12 +204,17 @@ class RequestTrackingFormatter(logging.Formatter):
     def format(self, record):
         # If has structured log data, use JSON format
         if hasattr(record, 'log_data'):
-            return json.dumps(record.log_data, ensure_ascii=False)
-        
-        # Otherwise use standard format
-        # request_id = getattr(g, 'request_id', 'unknown') if hasattr(g, 'request_id') else 'unknown'
+            log_data = record.log_data
+            if 'timestamp' not in log_data:
+                created = datetime.fromtimestamp(record.created, timezone.utc)
+                log_data = {'timestamp': created.isoformat(), **log_data}
+            return json.dumps(log_data, ensure_ascii=False)
         
-        if has_request_context():
+        # Otherwise use standard format; records written by the queue writer
+        # carry the request ID they were logged under.
+        if hasattr(record, 'request_id'):
+            request_id = record.request_id
+        elif has_request_context():
             request_id = getattr(g, 'request_id', 'unknown')
         else:
             request_id = 'unknown'
@@ -114,13 +222,29 @@ class RequestTrackingFormatter(logging.Formatter):
         formatted = super().format(record)
         return f"[{request_id}] {formatted}"
 
-def setup_logging():
-    """Configure ML API logging system"""
+def current_request_id():
+    """The current request's ID, or None outside a request"""
+    return getattr(g, 'request_id', 'unknown') if has_request_context() else None
+
+def setup_logging(asynchronous=False, sample_rate=1.0, queue_size=10000,
+                  batch_size=256):
+    """Configure ML API logging system
+
+    With asynchronous=True the root logger only puts records on a queue and
+    a writer thread formats and writes them in batches. sample_rate is the
+    share of requests whose info logs are kept.
+    """
+    global log_sample_rate, log_listener
+    log_sample_rate = sample_rate
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
     
     # Create console handler
-    handler = logging.StreamHandler()
+    handler = BatchStreamHandler() if asynchronous else logging.StreamHandler()
     handler.setLevel(logging.INFO)
     
     # Set format
@@ -131,6 +255,25 @@ def setup_logging():
     
     # Clear existing handlers and add new one
     logger.handlers.clear()
+    if asynchronous:
+        log_queue = queue.Queue(queue_size)
+        log_listener = BatchingQueueListener(log_queue, handler, batch_size)
+        follow_forks(log_listener)
+        # Write out whatever is still queued when the process exits.
+        atexit.register(log_listener.stop)
+        log_listener.start()
+        handler = RecordQueueHandler(log_queue, stamp=current_request_id)
+        handler.setLevel(logging.INFO)
     logger.addHandler(handler)
     
     return logger
+
+def logging_stats():
+    """Log pipeline state for /health"""
+    return {
+        'asynchronous': log_listener is not None,
+        'sample_rate': log_sample_rate,
+        'writer': log_listener.stats() if log_listener is not None else None,
+        'dropped_sampled': LOG_RECORDS_DROPPED.value(reason='sampled'),
+        'dropped_queue_full': LOG_RECORDS_DROPPED.value(reason='queue_full')
+    }
@@ -0,0 +1,72 @@
+"""
+Vectorized Busyness Scoring for ML API
+Classifies predictions against p10-p90 thresholds and blends subway/taxi scores
+"""
+
+import numpy as np
+
+LEVELS = ("Very Quiet", "Quiet", "Moderate", "Busy", "Very Busy", "Extremely Busy")
+LEVEL_TO_SCORE = {level: score for score, level in enumerate(LEVELS)}
+SCORE_TO_LEVEL = {score: level for level, score in LEVEL_TO_SCORE.items()}
+PERCENTILE_COLUMNS = ["p10", "p25", "p50", "p75", "p90"]
+
+UNKNOWN_LEVEL = "Unknown"
+UNKNOWN_CODE = -1
+SUBWAY_WEIGHT = 0.7
+TAXI_WEIGHT = 0.3
+DEFAULT_SCORE = 2
+
+# Index -1 picks the trailing "Unknown" entry.
+_LEVEL_NAMES = np.array(LEVELS + (UNKNOWN_LEVEL,), dtype=object)
+
+
+def level_codes(values, thresholds):
+    """Level index per row (0-5), or -1 where the value is missing.
+
+    values has shape (n,), thresholds (n, 5) ordered p10..p90. A value falls
+    into the first band whose threshold it is below; NaN thresholds never
+    match, exactly like the scalar classify_level.
+    """
+    values = np.asarray(values, dtype=float)
+    thresholds = np.asarray(thresholds, dtype=float)
+    thresholds = thresholds.reshape(len(values), len(PERCENTILE_COLUMNS))
+    below = values[:, None] < thresholds
+    conditions = [np.isnan(values)] + [below[:, i] for i in range(below.shape[1])]
+    choices = [UNKNOWN_CODE] + list(range(below.shape[1]))
+    return np.select(conditions, choices, default=len(LEVELS) - 1)
+
+
+def codes_to_levels(codes):
+    """Map level codes to level names"""
+    return _LEVEL_NAMES[np.asarray(codes)]
+
+
+def codes_to_scores(codes):
+    """Map level codes to scores; unknown rows become NaN"""
+    codes = np.asarray(codes)
+    unknown = codes == UNKNOWN_CODE
+    if not unknown.any():
+        return codes.astype(int)
+    return np.where(unknown, np.nan, codes.astype(float))
+
+
+def classify_levels(values, thresholds):
+    """Vectorized classify_level: returns (levels, scores) arrays"""
+    codes = level_codes(values, thresholds)
+    return codes_to_levels(codes), codes_to_scores(codes)
+
+
+def combined_scores(subway_scores, taxi_scores):
+    """Blend subway and taxi scores 0.7/0.3, using whichever exists if only one does.
+
+    Rows with neither score fall back to DEFAULT_SCORE ("Moderate").
+    """
+    subway = np.asarray(subway_scores, dtype=float)
+    taxi = np.asarray(taxi_scores, dtype=float)
+    has_subway = ~np.isnan(subway)
+    has_taxi = ~np.isnan(taxi)
+    return np.select(
+        [has_subway & has_taxi, has_taxi, has_subway],
+        [SUBWAY_WEIGHT * subway + TAXI_WEIGHT * taxi, taxi, subway],
+        default=DEFAULT_SCORE
+    )
@@ -0,0 +1,70 @@
+"""
+Single Flight for ML API
+Coalesces concurrent computations of the same prediction snapshot into one
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """At most one computation per key at a time; concurrent callers share its outcome.
+
+    The first caller for a key (the leader) computes; callers that arrive
+    while it runs block on the same Future and get its result, or its
+    exception re-raised. The key is forgotten as soon as the leader
+    finishes, so results are not cached here; callers are expected to put
+    them in the snapshot cache before finishing.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def begin(self, key):
+        """(future, leader): a leader must compute the value, then call finish(key)"""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            self.executed += 1
+            return future, True
+
+    def finish(self, key, result=None, error=None):
+        """Publish the leader's result (or exception) to everyone waiting on key"""
+        with self._lock:
+            future = self._flights.pop(key)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn, *args, **kwargs):
+        """(result, shared): fn's result, computed here or by a concurrent caller.
+
+        shared is True when another caller computed it.
+        """
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result)
+        return result, False
+
+    def stats(self):
+        """Counters for /health"""
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._flights)
+            }
@@ -0,0 +1,92 @@
+"""
+Snapshot Cache for ML API
+Bounded TTL + LRU cache for /predict-all prediction snapshots
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def hour_bucket(ts):
+    """Normalize a timestamp to the start of its hour"""
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def weather_signature(weather):
+    """Build a hashable signature from a weather dict"""
+    return tuple(sorted(weather.items()))
+
+
+def snapshot_key(ts, weather):
+    """Cache key for a prediction snapshot: hour bucket + weather signature"""
+    return (hour_bucket(ts).isoformat(), weather_signature(weather))
+
+
+class SnapshotCache:
+    """Thread-safe cache that expires entries after a TTL and evicts the least recent"""
+
+    def __init__(self, max_entries=64, ttl_seconds=600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, ttl_seconds=None):
+        """Store value under key, evicting the least recently used entries if full"""
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """Drop one entry, or all when key is None; returns the number removed"""
+        with self._lock:
+            if key is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            return 1 if self._entries.pop(key, None) is not None else 0
+
+    def stats(self):
+        """Counters for health reporting"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
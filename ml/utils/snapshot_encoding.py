@@ -0,0 +1,126 @@
+"""
+Snapshot Encoding for ML API
+Strong ETags and once-per-snapshot gzip/brotli encodings for cached predictions
+"""
+
+import gzip
+import hashlib
+import threading
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli installed
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+
+def available_encodings():
+    """Content codings this process can produce, preferred first"""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def compress(body, encoding):
+    if encoding == "gzip":
+        # mtime=0 keeps the bytes (and so the ETag meaning) stable across runs.
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+
+def model_version(paths):
+    """Short content hash of the model files; a redeployed model changes every ETag"""
+    digest = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        digest.update(path.name.encode())
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def snapshot_etag(key, version):
+    """Strong ETag value (unquoted) for a snapshot cache key and model version"""
+    hour, weather = key
+    return hashlib.sha256(f"{hour}|{weather!r}|{version}".encode()).hexdigest()[:32]
+
+
+def variant_etag(etag, encoding, variant=None):
+    """Each representation (variant and content coding) gets its own strong ETag"""
+    parts = [etag]
+    if variant:
+        parts.append(variant)
+    if encoding != "identity":
+        parts.append(encoding)
+    return "-".join(parts)
+
+
+class EncodedSnapshot:
+    """A cached snapshot with its ETag and lazily built representations.
+
+    render(source, variant) produces the body for a variant (None is the
+    default one). Each body and each compressed encoding of it is built at
+    most once, on first request, and then served from memory for as long as
+    the snapshot stays cached. Variants for which keep(variant) is false are
+    rendered and compressed on every request instead, so open-ended variants
+    (tiles, field projections) cannot grow a snapshot without bound.
+    """
+
+    def __init__(self, source, etag, render, keep=None):
+        self.source = source
+        self.etag = etag
+        self._render = render
+        self._keep = keep
+        self._bodies = {}
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def stores(self, variant):
+        """True if the variant's bodies are kept on the snapshot"""
+        return self._keep is None or self._keep(variant)
+
+    def body(self, variant=None):
+        """Uncompressed body of a variant"""
+        if not self.stores(variant):
+            return self._render(self.source, variant)
+        data = self._bodies.get(variant)
+        if data is None:
+            with self._lock:
+                data = self._bodies.get(variant)
+                if data is None:
+                    data = self._render(self.source, variant)
+                    self._bodies[variant] = data
+        return data
+
+    def encoded(self, encoding, variant=None):
+        """Body of a variant in the given content coding ("identity", "gzip" or "br")"""
+        if encoding == "identity":
+            return self.body(variant)
+        if not self.stores(variant):
+            return compress(self.body(variant), encoding)
+        data = self._encoded.get((variant, encoding))
+        if data is None:
+            body = self.body(variant)
+            with self._lock:
+                data = self._encoded.get((variant, encoding))
+                if data is None:
+                    data = compress(body, encoding)
+                    self._encoded[(variant, encoding)] = data
+        return data
+
+    def sizes(self):
+        """Byte size per representation built so far"""
+        sizes = {(variant, "identity"): len(body)
+                 for variant, body in self._bodies.items()}
+        sizes.update({key: len(data) for key, data in self._encoded.items()})
+        return sizes
+
+
+def negotiate_encoding(accept_encodings):
+    """Best content coding for a werkzeug Accept-Encoding header object"""
+    encoding = accept_encodings.best_match(available_encodings() + ["identity"],
+                                           default="identity")
+    return encoding or "identity"
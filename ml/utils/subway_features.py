@@ -0,0 +1,119 @@
+"""
+Subway Feature Builder for ML API
+Preallocated station feature matrix and index-based station -> zone aggregation
+"""
+
+import numpy as np
+
+from .calendar_features import calendar_features
+
+
+def temp_category(t):
+    """Ordinal temperature band: freezing 0, cold 1, mild 2, warm 3, hot 4"""
+    if t < 0:
+        return 0
+    elif t < 10:
+        return 1
+    elif t < 20:
+        return 2
+    elif t < 30:
+        return 3
+    else:
+        return 4
+
+
+def subway_time_weather_features(ts, weather, calendar=None):
+    """All subway model inputs that depend on time or weather (same for all stations)"""
+    cal = calendar.lookup(ts) if calendar is not None else calendar_features(ts)
+    temp = weather["temp"]
+    main = weather["weather_main"].lower()
+    return {
+        "hour": cal["hour"],
+        "day_of_week": cal["day_of_week"],
+        "month": cal["month"],
+        "is_rush_hour": cal["is_rush_hour"],
+        "is_weekend": cal["is_weekend"],
+        "is_holiday": cal["is_holiday"],
+        "hour_sin": cal["hour_sin"],
+        "hour_cos": cal["hour_cos"],
+        "dow_sin": cal["dow_sin"],
+        "dow_cos": cal["dow_cos"],
+        "month_sin": cal["month_sin"],
+        "month_cos": cal["month_cos"],
+        "temp": temp,
+        "humidity": weather["humidity"],
+        "wind_speed": weather["wind_speed"],
+        "feels_like": weather["feels_like"],
+        "has_rain": int("rain" in main),
+        "has_snow": int("snow" in main),
+        "is_freezing": int(temp < 0),
+        "is_hot": int(temp > 30),
+        "temp_category": temp_category(temp)
+    }
+
+
+DYNAMIC_FEATURES = frozenset([
+    "hour", "day_of_week", "month", "is_rush_hour", "is_weekend", "is_holiday",
+    "hour_sin", "hour_cos", "dow_sin", "dow_cos", "month_sin", "month_cos",
+    "temp", "humidity", "wind_speed", "feels_like",
+    "has_rain", "has_snow", "is_freezing", "is_hot", "temp_category"
+])
+
+
+class SubwayFeatureBuilder:
+    """Builds the subway model input matrix without going through pandas.
+
+    Static station columns (latitude, longitude, is_cbd, ...) are written
+    once into a float32 template ordered like required_features.json. Each
+    request tiles the template and broadcasts only the time/weather columns.
+    Station predictions are summed into zones with a precomputed index array.
+    """
+
+    def __init__(self, station_meta, feature_names, station_to_zone, calendar=None):
+        self.calendar = calendar
+        self.feature_names = list(feature_names)
+        self.station_ids = station_meta["station_complex_id"].to_numpy()
+        self.n_stations = len(self.station_ids)
+
+        self._template = np.zeros((self.n_stations, len(self.feature_names)),
+                                  dtype=np.float32)
+        self._dynamic_columns = []
+        for j, name in enumerate(self.feature_names):
+            if name in DYNAMIC_FEATURES:
+                self._dynamic_columns.append((j, name))
+            else:
+                self._template[:, j] = station_meta[name].to_numpy(dtype=np.float32)
+
+        # (station row, zone) pairs in station order, like an inner merge on
+        # station_complex_id.
+        station_rows = {sid: i for i, sid in enumerate(self.station_ids)}
+        mapping = station_to_zone.dropna(subset=["station_complex_id", "PULocationID"])
+        mapping = mapping[mapping["station_complex_id"].isin(station_rows)]
+        rows = mapping["station_complex_id"].map(station_rows).to_numpy(dtype=np.int64)
+        order = np.argsort(rows, kind="stable")
+        self._pair_stations = rows[order]
+        zones = mapping["PULocationID"].to_numpy()[order]
+        self.zone_ids = np.unique(zones)
+        self._pair_zones = np.searchsorted(self.zone_ids, zones)
+
+    def matrix(self, moments):
+        """Feature matrix for (ts, weather) moments, one block of stations per moment"""
+        out = np.tile(self._template, (len(moments), 1))
+        for k, (ts, weather) in enumerate(moments):
+            values = subway_time_weather_features(ts, weather, self.calendar)
+            block = out[k * self.n_stations:(k + 1) * self.n_stations]
+            for j, name in self._dynamic_columns:
+                block[:, j] = values[name]
+        return out
+
+    def zone_totals(self, predictions):
+        """Sum one moment's station predictions into zones: (zone_ids, totals)"""
+        predictions = np.asarray(predictions)
+        totals = np.bincount(
+            self._pair_zones,
+            weights=predictions[self._pair_stations],
+            minlength=len(self.zone_ids)
+        )
+        # Keep the model's float32 precision, as the groupby sum did.
+        dtype = np.result_type(predictions.dtype, np.float32)
+        return self.zone_ids, totals.astype(dtype, copy=False)
@@ -0,0 +1,98 @@
+# Importing.
+import io
+import logging
+import os
+import queue
+
+from ml.utils.async_logging import (
+    LOG_RECORDS_DROPPED,
+    BatchingQueueListener,
+    BatchStreamHandler,
+    RecordQueueHandler
+)
+
+
+def make_record(message, level=logging.INFO):
+    return logging.LogRecord("test", level, "", 0, message, (), None)
+
+
+# Stream that counts writes, to check records are batched.
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+# Test: a batch is formatted record by record but written once.
+def test_emit_batch_writes_once():
+    stream = CountingStream()
+    handler = BatchStreamHandler(stream)
+    handler.setLevel(logging.INFO)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    handler.emit_batch([make_record("one"), make_record("skip", logging.DEBUG),
+                        make_record("two", logging.ERROR)])
+    assert stream.getvalue() == "INFO one\nERROR two\n"
+    assert stream.writes == 1
+
+
+# Test: the listener drains everything queued, in order, and stop() flushes.
+def test_listener_drains_queue():
+    stream = io.StringIO()
+    handler = BatchStreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log_queue = queue.Queue()
+    for i in range(10):
+        log_queue.put(make_record(f"line {i}"))
+    listener = BatchingQueueListener(log_queue, handler, batch_size=4)
+    listener.start()
+    listener.stop()
+
+    assert stream.getvalue().splitlines() == [f"line {i}" for i in range(10)]
+    assert listener.stats()["written"] == 10
+    assert listener.stats()["batches"] >= 3
+    assert not listener.running
+
+
+# Test: the queue handler stamps the request ID and drops only info records when full.
+def test_queue_handler_stamps_and_drops():
+    log_queue = queue.Queue(1)
+    handler = RecordQueueHandler(log_queue, stamp=lambda: "req_1")
+    before = LOG_RECORDS_DROPPED.value(reason="queue_full")
+
+    handler.handle(make_record("kept"))
+    handler.handle(make_record("dropped"))
+    assert LOG_RECORDS_DROPPED.value(reason="queue_full") == before + 1
+
+    record = log_queue.get_nowait()
+    assert record.getMessage() == "kept"
+    assert record.request_id == "req_1"
+
+    handler.handle(make_record("error", logging.ERROR))
+    assert log_queue.get_nowait().getMessage() == "error"
+
+
+# Test: a forked child gets its own writer thread.
+def test_listener_restarts_after_fork(tmp_path):
+    from ml.utils.async_logging import follow_forks
+    path = tmp_path / "log.txt"
+    handler = BatchStreamHandler(open(path, "w"))
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = BatchingQueueListener(queue.Queue(), handler)
+    follow_forks(listener)
+    listener.start()
+
+    pid = os.fork()
+    if pid == 0:
+        listener.queue.put(make_record("child"))
+        listener.stop()
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert listener.running
+    listener.queue.put(make_record("parent"))
+    listener.stop()
+    handler.close()
+    assert sorted(path.read_text().splitlines()) == ["child", "parent"]
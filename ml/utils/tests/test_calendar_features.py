@@ -0,0 +1,62 @@
+# Importing.
+import holidays
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from ml.utils.calendar_features import CalendarTable, calendar_features
+
+
+# Test: every hour in the table matches the on-the-fly features, values and types.
+def test_table_matches_calendar_features():
+    table = CalendarTable(2025, 2025)
+    assert len(table) == 365 * 24
+
+    ts = datetime(2025, 1, 1)
+    while ts.year == 2025:
+        expected = calendar_features(ts)
+        row = table.lookup(ts)
+        assert row.keys() == expected.keys()
+        for name, value in expected.items():
+            assert row[name] == value and type(row[name]) is type(value), (ts, name)
+        ts += timedelta(hours=7)
+
+
+# Test: holidays agree with a fresh holidays.UnitedStates() object.
+def test_holidays_match_holidays_package():
+    table = CalendarTable(2025, 2026)
+    us = holidays.UnitedStates()
+
+    for day in [datetime(2025, 7, 4, 12), datetime(2025, 11, 27, 9),
+                datetime(2026, 1, 1, 0), datetime(2025, 7, 5, 12)]:
+        assert table.lookup(day)["is_holiday"] == int(day.date() in us)
+
+
+# Test: rush (subway) and peak (taxi) hours differ at 9am; weekends are flagged.
+def test_rush_peak_and_weekend_flags():
+    table = CalendarTable(2025, 2025)
+    saturday_nine = table.lookup(datetime(2025, 7, 26, 9))
+
+    assert saturday_nine["is_rush_hour"] == 1
+    assert saturday_nine["is_peak_hour"] == 0
+    assert saturday_nine["is_weekend"] == 1
+    assert saturday_nine["day_of_week"] == 5
+
+
+# Test: rows are keyed by NY wall-clock hour, tz-aware timestamps included.
+def test_lookup_uses_local_wall_clock():
+    table = CalendarTable(2025, 2025)
+    ny = datetime(2025, 3, 9, 3, tzinfo=ZoneInfo("America/New_York"))
+
+    assert table.row_index(ny) == (31 + 28 + 8) * 24 + 3
+    assert table.lookup(ny)["hour"] == 3
+
+
+# Test: timestamps outside the table fall back to computed features.
+def test_out_of_range_falls_back():
+    table = CalendarTable(2025, 2025)
+    ts = datetime(2027, 12, 25, 8)
+
+    assert table.row_index(ts) == -1
+    assert table.lookup(ts) == calendar_features(ts)
+    assert table.stats()["misses"] == 1
+    assert table.stats()["hits"] == 0
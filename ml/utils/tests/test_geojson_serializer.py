@@ -0,0 +1,169 @@
+# Importing.
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from flask import Flask, jsonify
+
+from ml.utils import geojson_serializer
+from ml.utils.geojson_serializer import (
+    GeoJSONSerializer,
+    Representation,
+    batch_body,
+    frame_records,
+    representation_name
+)
+from ml.utils.geometry_store import GeometryStore
+
+POLYGON = "POLYGON ((-74.0 40.7, -74.0 40.71, -73.99 40.71, -73.99 40.7, -74.0 40.7))"
+STORE = GeometryStore.from_zones(
+    pd.DataFrame({"OBJECTID": [4, 24], "geometry": [POLYGON, POLYGON]})
+)
+RESULT = pd.DataFrame({
+    "PULocationID": [4, 24, 99],
+    "taxi_level": ["Busy", "Quiet", "No Data"],
+    "taxi_score": [3, 1, 2],
+    "subway_score": [np.nan, 2.0, 4.0],
+    "combined_score": [3.0, 1.3, 2.0],
+})
+TS = datetime(2025, 7, 25, 8, tzinfo=timezone.utc)
+WEATHER = {"temp": 21.5, "weather_main": "Clouds"}
+
+
+def jsonify_payload(result):
+    """The dict-per-row payload the serializer replaces, encoded by jsonify"""
+    features = []
+    for _, row in result.iterrows():
+        props = {k: (None if pd.isna(v) else v) for k, v in row.items()}
+        geometry = STORE.get(row["PULocationID"])
+        features.append({"type": "Feature", "properties": props, "geometry": geometry})
+    payload = {
+        "type": "FeatureCollection",
+        "properties": {"timestamp": TS, "weather": WEATHER},
+        "features": features
+    }
+    with Flask(__name__).app_context():
+        return jsonify(payload).data
+
+
+# Test: output is byte-identical to jsonify of the old payload with the stdlib
+# encoder.
+def test_matches_jsonify_bytes(monkeypatch):
+    monkeypatch.setattr(geojson_serializer, "orjson", None)
+    body = GeoJSONSerializer(STORE).feature_collection(RESULT, TS, WEATHER)
+
+    assert body + b"\n" == jsonify_payload(RESULT)
+
+
+# Test: the default encoder produces the same document.
+def test_default_encoder_matches_values():
+    body = GeoJSONSerializer(STORE).feature_collection(RESULT, TS, WEATHER)
+    data = json.loads(body)
+
+    assert data == json.loads(jsonify_payload(RESULT))
+    assert data["features"][2]["geometry"] == {}
+    assert data["features"][0]["properties"]["subway_score"] is None
+    assert data["properties"]["timestamp"] == "Fri, 25 Jul 2025 08:00:00 GMT"
+
+
+# Test: records hold native Python values with NaN as None.
+def test_frame_records_native_values():
+    records = frame_records(RESULT)
+
+    assert records[0] == {"PULocationID": 4, "taxi_level": "Busy", "taxi_score": 3,
+                          "subway_score": None, "combined_score": 3.0}
+    assert type(records[1]["PULocationID"]) is int
+    assert type(records[1]["subway_score"]) is float
+
+
+# Test: serialization time is counted separately.
+def test_stats_track_serialization():
+    serializer = GeoJSONSerializer(STORE)
+    assert serializer.stats()["prepare"]["count"] == 0
+
+    prepared = serializer.prepare(RESULT, TS, WEATHER)
+    serializer.render(prepared)
+    serializer.render(prepared)
+    stats = serializer.stats()
+    assert stats["prepare"]["count"] == 1
+    assert stats["render"]["count"] == 2
+    assert stats["zones"] == 2
+    assert stats["render"]["last_ms"] >= 0
+
+
+# Test: detail levels swap only the geometry; properties are encoded once.
+def test_render_detail_levels():
+    detailed = ("POLYGON ((-74.00000012345 40.70000012345, "
+                "-74.00000012345 40.71000012345, -73.99000012345 40.71000012345, "
+                "-73.99000012345 40.70000012345, -74.00000012345 40.70000012345))")
+    store = GeometryStore.from_zones(
+        pd.DataFrame({"OBJECTID": [4, 24], "geometry": [detailed, detailed]})
+    )
+    serializer = GeoJSONSerializer(store, levels=[(4, 0.0001)])
+    prepared = serializer.prepare(RESULT, TS, WEATHER)
+    full = json.loads(serializer.render(prepared))
+    low = json.loads(serializer.render(prepared, (4, 0.0001)))
+
+    assert serializer.has_level((4, 0.0001)) and not serializer.has_level((3, 0.0))
+
+    def properties(collection):
+        return [f["properties"] for f in collection["features"]]
+    assert properties(low) == properties(full)
+    assert low["features"][0]["geometry"]["coordinates"][0][0] == [-74.0, 40.7]
+    low_bytes = serializer.render(prepared, (4, 0.0001))
+    assert len(low_bytes) < len(serializer.render(prepared))
+
+
+# Test: columnar output holds parallel arrays aligned on PULocationID.
+def test_columnar():
+    serializer = GeoJSONSerializer(STORE)
+    prepared = serializer.prepare(RESULT, TS, WEATHER)
+
+    data = json.loads(serializer.columnar(prepared, ["combined_score"]))
+    assert data["type"] == "PredictionColumns"
+    assert data["columns"] == {
+        "PULocationID": [4, 24, 99], "combined_score": [3.0, 1.3, 2.0]
+    }
+    assert data["properties"]["weather"] == WEATHER
+
+    everything = json.loads(serializer.columnar(prepared))["columns"]
+    assert everything["subway_score"] == [None, 2.0, 4.0]
+    assert set(everything) == set(RESULT.columns)
+
+
+# Test: projected GeoJSON keeps only the requested properties and drops geometry
+# unless asked.
+def test_render_projected_fields():
+    serializer = GeoJSONSerializer(STORE)
+    prepared = serializer.prepare(RESULT, TS, WEATHER)
+
+    bare = json.loads(serializer.render(prepared, fields=("taxi_level",)))
+    properties = {"PULocationID": 4, "taxi_level": "Busy"}
+    assert bare["features"][0] == {"type": "Feature", "properties": properties}
+    fields = ("taxi_level", "geometry")
+    with_geometry = json.loads(serializer.render(prepared, fields=fields))
+    assert with_geometry["features"][0]["geometry"]["type"] == "Polygon"
+    assert with_geometry["features"][0]["properties"] == properties
+
+
+# Test: representations dispatch to the right renderer and get distinct names.
+def test_render_representation():
+    serializer = GeoJSONSerializer(STORE)
+    prepared = serializer.prepare(RESULT, TS, WEATHER)
+
+    assert serializer.render_representation(prepared) == serializer.render(prepared)
+    columnar = Representation("columnar", ("taxi_score",))
+    assert serializer.render_representation(prepared, columnar) == (
+        serializer.columnar(prepared, ("taxi_score",))
+    )
+    assert representation_name(None) is None
+    assert representation_name(columnar) == "columnar-taxi_score"
+    detailed = Representation(fields=("taxi_level", "geometry"), level=(4, 0.0001))
+    assert representation_name(detailed) == "taxi_level+geometry-p4-s0.0001"
+
+
+# Test: batch bytes wrap serialized collections in order.
+def test_batch_body():
+    data = json.loads(batch_body([b'{"a":1}', b'{"b":2}']))
+    assert data == {"type": "PredictionBatch", "count": 2,
+                    "predictions": [{"a": 1}, {"b": 2}]}
@@ -0,0 +1,96 @@
+# Importing.
+import json
+import pandas as pd
+
+from ml.utils.geometry_store import (
+    FULL_DETAIL,
+    GeometryStore,
+    detail_name,
+    parse_geometry,
+    reduce_geometry
+)
+
+POLYGON = "POLYGON ((-74.0 40.7, -74.0 40.71, -73.99 40.71, -73.99 40.7, -74.0 40.7))"
+MULTIPOLYGON = ("MULTIPOLYGON "
+                "(((-74.0 40.7, -74.0 40.71, -73.99 40.71, -73.99 40.7, -74.0 40.7)))")
+
+
+# Test: a POLYGON is parsed into list-based GeoJSON coordinates.
+def test_parse_polygon():
+    geom = parse_geometry(POLYGON)
+    assert geom["type"] == "Polygon"
+    assert len(geom["coordinates"][0]) == 5
+    assert geom["coordinates"][0][0] == [-74.0, 40.7]
+
+
+# Test: a MULTIPOLYGON keeps its extra nesting level.
+def test_parse_multipolygon():
+    geom = parse_geometry(MULTIPOLYGON)
+    assert geom["type"] == "MultiPolygon"
+    assert geom["coordinates"][0][0][2] == [-73.99, 40.71]
+
+
+# Test: blank, missing, invalid or unsupported geometry parses to {}.
+def test_parse_unsupported_geometry():
+    assert parse_geometry("") == {}
+    assert parse_geometry(float("nan")) == {}
+    assert parse_geometry("POLYGON ((garbage") == {}
+    assert parse_geometry("LINESTRING (-74.0 40.7, -74.0 40.71)") == {}
+
+
+# Test: the store is keyed by integer zone ID and is JSON-serializable.
+def test_store_from_zones():
+    zones = pd.DataFrame([
+        {"OBJECTID": 4, "geometry": POLYGON},
+        {"OBJECTID": 12, "geometry": MULTIPOLYGON},
+    ])
+    store = GeometryStore.from_zones(zones)
+
+    assert len(store) == 2
+    assert store.get(4)["type"] == "Polygon"
+    assert store.get(12.0)["type"] == "MultiPolygon"
+    assert store.get(99) == {}
+    assert store.get(float("nan")) == {}
+    json.dumps(store.get(4))
+
+
+# Test: an empty zones table yields an empty store instead of failing.
+def test_store_from_empty_zones():
+    assert len(GeometryStore.from_zones(pd.DataFrame())) == 0
+
+
+# Test: rounding keeps rings closed and drops points that collapse together.
+def test_reduce_geometry_rounds_coordinates():
+    geom = {"type": "Polygon", "coordinates": [[
+        [-74.0000001, 40.7000001], [-74.0000002, 40.7000002], [-74.0, 40.71],
+        [-73.99, 40.71], [-73.99, 40.7], [-74.0000001, 40.7000001]
+    ]]}
+    ring = reduce_geometry(geom, precision=4)["coordinates"][0]
+
+    assert ring[0] == ring[-1] == [-74.0, 40.7]
+    assert len(ring) == 5
+
+
+# Test: simplification removes near-collinear points and keeps MultiPolygon
+# nesting.
+def test_reduce_geometry_simplifies():
+    wiggly = ("POLYGON ((-74.0 40.7, -74.0 40.705, -74.000001 40.708, -74.0 40.71, "
+              "-73.99 40.71, -73.99 40.7, -74.0 40.7))")
+    simplified = reduce_geometry(parse_geometry(wiggly), tolerance=0.0001)
+    assert len(simplified["coordinates"][0]) == 5
+    reduced = reduce_geometry(parse_geometry(MULTIPOLYGON), precision=5,
+                              tolerance=0.0001)
+    assert reduced["type"] == "MultiPolygon"
+    assert reduce_geometry({}, precision=4) == {}
+
+
+# Test: reduced stores are built per level and full detail is the same store.
+def test_store_reduced():
+    store = GeometryStore.from_zones(
+        pd.DataFrame([{"OBJECTID": 4, "geometry": POLYGON}])
+    )
+
+    assert store.reduced(*FULL_DETAIL) is store
+    assert store.reduced(4, 0.0001).get(4)["coordinates"][0][0] == [-74.0, 40.7]
+    assert detail_name((5, 0.00001)) == "p5-s1e-05"
+    assert detail_name(FULL_DETAIL) == "pfull-s0"
@@ -0,0 +1,59 @@
+# Importing.
+import threading
+
+from ml.utils.horizon_precompute import HorizonPrecomputer
+
+
+# Test: run_once records the hours computed and timing.
+def test_run_once_records_status():
+    precomputer = HorizonPrecomputer(lambda snapshot: len(snapshot))
+    assert precomputer.run_once([1, 2, 3]) == 3
+
+    status = precomputer.status()
+    assert status["run_count"] == 1
+    assert status["last_hours"] == 3
+    assert status["last_run"] is not None
+    assert status["last_duration_ms"] >= 0
+
+
+# Test: a failing job is counted and does not raise.
+def test_run_once_failure():
+    def job(snapshot):
+        raise RuntimeError("model down")
+    precomputer = HorizonPrecomputer(job)
+
+    assert precomputer.run_once("snap") == 0
+    assert precomputer.status()["failure_count"] == 1
+    assert precomputer.status()["last_error"] == "model down"
+
+
+# Test: snapshots scheduled while a run is in progress collapse to the newest.
+def test_schedule_coalesces_to_latest():
+    started = threading.Event()
+    release = threading.Event()
+    done = threading.Event()
+    seen = []
+
+    def job(snapshot):
+        seen.append(snapshot)
+        if snapshot == "first":
+            started.set()
+            release.wait(5)
+        if snapshot == "third":
+            done.set()
+        return 1
+
+    precomputer = HorizonPrecomputer(job)
+    precomputer.start()
+    precomputer.schedule("first")
+    assert started.wait(5)
+
+    precomputer.schedule("second")
+    precomputer.schedule("third")
+    release.set()
+    assert done.wait(5)
+    precomputer.stop(timeout=5)
+
+    assert seen == ["first", "third"]
+    assert precomputer.status()["coalesced_count"] == 1
+    assert precomputer.running is False
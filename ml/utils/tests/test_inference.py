@@ -0,0 +1,121 @@
+# Importing.
+import warnings
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("xgboost")
+# ml/tests/conftest.py replaces joblib.load with a fake; load the real pickles directly.
+from joblib.numpy_pickle import load as joblib_load  # noqa: E402
+
+from ml.utils.inference import (  # noqa: E402
+    BACKENDS,
+    BoosterBackend,
+    TreeEnsembleBackend,
+    make_predictor
+)
+
+ML_DIR = Path(__file__).resolve().parents[2]
+SUBWAY_MODEL = ML_DIR / "subway_ridership_model_xgboost_final.joblib"
+TAXI_MODEL = ML_DIR / "xgboost_taxi_model.joblib"
+
+
+def load_model(path):
+    if not path.exists():
+        pytest.skip(f"{path.name} not available")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return joblib_load(path)
+
+
+def random_frame(columns, n=500, seed=0):
+    """Plausible inputs: small integers for flags and calendar, floats for the rest"""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for name in columns:
+        if name in ("hour", "pickup_hour"):
+            data[name] = rng.integers(0, 24, n)
+        elif name in ("day_of_week", "month", "PULocationID", "temp_category"):
+            data[name] = rng.integers(0, 12, n)
+        elif name.startswith(("is_", "has_", "weather_")):
+            data[name] = rng.integers(0, 2, n)
+        elif name in ("latitude", "centroid_lat"):
+            data[name] = rng.uniform(40.6, 40.9, n)
+        elif name in ("longitude", "centroid_lon"):
+            data[name] = rng.uniform(-74.05, -73.9, n)
+        else:
+            data[name] = rng.normal(10, 15, n)
+    return pd.DataFrame(data)
+
+
+# Test: every backend reproduces the sklearn wrapper exactly, for both models.
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("path", [SUBWAY_MODEL, TAXI_MODEL])
+def test_backends_match_sklearn_predict(path, backend):
+    model = load_model(path)
+    predictor = make_predictor(model, backend=backend)
+    X = random_frame(predictor.columns)
+
+    assert isinstance(predictor, BACKENDS[backend])
+    np.testing.assert_array_equal(predictor.predict(X), model.predict(X))
+    np.testing.assert_array_equal(predictor.predict(X.to_numpy(dtype=np.float32)),
+                                  model.predict(X))
+
+
+# Test: the NumPy trees follow XGBoost's default direction for missing values.
+@pytest.mark.parametrize("path", [SUBWAY_MODEL, TAXI_MODEL])
+def test_numpy_backend_handles_missing_values(path):
+    model = load_model(path)
+    predictor = TreeEnsembleBackend(model)
+    rng = np.random.default_rng(2)
+    X = rng.normal(0, 30, (2000, len(predictor.columns))).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan
+
+    np.testing.assert_array_equal(predictor.predict(X),
+                                  BoosterBackend(model).predict(X))
+
+
+# Test: blocking rows does not change the result.
+def test_numpy_backend_blocks_rows():
+    model = load_model(TAXI_MODEL)
+    X = random_frame(model.get_booster().feature_names, n=300, seed=3)
+    small_blocks = TreeEnsembleBackend(model, max_block_cells=1)
+
+    assert small_blocks.block_rows == 1
+    np.testing.assert_array_equal(small_blocks.predict(X), model.predict(X))
+
+
+# Test: inputs in another column order are permuted to the booster order.
+def test_caller_column_order_is_respected():
+    model = load_model(TAXI_MODEL)
+    X = random_frame(model.get_booster().feature_names, seed=1)
+    shuffled = list(reversed(X.columns))
+    predictor = make_predictor(model, shuffled)
+
+    np.testing.assert_array_equal(predictor.predict(X[shuffled].to_numpy()),
+                                  model.predict(X))
+
+
+# Test: missing model features are rejected at construction.
+def test_missing_columns_raise():
+    model = load_model(TAXI_MODEL)
+    with pytest.raises(ValueError):
+        BoosterBackend(model, ["pickup_hour", "temp"])
+
+
+# Test: non-XGBoost models and None pass through unchanged.
+def test_make_predictor_passthrough():
+    class Stub:
+        def predict(self, X):
+            return [1] * len(X)
+
+    stub = Stub()
+    assert make_predictor(stub) is stub
+    assert make_predictor(None) is None
+
+
+# Test: unknown backend names are rejected.
+def test_unknown_backend_raises():
+    with pytest.raises(ValueError):
+        make_predictor(None, backend="onnx")
@@ -0,0 +1,75 @@
+# Importing.
+import threading
+import pytest
+
+from ml.utils.inference_executor import InferenceBusy, InferenceExecutor
+from ml.utils.metrics import collect_stages, stage_timer
+
+
+# Test: with no workers, jobs run inline in the calling thread.
+def test_inline_mode():
+    executor = InferenceExecutor(max_workers=0)
+    caller = threading.current_thread().name
+    assert executor.run(lambda: threading.current_thread().name) == caller
+    assert executor.stats()["completed"] == 1
+    assert executor.stats()["max_pending"] is None
+
+
+# Test: pooled jobs run on inference threads and pass results and exceptions through.
+def test_pool_mode():
+    executor = InferenceExecutor(max_workers=2)
+    try:
+        name = executor.run(lambda: threading.current_thread().name)
+        assert name.startswith("inference")
+        assert executor.run(sum, [1, 2, 3]) == 6
+        with pytest.raises(ZeroDivisionError):
+            executor.run(lambda: 1 / 0)
+        assert executor.stats()["completed"] == 3
+    finally:
+        executor.shutdown()
+
+
+# Test: once every worker and queue slot is taken, further calls are rejected.
+def test_full_queue_rejects():
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_job():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    results = []
+    caller = threading.Thread(target=lambda: results.append(executor.run(blocking_job)))
+    caller.start()
+    try:
+        assert started.wait(5)
+        with pytest.raises(InferenceBusy):
+            executor.run(lambda: None)
+    finally:
+        release.set()
+        caller.join(5)
+
+    try:
+        assert results == ["done"]
+        assert executor.run(lambda: "again") == "again"
+        stats = executor.stats()
+        assert stats["rejected"] == 1
+        assert stats["peak_in_flight"] == 1
+    finally:
+        executor.shutdown()
+
+
+# Test: jobs run in the caller's context, so stages they time reach the request's
+# collector.
+def test_pool_runs_in_caller_context():
+    executor = InferenceExecutor(max_workers=1, max_pending=1)
+
+    def job():
+        with stage_timer("taxi_predict"):
+            return threading.current_thread().name
+
+    with collect_stages() as stages:
+        assert executor.run(job).startswith("inference")
+    executor.shutdown()
+    assert "taxi_predict" in stages
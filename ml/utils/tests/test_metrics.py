@@ -0,0 +1,134 @@
+# Importing.
+import contextvars
+import threading
+import pytest
+
+from ml.utils.metrics import (
+    STAGE_SECONDS,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    collect_stages,
+    observe_stages,
+    server_timing,
+    stage_timer
+)
+
+
+# Test: counters add up per label combination.
+def test_counter():
+    counter = Counter("requests_total", "Requests", ["status"])
+    counter.inc(status=200)
+    counter.inc(2, status=200)
+    counter.inc(status=500)
+
+    assert counter.value(status=200) == 3
+    assert counter.render() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{status="200"} 3',
+        'requests_total{status="500"} 1',
+    ]
+
+
+# Test: histogram buckets are cumulative with +Inf, sum and count.
+def test_histogram_render():
+    histogram = Histogram("latency_seconds", "Latency", ["stage"], buckets=[0.01, 0.1])
+    for value in (0.005, 0.01, 0.05, 3.0):
+        histogram.observe(value, stage="weather")
+
+    lines = histogram.render()
+    assert lines[2:] == [
+        'latency_seconds_bucket{stage="weather",le="0.01"} 2',
+        'latency_seconds_bucket{stage="weather",le="0.1"} 3',
+        'latency_seconds_bucket{stage="weather",le="+Inf"} 4',
+        'latency_seconds_sum{stage="weather"} 3.065',
+        'latency_seconds_count{stage="weather"} 4',
+    ]
+
+
+# Test: time() observes a with block and also works as a decorator.
+def test_histogram_timer():
+    histogram = Histogram("stage_seconds", "Stage", ["stage"])
+    with histogram.time(stage="a"):
+        pass
+
+    @histogram.time(stage="b")
+    def work():
+        return 42
+
+    assert work() == 42 and work() == 42
+    assert histogram.count(stage="a") == 1
+    assert histogram.count(stage="b") == 2
+
+
+# Test: labels must match the declared names, and values are escaped.
+def test_labels():
+    counter = Counter("c_total", "C", ["path"])
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+    counter.inc(path='a"b\\c')
+    assert counter.render()[-1] == 'c_total{path="a\\"b\\\\c"} 1'
+
+
+# Test: the registry returns existing metrics by name and renders them all.
+def test_registry():
+    registry = MetricsRegistry()
+    counter = registry.counter("a_total", "A")
+    assert registry.counter("a_total", "A") is counter
+    with pytest.raises(ValueError):
+        registry.histogram("a_total", "A")
+
+    counter.inc()
+    registry.histogram("b_seconds", "B").observe(0.2)
+    text = registry.render()
+    assert text.startswith("# HELP a_total A\n# TYPE a_total counter\na_total 1\n")
+    assert "b_seconds_count 1\n" in text
+
+
+def predict():
+    with stage_timer("taxi_predict"):
+        pass
+
+
+# Test: stages timed inside collect_stages add up per stage, including on other
+# threads run in its context.
+def test_collect_stages():
+    with collect_stages() as stages:
+        with stage_timer("scoring"):
+            pass
+        with stage_timer("scoring"):
+            pass
+        worker = threading.Thread(target=contextvars.copy_context().run,
+                                  args=(predict,))
+        worker.start()
+        worker.join()
+
+        @stage_timer("weather")
+        def fetch():
+            return "sunny"
+        assert fetch() == "sunny"
+
+    assert set(stages) == {"scoring", "taxi_predict", "weather"}
+    with stage_timer("auth"):
+        pass
+    assert "auth" not in stages
+
+
+# Test: stage times are observed once per request, and stages outside a request are not.
+def test_observe_stages():
+    before = STAGE_SECONDS.count(endpoint="predict_all", stage="scoring")
+    with stage_timer("scoring"):
+        pass
+    assert STAGE_SECONDS.count(endpoint="predict_all", stage="scoring") == before
+
+    observe_stages({"scoring": 0.002, "weather": 0.01}, "predict_all")
+    assert STAGE_SECONDS.count(endpoint="predict_all", stage="scoring") == before + 1
+
+
+# Test: Server-Timing lists stages in milliseconds, then the total.
+def test_server_timing():
+    assert server_timing({"weather": 0.0123, "scoring": 0.0005}, 0.02) == (
+        "weather;dur=12.30, scoring;dur=0.50, total;dur=20.00"
+    )
+    assert server_timing({}) == ""
@@ -0,0 +1,59 @@
+# Importing.
+import numpy as np
+import pandas as pd
+
+from ml.utils.percentile_index import PercentileIndex
+
+STATS = pd.DataFrame([
+    {"PULocationID": 24.0, "hour": 8, "day_of_week": 1,
+     "p10": 1, "p25": 2, "p50": 3, "p75": 4, "p90": 5},
+    {"PULocationID": 24.0, "hour": 9, "day_of_week": 1,
+     "p10": 6, "p25": 7, "p50": 8, "p75": 9, "p90": 10},
+    {"PULocationID": 4.0, "hour": 8, "day_of_week": 1,
+     "p90": 50, "p10": 10, "p50": 30, "p25": 20, "p75": 40},
+])
+PERCENTILES = ["p10", "p25", "p50", "p75", "p90"]
+
+
+# Test: float zone IDs are interned as ints and rows are ordered p10..p90.
+def test_lookup_returns_percentiles():
+    index = PercentileIndex.from_stats(STATS)
+
+    assert list(index.zone_ids) == [4, 24]
+    out = index.lookup([24, 4, 24.0], day_of_week=1, hour=8)
+    assert out.tolist() == [[1, 2, 3, 4, 5], [10, 20, 30, 40, 50], [1, 2, 3, 4, 5]]
+    assert index.lookup([24], day_of_week=1, hour=9).tolist() == [[6, 7, 8, 9, 10]]
+
+
+# Test: unknown zones, NaN IDs and hours without stats read as NaN.
+def test_lookup_missing_cells_are_nan():
+    index = PercentileIndex.from_stats(STATS)
+
+    out = index.lookup([99, np.nan, 1000, 24], day_of_week=3, hour=8)
+    assert np.isnan(out).all()
+    assert list(index.positions([99, np.nan, 24, 4])) == [-1, -1, 1, 0]
+
+
+# Test: lookup agrees with the DataFrame merge it replaces.
+def test_lookup_matches_merge():
+    rng = np.random.default_rng(1)
+    rows = [
+        {"PULocationID": z, "day_of_week": d, "hour": h,
+         **dict(zip(PERCENTILES, np.sort(rng.uniform(0, 100, 5))))}
+        for z in (4, 12, 13) for d in range(7) for h in range(24) if rng.random() > 0.1
+    ]
+    stats = pd.DataFrame(rows)
+    index = PercentileIndex.from_stats(stats)
+    zones = pd.DataFrame({"PULocationID": [4, 12, 13, 50], "day_of_week": 5,
+                          "hour": 17})
+
+    merged = zones.merge(stats, on=["PULocationID", "hour", "day_of_week"], how="left")
+    expected = merged[PERCENTILES].to_numpy()
+    np.testing.assert_array_equal(index.lookup(zones["PULocationID"], 5, 17), expected)
+
+
+# Test: an empty stats table gives an empty index that returns NaN.
+def test_empty_stats():
+    index = PercentileIndex.from_stats(pd.DataFrame())
+    assert len(index) == 0
+    assert np.isnan(index.lookup([1, 2], 0, 0)).all()
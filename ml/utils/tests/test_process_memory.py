@@ -0,0 +1,33 @@
+# Importing.
+from ml.utils.process_memory import describe, memory_usage
+
+ROLLUP = """55d0c0a4e000-7ffd1b1f2000 ---p 00000000 00:00 0      [rollup]
+Rss:              139264 kB
+Pss:               48128 kB
+Shared_Clean:      10240 kB
+Shared_Dirty:     126976 kB
+Private_Clean:       512 kB
+Private_Dirty:      1536 kB
+Swap:                  0 kB
+"""
+
+
+# Test: smaps_rollup fields are reported in MB, shared and private summed over
+# clean and dirty.
+def test_memory_usage_from_rollup(tmp_path):
+    path = tmp_path / "smaps_rollup"
+    path.write_text(ROLLUP)
+    usage = memory_usage(path)
+
+    assert usage["rss_mb"] == 136.0
+    assert usage["pss_mb"] == 47.0
+    assert usage["shared_mb"] == 134.0
+    assert usage["private_mb"] == 2.0
+    assert describe(usage).endswith("pss_mb=47.0, shared_mb=134.0, private_mb=2.0")
+
+
+# Test: without /proc only the peak RSS is reported.
+def test_memory_usage_fallback(tmp_path):
+    usage = memory_usage(tmp_path / "missing")
+    assert set(usage) == {"pid", "peak_rss_mb"}
+    assert usage["peak_rss_mb"] > 0
@@ -0,0 +1,70 @@
+# Importing.
+import pytest
+
+from ml.utils.request_profiler import RequestProfiler, safe_profile_id
+
+
+def hot_loop(n):
+    return sum(i * i for i in range(n))
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    return RequestProfiler(secret="s3cret", directory=tmp_path, top_n=5, max_reports=2)
+
+
+# Test: only the configured secret enables profiling, and nothing does without one.
+def test_authorized(profiler):
+    assert profiler.authorized("s3cret")
+    assert not profiler.authorized("wrong")
+    assert not profiler.authorized(None)
+    assert not RequestProfiler().authorized("")
+    assert not RequestProfiler().enabled
+
+
+# Test: run returns the result and a profile whose report names the hot function.
+def test_run_and_report(profiler):
+    result, profile = profiler.run(hot_loop, 1000)
+    assert result == hot_loop(1000)
+    report = profiler.report(profile, 3)
+    assert "cumulative" in report
+    assert "hot_loop" in report
+
+
+# Test: a request asking while another is profiled runs unprofiled.
+def test_one_profile_at_a_time(profiler):
+    nested = profiler.run(profiler.run, hot_loop, 10)
+    (result, inner), outer = nested
+    assert result == hot_loop(10)
+    assert inner is None and outer is not None
+    assert profiler.stats()["skipped"] == 1
+
+
+# Test: reports are kept in memory (last max_reports) and in the directory.
+def test_save_and_load(profiler, tmp_path):
+    for request_id in ["req_1", "req_2", "req_3"]:
+        profiler.save(request_id, f"report {request_id}")
+    assert (tmp_path / "req_1.txt").read_text() == "report req_1"
+    assert profiler.stats()["reports_in_memory"] == 2
+    assert profiler.load("req_1") == "report req_1"
+    assert profiler.load("req_3") == "report req_3"
+    assert profiler.load("req_9") is None
+
+
+# Test: client-supplied IDs that are not plain names never reach the filesystem.
+def test_unsafe_ids(profiler, tmp_path):
+    assert not safe_profile_id("../etc/passwd")
+    assert not safe_profile_id("..")
+    assert safe_profile_id("req_1700000000000_ab12cd34")
+    assert profiler.save("../escape", "x") is None
+    assert profiler.load("../../etc/passwd") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+# Test: the requested top-N is clamped, and falls back to the default.
+def test_limit(profiler):
+    assert profiler.limit("10") == 10
+    assert profiler.limit("100000") == 200
+    assert profiler.limit("0") == 1
+    assert profiler.limit("lots") == 5
+    assert profiler.limit(None) == 5
@@ -1,6 +1,7 @@
 # Importing.
 import json
 import logging
+import logging.handlers
 from flask import Flask, g, jsonify
 import pytest
 
@@ -161,4 +162,47 @@ def test_formatter_handles_missing_log_data_attribute():
     )
     # We want the fallback path here.
     formatted = formatter.format(record)
-    assert "Fallback message" in formatted
\ No newline at end of file
+    assert "Fallback message" in formatted
+
+# 13. setup_logging(asynchronous=True) routes records through the queue writer
+# with request IDs.
+def test_setup_logging_asynchronous(capsys):
+    app = Flask(__name__)
+    logger = request_tracker.setup_logging(asynchronous=True)
+    try:
+        assert isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+        with app.test_request_context("/"):
+            g.request_id = "req_async"
+            logging.getLogger("test").info("plain line")
+            request_tracker.log_with_context("info", "structured line")
+        request_tracker.log_listener.stop()
+        lines = capsys.readouterr().err.splitlines()
+        assert any(line.startswith("[req_async]") and "plain line" in line
+                   for line in lines)
+        structured = [json.loads(line) for line in lines if line.startswith("{")]
+        assert structured[-1]["message"] == "structured line"
+        assert structured[-1]["timestamp"]
+    finally:
+        request_tracker.setup_logging()
+
+# 14. A sampled-out request skips its info logs but keeps errors.
+def test_log_sampling(caplog):
+    caplog.set_level(logging.INFO)
+    app = Flask(__name__)
+    request_tracker.setup_logging(sample_rate=0.0)
+    # setup_logging replaces the root handlers, caplog's included.
+    logging.getLogger().addHandler(caplog.handler)
+    try:
+        @app.route("/sampled")
+        @request_tracker.with_request_tracking
+        def sampled():
+            request_tracker.log_with_context("error", "kept")
+            return jsonify({"ok": True})
+
+        with app.test_client() as client:
+            assert client.get("/sampled").status_code == 200
+        messages = [r.log_data["message"] for r in caplog.records
+                    if hasattr(r, "log_data")]
+        assert messages == ["kept"]
+    finally:
+        request_tracker.setup_logging()
@@ -0,0 +1,87 @@
+# Importing.
+import numpy as np
+import pandas as pd
+
+from ml.utils.scoring import (
+    LEVEL_TO_SCORE,
+    SCORE_TO_LEVEL,
+    classify_levels,
+    combined_scores,
+    level_codes
+)
+
+
+# Scalar reference mirroring classify_level in app.py.
+def scalar_level(val, p10, p25, p50, p75, p90):
+    if pd.isna(val):
+        return "Unknown"
+    if val < p10:
+        return "Very Quiet"
+    if val < p25:
+        return "Quiet"
+    if val < p50:
+        return "Moderate"
+    if val < p75:
+        return "Busy"
+    if val < p90:
+        return "Very Busy"
+    return "Extremely Busy"
+
+
+# Test: labels match the scalar rules, including exact threshold edges.
+def test_classify_levels_thresholds():
+    values = [5, 10, 20, 25, 30, 40, 50, 60]
+    thresholds = [[10, 20, 30, 40, 50]] * len(values)
+    levels, scores = classify_levels(values, thresholds)
+
+    assert list(levels) == [
+        "Very Quiet", "Quiet", "Moderate", "Moderate",
+        "Busy", "Very Busy", "Extremely Busy", "Extremely Busy"
+    ]
+    assert list(scores) == [0, 1, 2, 2, 3, 4, 5, 5]
+    assert scores.dtype.kind == "i"
+
+
+# Test: missing values are "Unknown" with a NaN score; missing thresholds never match.
+def test_classify_levels_missing_data():
+    nan = np.nan
+    levels, scores = classify_levels(
+        [nan, 15, 15],
+        [[10, 20, 30, 40, 50], [nan] * 5, [10, nan, 30, 40, 50]]
+    )
+    assert list(levels) == ["Unknown", "Extremely Busy", "Moderate"]
+    assert np.isnan(scores[0])
+    assert list(scores[1:]) == [5, 2]
+
+
+# Test: vectorized output equals the scalar reference on random data.
+def test_classify_levels_matches_scalar():
+    rng = np.random.default_rng(0)
+    thresholds = np.sort(rng.uniform(0, 100, size=(500, 5)), axis=1)
+    thresholds[rng.random((500, 5)) < 0.05] = np.nan
+    values = rng.uniform(-10, 110, size=500)
+    values[rng.random(500) < 0.05] = np.nan
+
+    levels, scores = classify_levels(values, thresholds)
+    expected = [scalar_level(v, *t) for v, t in zip(values, thresholds)]
+
+    assert list(levels) == expected
+    assert [SCORE_TO_LEVEL.get(s, "Unknown") if not np.isnan(s) else "Unknown"
+            for s in scores] == expected
+
+
+# Test: codes accept a pandas frame of percentile columns.
+def test_level_codes_accepts_dataframe():
+    frame = pd.DataFrame([{"p10": 1, "p25": 2, "p50": 3, "p75": 4, "p90": 5}])
+    assert list(level_codes(pd.Series([3.5]), frame)) == [LEVEL_TO_SCORE["Busy"]]
+
+
+# Test: combined score blends 0.7/0.3, falls back to the present score, else 2.
+def test_combined_scores():
+    nan = np.nan
+    subway = [4, nan, 3, nan]
+    taxi = [1, 5, nan, nan]
+    combined = combined_scores(subway, taxi)
+
+    assert combined[0] == 0.7 * 4 + 0.3 * 1
+    assert list(combined[1:]) == [5, 3, 2]
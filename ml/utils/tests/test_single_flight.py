@@ -0,0 +1,59 @@
+# Importing.
+import threading
+import time
+import pytest
+
+from ml.utils.single_flight import SingleFlight
+
+
+# Test: concurrent callers for one key share a single computation.
+def test_concurrent_calls_coalesce():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    results = []
+
+    def request():
+        results.append(flights.do("k", compute))
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while flights.stats()["coalesced"] < 7:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("result", False)] + [("result", True)] * 7
+    assert flights.stats() == {"executed": 1, "coalesced": 7, "in_flight": 0}
+
+
+# Test: different keys and later calls compute independently.
+def test_keys_are_independent():
+    flights = SingleFlight()
+    assert flights.do("a", lambda: 1) == (1, False)
+    assert flights.do("b", lambda: 2) == (2, False)
+    assert flights.do("a", lambda: 3) == (3, False)
+    assert flights.stats()["executed"] == 3
+
+
+# Test: the leader's exception reaches every waiting caller and the key is released.
+def test_errors_are_shared():
+    flights = SingleFlight()
+    future, leader = flights.begin("k")
+    follower, follower_leads = flights.begin("k")
+    assert leader and not follower_leads and follower is future
+
+    flights.finish("k", error=ValueError("boom"))
+    with pytest.raises(ValueError):
+        follower.result()
+    with pytest.raises(KeyError):
+        flights.do("k", lambda: {}["missing"])
+    assert flights.stats()["in_flight"] == 0
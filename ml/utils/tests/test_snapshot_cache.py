@@ -0,0 +1,99 @@
+# Importing.
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from ml.utils.snapshot_cache import SnapshotCache, hour_bucket, snapshot_key
+
+WEATHER = {"temp": 20, "feels_like": 19, "humidity": 50, "wind_speed": 3,
+           "weather_main": "Clear"}
+
+
+# Controllable clock so TTL expiry can be tested without sleeping.
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# Test: timestamps in the same NY hour share a key; a new hour or new weather does not.
+def test_snapshot_key_normalizes_hour():
+    tz = ZoneInfo("America/New_York")
+    a = datetime(2025, 7, 25, 8, 5, tzinfo=tz)
+    b = datetime(2025, 7, 25, 8, 59, 30, tzinfo=tz)
+    c = datetime(2025, 7, 25, 9, 0, tzinfo=tz)
+
+    assert hour_bucket(b) == datetime(2025, 7, 25, 8, tzinfo=tz)
+    assert snapshot_key(a, WEATHER) == snapshot_key(b, WEATHER)
+    assert snapshot_key(a, WEATHER) != snapshot_key(c, WEATHER)
+    assert snapshot_key(a, WEATHER) != snapshot_key(a, {**WEATHER, "temp": 21})
+
+
+# Test: get() counts hits and misses.
+def test_hit_and_miss_counters():
+    cache = SnapshotCache(max_entries=4, ttl_seconds=60)
+    assert cache.get("k") is None
+    cache.put("k", {"v": 1})
+    assert cache.get("k") == {"v": 1}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+# Test: entries expire after the TTL.
+def test_entries_expire():
+    clock = FakeClock()
+    cache = SnapshotCache(max_entries=4, ttl_seconds=10, clock=clock)
+    cache.put("k", 1)
+    clock.now = 9.9
+    assert cache.get("k") == 1
+    clock.now = 10.0
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+# Test: per-entry TTL overrides the default.
+def test_put_ttl_override():
+    clock = FakeClock()
+    cache = SnapshotCache(max_entries=4, ttl_seconds=10, clock=clock)
+    cache.put("k", 1, ttl_seconds=100)
+    clock.now = 50
+    assert cache.get("k") == 1
+
+
+# Test: the least recently used entry is evicted when full.
+def test_lru_eviction():
+    cache = SnapshotCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+# Test: invalidate() drops a single key or everything.
+def test_invalidate():
+    cache = SnapshotCache(max_entries=4, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    assert cache.invalidate("a") == 1
+    assert cache.invalidate("a") == 0
+    assert cache.get("b") == 2
+    assert cache.invalidate() == 1
+    assert cache.get("b") is None
+
+
+# Test: a zero TTL or size disables caching entirely.
+def test_disabled_cache():
+    cache = SnapshotCache(max_entries=4, ttl_seconds=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 0
@@ -0,0 +1,111 @@
+# Importing.
+import gzip
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from ml.utils import snapshot_encoding
+from ml.utils.snapshot_encoding import (
+    EncodedSnapshot,
+    model_version,
+    negotiate_encoding,
+    snapshot_etag,
+    variant_etag
+)
+
+KEY = ("2025-07-25T04:00:00-04:00", (("temp", 21.5), ("weather_main", "Clouds")))
+
+
+# Test: ETags are stable for a key and change with hour, weather or model version.
+def test_snapshot_etag():
+    etag = snapshot_etag(KEY, "v1")
+
+    assert etag == snapshot_etag(KEY, "v1")
+    assert etag != snapshot_etag(KEY, "v2")
+    assert etag != snapshot_etag(("2025-07-25T05:00:00-04:00", KEY[1]), "v1")
+    warmer = (("temp", 22.0), ("weather_main", "Clouds"))
+    assert etag != snapshot_etag((KEY[0], warmer), "v1")
+    assert variant_etag(etag, "identity") == etag
+    assert variant_etag(etag, "gzip") == f"{etag}-gzip"
+    assert variant_etag(etag, "gzip", "p5-s0") == f"{etag}-p5-s0-gzip"
+
+
+# Test: each encoding is compressed once and reused.
+def test_encoding_is_cached(monkeypatch):
+    calls = []
+    real_compress = snapshot_encoding.compress
+
+    def compress(body, enc):
+        calls.append(enc)
+        return real_compress(body, enc)
+    monkeypatch.setattr(snapshot_encoding, "compress", compress)
+    renders = []
+
+    def render(source, variant):
+        renders.append(variant)
+        return source * (2 if variant else 1)
+    snapshot = EncodedSnapshot(b'{"a":1}' * 100, "abc", render)
+
+    first = snapshot.encoded("gzip")
+    assert snapshot.encoded("gzip") is first
+    assert calls == ["gzip"]
+    assert gzip.decompress(first) == snapshot.body()
+    assert snapshot.encoded("identity") is snapshot.body()
+    assert renders == [None]
+
+    # Variants are rendered and compressed separately, each once.
+    assert len(snapshot.encoded("gzip", "small")) != len(first)
+    snapshot.encoded("gzip", "small")
+    assert renders == [None, "small"]
+    assert calls == ["gzip", "gzip"]
+    assert snapshot.sizes()[(None, "identity")] == 700
+    assert snapshot.sizes()[("small", "identity")] == 1400
+
+
+# Test: variants that are not kept are rendered and compressed on every request.
+def test_unkept_variants_are_not_stored():
+    renders = []
+
+    def render(source, variant):
+        renders.append(variant)
+        return source
+    snapshot = EncodedSnapshot(b'{"a":1}' * 100, "abc", render,
+                               keep=lambda variant: variant is None)
+
+    snapshot.encoded("gzip", "tile")
+    snapshot.encoded("gzip", "tile")
+    snapshot.encoded("gzip")
+    snapshot.encoded("gzip")
+
+    assert renders == ["tile", "tile", None]
+    assert set(snapshot.sizes()) == {(None, "identity"), (None, "gzip")}
+
+
+# Test: gzip output is deterministic (no timestamp in the header).
+def test_gzip_is_deterministic():
+    body = b"x" * 1000
+    assert snapshot_encoding.compress(body, "gzip") == (
+        snapshot_encoding.compress(body, "gzip")
+    )
+
+
+# Test: content negotiation picks a supported coding or falls back to identity.
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setattr(snapshot_encoding, "brotli", None)
+
+    def negotiate(header):
+        return negotiate_encoding(parse_accept_header(header, Accept))
+    assert negotiate("gzip, deflate, br") == "gzip"
+    assert negotiate("") == "identity"
+    assert negotiate("gzip;q=0, identity") == "identity"
+    assert negotiate("br") == "identity"
+
+
+# Test: the model version hashes file contents.
+def test_model_version(tmp_path):
+    model = tmp_path / "model.joblib"
+    model.write_bytes(b"one")
+    first = model_version([model])
+    model.write_bytes(b"two")
+
+    assert model_version([model]) != first
+    assert len(first) == 12
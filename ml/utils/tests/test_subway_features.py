@@ -0,0 +1,90 @@
+# Importing.
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from ml.utils.subway_features import (
+    SubwayFeatureBuilder,
+    subway_time_weather_features,
+    temp_category
+)
+
+FEATURES = ["latitude", "hour", "is_cbd", "temp", "is_holiday", "temp_category"]
+STATION_META = pd.DataFrame({
+    "station_complex_id": [10, 20, 30],
+    "latitude": [40.7, 40.8, 40.9],
+    "is_cbd": [1, 0, 1],
+})
+STATION_TO_ZONE = pd.DataFrame({
+    "station_complex_id": [30, 10, 20, 10, 99, np.nan],
+    "PULocationID": [4, 4, 24, 24, 4, 4],
+})
+WEATHER = {"temp": 31.5, "feels_like": 33.0, "humidity": 40, "wind_speed": 2.0,
+           "weather_main": "Rain"}
+
+
+# Test: static columns come from station_meta in feature order.
+def test_template_holds_static_columns():
+    builder = SubwayFeatureBuilder(STATION_META, FEATURES, STATION_TO_ZONE)
+    X = builder.matrix([(datetime(2025, 7, 4, 8), WEATHER)])
+
+    assert X.shape == (3, len(FEATURES))
+    assert X.dtype == np.float32
+    np.testing.assert_allclose(X[:, 0], np.float32([40.7, 40.8, 40.9]))
+    assert X[:, 2].tolist() == [1, 0, 1]
+
+
+# Test: time/weather columns are broadcast per moment block.
+def test_matrix_broadcasts_each_moment():
+    builder = SubwayFeatureBuilder(STATION_META, FEATURES, STATION_TO_ZONE)
+    cold = dict(WEATHER, temp=-3.0)
+    X = builder.matrix([(datetime(2025, 7, 4, 8), WEATHER),
+                        (datetime(2025, 7, 5, 23), cold)])
+
+    assert X.shape == (6, len(FEATURES))
+    assert X[:3, 1].tolist() == [8, 8, 8]
+    assert X[3:, 1].tolist() == [23, 23, 23]
+    assert X[:3, 4].tolist() == [1, 1, 1]
+    assert X[3:, 4].tolist() == [0, 0, 0]
+    assert X[:3, 5].tolist() == [4, 4, 4]
+    assert X[3:, 5].tolist() == [0, 0, 0]
+    np.testing.assert_array_equal(X[:3, [0, 2]], X[3:, [0, 2]])
+
+
+# Test: temperature bands and rain/snow flags.
+def test_time_weather_features():
+    assert [temp_category(t) for t in (-1, 0, 9.9, 10, 25, 30)] == [0, 1, 1, 2, 3, 4]
+    snow = dict(WEATHER, weather_main="Snow")
+    values = subway_time_weather_features(datetime(2025, 1, 6, 17), snow)
+
+    assert values["is_rush_hour"] == 1
+    assert values["is_weekend"] == 0
+    assert values["has_snow"] == 1
+    assert values["has_rain"] == 0
+    assert values["is_hot"] == 1
+
+
+# Test: matrix rows match the DataFrame assign it replaces.
+def test_matrix_matches_dataframe_features():
+    builder = SubwayFeatureBuilder(STATION_META, FEATURES, STATION_TO_ZONE)
+    ts = datetime(2025, 11, 27, 14)
+    features = subway_time_weather_features(ts, WEATHER)
+    expected = STATION_META.assign(**features)[FEATURES]
+
+    np.testing.assert_array_equal(builder.matrix([(ts, WEATHER)]),
+                                  expected.to_numpy(dtype=np.float32))
+
+
+# Test: zone totals agree with merge + groupby, skipping unmapped stations.
+def test_zone_totals_match_groupby():
+    builder = SubwayFeatureBuilder(STATION_META, FEATURES, STATION_TO_ZONE)
+    predictions = np.float32([1.5, 2.25, 4.0])
+
+    zone_ids, totals = builder.zone_totals(predictions)
+
+    df = STATION_META[["station_complex_id"]].assign(predicted=predictions)
+    merged = df.merge(STATION_TO_ZONE, on="station_complex_id")
+    expected = merged.groupby("PULocationID")["predicted"].sum()
+    assert zone_ids.tolist() == expected.index.tolist()
+    assert totals.tolist() == expected.tolist()
+    assert totals.dtype == np.float32
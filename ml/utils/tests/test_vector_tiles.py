@@ -0,0 +1,208 @@
+# Importing.
+import math
+import struct
+import pandas as pd
+import pytest
+
+from ml.utils.geometry_store import GeometryStore
+from ml.utils.vector_tiles import (
+    VectorTileEncoder,
+    tile_bounds,
+    to_mercator,
+    valid_tile,
+    zigzag
+)
+
+SQUARE = ("POLYGON "
+          "((-73.99 40.74, -73.98 40.74, -73.98 40.75, -73.99 40.75, -73.99 40.74))")
+HOLE = ("POLYGON "
+        "((-73.97 40.74, -73.96 40.74, -73.96 40.75, -73.97 40.75, -73.97 40.74), "
+        "(-73.968 40.742, -73.968 40.748, -73.962 40.748, -73.962 40.742, "
+        "-73.968 40.742))")
+STORE = GeometryStore.from_zones(
+    pd.DataFrame({"OBJECTID": [1, 2, 3], "geometry": [SQUARE, HOLE, None]})
+)
+RESULT = pd.DataFrame({
+    "PULocationID": [1, 2],
+    "combined_level": ["Busy", "Quiet"],
+    "combined_score": [3.5, 1.0],
+    "taxi_score": [3, -1],
+    "subway_score": [float("nan"), 2.0],
+})
+
+
+def lonlat_tile(lon, lat, z):
+    n = 1 << z
+    lat = math.radians(lat)
+    x = int((lon + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n)
+    return z, x, y
+
+
+# ----------------------------------------
+# Minimal protobuf reader for checking tiles
+# ----------------------------------------
+def read_varint(data, i):
+    shift = result = 0
+    while True:
+        b = data[i]
+        i += 1
+        result |= (b & 0x7F) << shift
+        shift += 7
+        if not b & 0x80:
+            return result, i
+
+
+def read_fields(data):
+    i, fields = 0, []
+    while i < len(data):
+        key, i = read_varint(data, i)
+        number, wire = key >> 3, key & 7
+        if wire == 0:
+            value, i = read_varint(data, i)
+        elif wire == 1:
+            value, i = struct.unpack("<d", data[i:i + 8])[0], i + 8
+        else:
+            length, i = read_varint(data, i)
+            value, i = data[i:i + length], i + length
+        fields.append((number, value))
+    return fields
+
+
+def read_packed(data):
+    i, values = 0, []
+    while i < len(data):
+        value, i = read_varint(data, i)
+        values.append(value)
+    return values
+
+
+def unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def decode_value(data):
+    number, value = read_fields(data)[0]
+    decoders = {1: lambda v: v.decode(), 3: float, 5: int, 6: unzigzag, 7: bool}
+    return decoders[number](value)
+
+
+def decode_rings(commands):
+    rings, i, x, y = [], 0, 0, 0
+    while i < len(commands):
+        command, count = commands[i] & 7, commands[i] >> 3
+        i += 1
+        if command == 7:
+            continue
+        if command == 1:
+            rings.append([])
+        for _ in range(count):
+            x, y = x + unzigzag(commands[i]), y + unzigzag(commands[i + 1])
+            rings[-1].append((x, y))
+            i += 2
+    return rings
+
+
+def decode_tile(data):
+    [(number, layer)] = read_fields(data)
+    assert number == 3
+    fields = read_fields(layer)
+    keys = [v.decode() for n, v in fields if n == 3]
+    values = [decode_value(v) for n, v in fields if n == 4]
+    features = {}
+    for n, feature in fields:
+        if n != 2:
+            continue
+        parts = dict(read_fields(feature))
+        tags = read_packed(parts[2])
+        features[parts[1]] = {
+            "type": parts[3],
+            "properties": {keys[tags[k]]: values[tags[k + 1]]
+                           for k in range(0, len(tags), 2)},
+            "rings": decode_rings(read_packed(parts[4]))
+        }
+    return dict(fields), features
+
+
+def signed_area(ring):
+    edges = zip(ring, ring[1:] + ring[:1])
+    return sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in edges)
+
+
+# Test: tile bounds match the standard XYZ scheme.
+def test_tile_bounds():
+    edge = 20037508.34
+    assert tile_bounds(0, 0, 0) == pytest.approx((-edge, -edge, edge, edge))
+    minx, miny, maxx, maxy = tile_bounds(1, 1, 0)
+    assert (minx, miny) == pytest.approx((0, 0), abs=1e-6)
+    assert maxx == pytest.approx(edge)
+    assert to_mercator([[0.0, 0.0]]).tolist() == [[0.0, 0.0]]
+    assert valid_tile(2, 3, 3) and not valid_tile(2, 4, 0) and not valid_tile(19, 0, 0)
+
+
+# Test: a tile carries each zone's ID, properties (without nulls) and layer metadata.
+def test_encode_properties():
+    encoder = VectorTileEncoder(STORE)
+    tile = lonlat_tile(-73.975, 40.745, 12)
+    layer, features = decode_tile(encoder.render(RESULT, tile))
+
+    assert layer[15] == 2 and layer[1] == b"zones" and layer[5] == 4096
+    assert set(features) == {1, 2}
+    assert features[1]["type"] == 3
+    assert features[1]["properties"] == {
+        "PULocationID": 1, "combined_level": "Busy", "combined_score": 3.5,
+        "taxi_score": 3
+    }
+    assert features[2]["properties"]["taxi_score"] == -1
+    assert features[2]["properties"]["subway_score"] == 2.0
+
+
+# Test: field projection keeps only the requested properties.
+def test_render_fields():
+    encoder = VectorTileEncoder(STORE)
+    tile = lonlat_tile(-73.975, 40.745, 12)
+    _, features = decode_tile(encoder.render(RESULT, tile, fields=("combined_level",)))
+    assert features[2]["properties"] == {"PULocationID": 2, "combined_level": "Quiet"}
+
+
+# Test: rings are quantized into the buffered extent with MVT winding (exterior
+# positive, holes negative).
+def test_geometry_quantized_and_wound():
+    encoder = VectorTileEncoder(STORE)
+    _, features = decode_tile(encoder.render(RESULT, lonlat_tile(-73.975, 40.745, 12)))
+
+    outer, hole = features[2]["rings"]
+    assert signed_area(outer) > 0 and signed_area(hole) < 0
+    points = [p for ring in features[1]["rings"] + features[2]["rings"] for p in ring]
+    assert all(-64 <= x <= 4096 + 64 and -64 <= y <= 4096 + 64 for x, y in points)
+    assert zigzag(-1) == 1 and zigzag(1) == 2
+
+
+# Test: at high zoom, polygons are clipped to the tile plus its buffer.
+def test_clipping():
+    encoder = VectorTileEncoder(STORE)
+    _, features = decode_tile(encoder.render(RESULT, lonlat_tile(-73.985, 40.745, 18)))
+
+    assert set(features) == {1}
+    [ring] = features[1]["rings"]
+    assert sorted(set(ring)) == [(-64, -64), (-64, 4160), (4160, -64), (4160, 4160)]
+
+
+# Test: static tile geometry is computed once and reused for new properties.
+def test_geometry_cache():
+    encoder = VectorTileEncoder(STORE, max_tiles=1)
+    tile = lonlat_tile(-73.975, 40.745, 12)
+    encoder.render(RESULT, tile)
+    encoder.render(RESULT.assign(combined_level="Quiet"), tile)
+    assert encoder.stats() == {"zones": 2, "tiles": 1, "hits": 1, "misses": 1}
+
+    encoder.render(RESULT, lonlat_tile(-73.975, 40.745, 11))
+    assert encoder.stats()["tiles"] == 1
+
+
+# Test: tiles away from the zones are empty.
+def test_empty_tile():
+    encoder = VectorTileEncoder(STORE)
+    tile = lonlat_tile(2.35, 48.85, 12)
+    assert not encoder.has_features(*tile)
+    assert encoder.render(RESULT, tile) == b""
@@ -0,0 +1,136 @@
+# Importing.
+import pytest
+import requests
+
+from ml.utils.weather_client import WeatherClient, weather_summary
+
+CURRENT = {
+    "weather": [{"main": "Rain"}],
+    "main": {"temp": 12.5, "feels_like": 11.0, "humidity": 80},
+    "wind": {"speed": 6.2}
+}
+FORECAST = {"list": [
+    {"dt": 1000, "weather": [{"main": "Clear"}],
+     "main": {"temp": 20, "feels_like": 19, "humidity": 40}, "wind": {"speed": 2}},
+    {"dt": 4600, "weather": [{"main": "Snow"}],
+     "main": {"temp": -2, "feels_like": -6, "humidity": 90}, "wind": {"speed": 8}},
+]}
+
+
+# Controllable clock so cache expiry can be tested without sleeping.
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# Fake session that records calls and returns canned payloads per endpoint.
+class FakeSession:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params, timeout))
+        payload = FORECAST if url.endswith("forecast/hourly") else CURRENT
+        fail = self.fail
+
+        class Response:
+            def raise_for_status(self):
+                if fail:
+                    raise requests.HTTPError("503 Service Unavailable")
+
+            def json(self):
+                return payload
+        return Response()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def client(clock):
+    weather = WeatherClient("key", base_url="http://stub/data/2.5/", connect_timeout=1,
+                            read_timeout=2, current_ttl=60, forecast_ttl=600,
+                            clock=clock)
+    weather.session = FakeSession()
+    return weather
+
+
+# Test: requests go through the session with params and a (connect, read) timeout.
+def test_request_uses_timeouts(client):
+    client.current()
+    url, params, timeout = client.session.calls[0]
+    assert url == "http://stub/data/2.5/weather"
+    assert params["appid"] == "key"
+    assert params["units"] == "metric"
+    assert timeout == (1, 2)
+
+
+# Test: current conditions are cached until the TTL runs out.
+def test_current_is_cached(client, clock):
+    assert client.current() == CURRENT
+    clock.now = 59
+    client.current()
+    assert len(client.session.calls) == 1
+
+    clock.now = 60
+    client.current()
+    assert len(client.session.calls) == 2
+
+
+# Test: while another thread refreshes an expired entry, callers get the previous copy.
+def test_stale_copy_served_during_refresh(client, clock):
+    client.current()
+    clock.now = 90
+    client._current_lock.acquire()
+    try:
+        assert client.current() == CURRENT
+    finally:
+        client._current_lock.release()
+    assert len(client.session.calls) == 1
+    assert client.stale_served == 1
+
+    client.current()
+    assert len(client.session.calls) == 2
+
+
+# Test: forecast entries are indexed by dt and fetched once for the whole horizon.
+def test_forecast_lookup_by_dt(client):
+    assert client.forecast_at(4600)["weather"][0]["main"] == "Snow"
+    assert client.forecast_at(1000)["main"]["temp"] == 20
+    assert client.forecast_at(9999) is None
+    assert len(client.session.calls) == 1
+
+
+# Test: failed fetches raise and are not cached.
+def test_failures_are_not_cached(client):
+    client.session.fail = True
+    with pytest.raises(requests.HTTPError):
+        client.current()
+
+    client.session.fail = False
+    assert client.current() == CURRENT
+    assert len(client.session.calls) == 2
+
+
+# Test: clear() forces the next call to refetch.
+def test_clear(client):
+    client.forecast()
+    client.clear()
+    client.forecast()
+    assert len(client.session.calls) == 2
+
+
+# Test: weather_summary extracts model inputs and rejects missing entries.
+def test_weather_summary():
+    assert weather_summary(CURRENT) == {
+        "temp": 12.5, "feels_like": 11.0, "humidity": 80, "wind_speed": 6.2,
+        "weather_main": "Rain"
+    }
+    with pytest.raises(ValueError):
+        weather_summary(None)
@@ -0,0 +1,95 @@
+# Importing.
+import threading
+
+from ml.utils.weather_refresher import WeatherRefresher
+
+
+# Controllable clock so staleness can be tested without sleeping.
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# Fake client returning canned data; can be switched to fail.
+class FakeClient:
+    def __init__(self):
+        self.fail = False
+        self.calls = 0
+
+    def fetch_current(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"main": {"temp": self.calls}}
+
+    def fetch_forecast(self):
+        return {3600: {"dt": 3600}, 7200: {"dt": 7200}}
+
+
+# Test: a refresh publishes a snapshot that lookup() reads from.
+def test_refresh_publishes_snapshot():
+    refresher = WeatherRefresher(FakeClient(), interval_seconds=60)
+    assert refresher.lookup() is None
+
+    assert refresher.refresh_once() is True
+    assert refresher.lookup() == {"main": {"temp": 1}}
+    assert refresher.lookup(7200) == {"dt": 7200}
+    assert refresher.lookup(9999) is None
+
+
+# Test: a failed refresh keeps the previous snapshot and counts the failure.
+def test_failed_refresh_keeps_previous_snapshot():
+    client = FakeClient()
+    refresher = WeatherRefresher(client, interval_seconds=60)
+    refresher.refresh_once()
+    previous = refresher.snapshot
+
+    client.fail = True
+    assert refresher.refresh_once() is False
+    assert refresher.snapshot is previous
+
+    status = refresher.status()
+    assert status["failure_count"] == 1
+    assert status["refresh_count"] == 1
+    assert status["last_error"] == "upstream down"
+    assert status["last_refresh"] is not None
+
+
+# Test: a snapshot older than max_age is no longer served.
+def test_stale_snapshot_is_ignored():
+    clock = FakeClock()
+    refresher = WeatherRefresher(FakeClient(), interval_seconds=60, clock=clock)
+    refresher.refresh_once()
+
+    clock.now = 180
+    assert refresher.lookup() is not None
+    clock.now = 181
+    assert refresher.lookup() is None
+
+
+# Test: listeners get each new snapshot; a failing listener does not break the refresh.
+def test_listeners_called():
+    refresher = WeatherRefresher(FakeClient(), interval_seconds=60)
+    seen = []
+    refresher.add_listener(lambda snapshot: 1 / 0)
+    refresher.add_listener(seen.append)
+
+    assert refresher.refresh_once() is True
+    assert seen == [refresher.snapshot]
+
+
+# Test: the background thread refreshes immediately and stops cleanly.
+def test_thread_start_stop():
+    refresher = WeatherRefresher(FakeClient(), interval_seconds=3600)
+    refreshed = threading.Event()
+    refresher.add_listener(lambda snapshot: refreshed.set())
+
+    refresher.start()
+    assert refreshed.wait(5)
+    assert refresher.status()["enabled"] is True
+
+    refresher.stop(timeout=5)
+    assert refresher.running is False
@@ -0,0 +1,254 @@
+"""
+Vector Tiles for ML API
+Encodes zone polygons and prediction properties as Mapbox Vector Tiles (MVT v2)
+"""
+
+import math
+import struct
+import threading
+from collections import OrderedDict
+import numpy as np
+import shapely
+from shapely.geometry import shape
+
+from .geojson_serializer import frame_records
+
+MVT_MIMETYPE = "application/vnd.mapbox-vector-tile"
+LAYER_NAME = "zones"
+EXTENT = 4096
+# Tile units of geometry kept beyond each edge, so strokes don't seam at tile borders.
+BUFFER = 64
+MAX_ZOOM = 18
+
+EARTH_RADIUS = 6378137.0
+WORLD_HALF = math.pi * EARTH_RADIUS
+
+MOVE_TO, LINE_TO, CLOSE_PATH = 1, 2, 7
+POLYGON = 3
+
+
+# ----------------------------------------
+# Protocol buffer primitives
+# ----------------------------------------
+def varint(n):
+    out = bytearray()
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+
+def field(number, payload):
+    """Length-delimited field"""
+    return varint((number << 3) | 2) + varint(len(payload)) + payload
+
+
+def varint_field(number, value):
+    return varint(number << 3) + varint(value)
+
+
+def packed(number, values):
+    return field(number, b"".join(varint(v) for v in values))
+
+
+def encode_value(value):
+    """A layer Value message for a str, bool, int or float property"""
+    if isinstance(value, str):
+        return field(1, value.encode())
+    if isinstance(value, bool):
+        return varint_field(7, int(value))
+    if isinstance(value, int):
+        return varint_field(5, value) if value >= 0 else varint_field(6, zigzag(value))
+    return varint((3 << 3) | 1) + struct.pack("<d", float(value))
+
+
+# ----------------------------------------
+# Tile geometry
+# ----------------------------------------
+def to_mercator(coords):
+    """(N, 2) lon/lat degrees -> Web Mercator metres"""
+    coords = np.asarray(coords, dtype=np.float64)
+    x = np.radians(coords[:, 0]) * EARTH_RADIUS
+    y = np.log(np.tan(np.pi / 4 + np.radians(coords[:, 1]) / 2)) * EARTH_RADIUS
+    return np.column_stack([x, y])
+
+
+def tile_bounds(z, x, y):
+    """(minx, miny, maxx, maxy) of a tile in Web Mercator metres"""
+    size = 2 * WORLD_HALF / (1 << z)
+    minx = -WORLD_HALF + x * size
+    maxy = WORLD_HALF - y * size
+    return minx, maxy - size, minx + size, maxy
+
+
+def valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < (1 << z) and 0 <= y < (1 << z)
+
+
+def ring_area(ring):
+    """Surveyor's formula in tile coordinates; positive means an exterior ring in MVT"""
+    x, y = ring[:, 0], ring[:, 1]
+    return int(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def quantize_ring(coords, minx, maxy, scale):
+    """Integer tile points of a ring, without repeated or closing points"""
+    points = np.column_stack([(coords[:, 0] - minx) * scale,
+                              (maxy - coords[:, 1]) * scale])
+    points = np.rint(points).astype(np.int64)
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+    points = points[keep]
+    if len(points) > 1 and np.array_equal(points[0], points[-1]):
+        points = points[:-1]
+    return points
+
+
+def polygon_rings(polygon, minx, maxy, scale):
+    """Quantized rings of a polygon, wound as MVT v2 requires.
+
+    Degenerate rings are dropped.
+    """
+    rings = []
+    for k, ring in enumerate([polygon.exterior, *polygon.interiors]):
+        points = quantize_ring(shapely.get_coordinates(ring), minx, maxy, scale)
+        area = ring_area(points) if len(points) >= 3 else 0
+        if area == 0:
+            if k == 0:
+                return []
+            continue
+        # Exterior rings have positive area in tile space, holes negative.
+        if (area > 0) != (k == 0):
+            points = points[::-1]
+        rings.append(points)
+    return rings
+
+
+def geometry_commands(rings):
+    """MoveTo/LineTo/ClosePath command integers for rings of tile points"""
+    commands = []
+    cx = cy = 0
+    for ring in rings:
+        for i, (px, py) in enumerate(ring.tolist()):
+            if i == 0:
+                commands.append((1 << 3) | MOVE_TO)
+            elif i == 1:
+                commands.append(((len(ring) - 1) << 3) | LINE_TO)
+            commands += [zigzag(px - cx), zigzag(py - cy)]
+            cx, cy = px, py
+        commands.append((1 << 3) | CLOSE_PATH)
+    return commands
+
+
+class VectorTileEncoder:
+    """Encodes one layer of zone polygons per tile.
+
+    Zone geometry is projected to Web Mercator once. The clipped, quantized
+    and command-encoded geometry of each tile is cached (LRU, max_tiles)
+    since it never changes; encoding a tile for a new prediction snapshot
+    only writes each feature's ID and property tags around those bytes.
+    """
+
+    def __init__(self, geometry_store, extent=EXTENT, buffer=BUFFER, max_tiles=4096,
+                 layer_name=LAYER_NAME):
+        self.extent = extent
+        self.buffer = buffer
+        self.max_tiles = max_tiles
+        self.layer_name = layer_name
+        self._zones = []
+        for zone_id, geom in geometry_store.items():
+            if geom:
+                mercator = shapely.transform(shape(geom), to_mercator)
+                self._zones.append((zone_id, mercator))
+        self._bounds = shapely.bounds([geom for _, geom in self._zones]).reshape(-1, 4)
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def geometry(self, z, x, y):
+        """[(zone_id, encoded geometry and type fields)] for the zones in a tile"""
+        key = (z, x, y)
+        with self._lock:
+            features = self._tiles.get(key)
+            if features is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return features
+            self.misses += 1
+
+        features = self._clip(z, x, y)
+        with self._lock:
+            self._tiles[key] = features
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return features
+
+    def _clip(self, z, x, y):
+        minx, miny, maxx, maxy = tile_bounds(z, x, y)
+        scale = self.extent / (maxx - minx)
+        pad = self.buffer / scale
+        box = (minx - pad, miny - pad, maxx + pad, maxy + pad)
+        hit = ((self._bounds[:, 0] <= box[2]) & (self._bounds[:, 2] >= box[0]) &
+               (self._bounds[:, 1] <= box[3]) & (self._bounds[:, 3] >= box[1]))
+
+        features = []
+        for i in np.flatnonzero(hit):
+            zone_id, geom = self._zones[i]
+            clipped = shapely.clip_by_rect(geom, *box)
+            rings = []
+            for part in shapely.get_parts(clipped):
+                if part.geom_type == "Polygon":
+                    rings += polygon_rings(part, minx, maxy, scale)
+            if rings:
+                encoded = varint_field(3, POLYGON) + packed(4, geometry_commands(rings))
+                features.append((zone_id, encoded))
+        return features
+
+    def has_features(self, z, x, y):
+        return bool(self.geometry(z, x, y))
+
+    def encode(self, z, x, y, properties):
+        """Tile bytes for {zone_id: {name: value}}; None values are left out"""
+        keys, values = {}, {}
+        features = []
+        for zone_id, geometry in self.geometry(z, x, y):
+            tags = []
+            for name, value in properties.get(zone_id, {}).items():
+                if value is None:
+                    continue
+                tags.append(keys.setdefault(name, len(keys)))
+                tags.append(values.setdefault((type(value), value), len(values)))
+            feature = varint_field(1, zone_id) + packed(2, tags) + geometry
+            features.append(field(2, feature))
+        if not features:
+            return b""
+
+        layer = (varint_field(15, 2) + field(1, self.layer_name.encode())
+                 + b"".join(features)
+                 + b"".join(field(3, name.encode()) for name in keys)
+                 + b"".join(field(4, encode_value(value)) for _, value in values)
+                 + varint_field(5, self.extent))
+        return field(3, layer)
+
+    def render(self, result, tile, fields=None, id_column="PULocationID"):
+        """Tile bytes for a result frame, optionally with only some of its columns"""
+        if fields is not None:
+            result = result[[id_column] + [f for f in fields if f != id_column]]
+        properties = {int(props[id_column]): props for props in frame_records(result)}
+        return self.encode(*tile, properties)
+
+    def stats(self):
+        """Geometry cache counters for /health"""
+        with self._lock:
+            return {
+                'zones': len(self._zones),
+                'tiles': len(self._tiles),
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -0,0 +1,127 @@
+"""
+OpenWeather Client for ML API
+Pooled HTTP session with timeouts and short-lived caches for current and forecast data
+"""
+
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "http://api.openweathermap.org/data/2.5"
+MANHATTAN_LAT = 40.728333
+MANHATTAN_LON = -73.994167
+
+
+def weather_summary(data):
+    """Reduce an OpenWeather current/forecast entry to the fields the models use"""
+    if data is None:
+        raise ValueError("No weather data for requested time")
+    return {
+        "temp": data["main"]["temp"],
+        "feels_like": data["main"]["feels_like"],
+        "humidity": data["main"]["humidity"],
+        "wind_speed": data["wind"]["speed"],
+        "weather_main": data["weather"][0]["main"]
+    }
+
+
+class WeatherClient:
+    """OpenWeather client with connection pooling, timeouts and TTL caches.
+
+    Current conditions and the hourly forecast are cached separately. The
+    forecast is indexed by its `dt` so any hour in the horizon is a dict
+    lookup. Each cache slot is a (value, fetched_at) tuple replaced in a
+    single assignment, so readers never see a half-updated cache.
+    Only one thread refreshes an expired slot; until it is done, other
+    threads get the previous copy (up to twice the TTL old) rather than
+    queueing behind the upstream call.
+    """
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, connect_timeout=3.05,
+                 read_timeout=5.0, current_ttl=300, forecast_ttl=1800, pool_size=10,
+                 clock=time.monotonic):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.current_ttl = current_ttl
+        self.forecast_ttl = forecast_ttl
+        self._clock = clock
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._current = None
+        self._forecast = None
+        self._current_lock = threading.Lock()
+        self._forecast_lock = threading.Lock()
+        self.stale_served = 0
+
+    def _get(self, endpoint):
+        response = self.session.get(
+            f"{self.base_url}/{endpoint}",
+            params={
+                'lat': MANHATTAN_LAT,
+                'lon': MANHATTAN_LON,
+                'appid': self.api_key,
+                'units': 'metric'
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _fresh(self, slot, ttl):
+        return slot is not None and self._clock() - slot[1] < ttl
+
+    def fetch_current(self):
+        """Download current conditions and replace the cached copy"""
+        data = self._get('weather')
+        self._current = (data, self._clock())
+        return data
+
+    def fetch_forecast(self):
+        """Download the hourly forecast and replace the cached dt -> entry index"""
+        data = self._get('forecast/hourly')
+        by_dt = {entry["dt"]: entry for entry in data.get("list", [])}
+        self._forecast = (by_dt, self._clock())
+        return by_dt
+
+    def _cached(self, name, lock, ttl, fetch):
+        slot = getattr(self, name)
+        if self._fresh(slot, ttl):
+            return slot[0]
+        # Someone else is already refreshing: use the old copy while it is
+        # recent enough.
+        stale_ok = self._fresh(slot, 2 * ttl)
+        if not lock.acquire(blocking=not stale_ok):
+            self.stale_served += 1
+            return slot[0]
+        try:
+            slot = getattr(self, name)
+            if self._fresh(slot, ttl):
+                return slot[0]
+            return fetch()
+        finally:
+            lock.release()
+
+    def current(self):
+        """Current conditions, served from cache while younger than current_ttl"""
+        return self._cached("_current", self._current_lock, self.current_ttl,
+                            self.fetch_current)
+
+    def forecast(self):
+        """Hourly forecast entries by `dt`, cached while younger than forecast_ttl"""
+        return self._cached("_forecast", self._forecast_lock, self.forecast_ttl,
+                            self.fetch_forecast)
+
+    def forecast_at(self, dt):
+        """Forecast entry for a unix timestamp, or None if outside the horizon"""
+        return self.forecast().get(dt)
+
+    def clear(self):
+        """Drop both caches"""
+        self._current = None
+        self._forecast = None
@@ -0,0 +1,125 @@
+"""
+Background Weather Refresher for ML API
+Keeps current conditions and the hourly forecast warm off the request path
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+
+class WeatherSnapshot(NamedTuple):
+    """Immutable weather state published by the refresher"""
+    current: Optional[dict]
+    forecast: dict
+    refreshed_at: float
+    refreshed_at_iso: str
+
+
+class WeatherRefresher:
+    """Daemon thread that refreshes weather every interval and swaps it in atomically.
+
+    Readers only ever dereference `snapshot`, which is replaced with a new
+    WeatherSnapshot in a single assignment, so no lock is needed on the read
+    path. A failed refresh keeps serving the previous data.
+    """
+
+    def __init__(self, client, interval_seconds=600, max_age_seconds=None,
+                 clock=time.monotonic):
+        self.client = client
+        self.interval_seconds = interval_seconds
+        # Stop trusting the snapshot once a few refreshes in a row have failed.
+        if max_age_seconds is None:
+            max_age_seconds = 3 * interval_seconds
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self.snapshot = None
+        self.refresh_count = 0
+        self.failure_count = 0
+        self.last_error = None
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_listener(self, callback):
+        """Call callback(snapshot) after every refresh that produced new data"""
+        self._listeners.append(callback)
+
+    def refresh_once(self):
+        """Fetch current conditions and forecast and publish a new snapshot.
+
+        Returns True on success.
+        """
+        try:
+            current = self.client.fetch_current()
+            forecast = self.client.fetch_forecast()
+        except Exception as e:
+            self.failure_count += 1
+            self.last_error = str(e)
+            logging.warning(f"Weather refresh failed: {e}")
+            return False
+
+        self.refresh_count += 1
+        self.snapshot = WeatherSnapshot(
+            current=current,
+            forecast=forecast,
+            refreshed_at=self._clock(),
+            refreshed_at_iso=datetime.now(timezone.utc).isoformat()
+        )
+        for callback in self._listeners:
+            try:
+                callback(self.snapshot)
+            except Exception as e:
+                logging.error(f"Weather refresh listener failed: {e}")
+        return True
+
+    def lookup(self, dt=None):
+        """Current conditions (dt None) or the forecast entry for dt.
+
+        None if unavailable or stale.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        if self._clock() - snapshot.refreshed_at > self.max_age_seconds:
+            return None
+        return snapshot.current if dt is None else snapshot.forecast.get(dt)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh_once()
+            self._stop.wait(self.interval_seconds)
+
+    def start(self):
+        """Start the refresh thread if it is not already running"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="weather-refresher",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def status(self):
+        """Refresher state for /health"""
+        snapshot = self.snapshot
+        return {
+            'enabled': self.running,
+            'interval_seconds': self.interval_seconds,
+            'last_refresh': snapshot.refreshed_at_iso if snapshot else None,
+            'refresh_count': self.refresh_count,
+            'failure_count': self.failure_count,
+            'last_error': self.last_error,
+            'forecast_hours': len(snapshot.forecast) if snapshot else 0
+        }